@@ -0,0 +1,409 @@
+import argparse
+import hashlib
+import os
+import re
+import threading
+import time
+import wave
+import logging
+import numpy as np
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from DetectionPostProcess import COCO_LABELS
+from Metrics import metrics
+from SceneDescription import NUMBER_WORDS, pluralize
+from TranslationCache import PHRASE_TABLES
+
+CLIP_SAMPLE_RATE = 22050
+CHUNK_SAMPLES = 441  # 20 ms at 22.05 kHz
+FRAGMENT_GAP = 0.04
+PHRASE_GAP = 0.15
+SILENCE_LEVEL = 300
+
+# Fixed phrases that make up most of what is spoken; anything else goes to live TTS
+CLIP_TEMPLATES = (
+    "Warning: {label} ahead!",
+    "Warning: {label} approaching!",
+    "{label} detected to the left",
+    "{label} detected to the right",
+    "{label} detected ahead",
+    "{count} {label} on the left",
+    "{count} {label} on the right",
+    "{count} {label} ahead",
+    "{count} more {label} on the left",
+    "{count} more {label} on the right",
+    "{count} more {label} ahead",
+    "{count} fewer {label}",
+    "{label} gone",
+    "No objects detected",
+    "Camera feed lost",
+    "Checking, one moment",
+    "Starting enhanced assistant system",
+    "Shutting down",
+)
+SLOT_PATTERN = re.compile(r"\{(\w+)\}")
+
+
+class ClipStore:
+    def __init__(self, directory: str = "audio_clips", voice: str = "", rate: int = 150,
+                 sample_rate: int = CLIP_SAMPLE_RATE):
+        """Synthesized fragments on disk, keyed by text, language, voice and rate"""
+        self.directory = directory
+        self.voice = voice or ""
+        self.rate = rate
+        self.sample_rate = sample_rate
+        self.clips: Dict[Tuple[str, str], np.ndarray] = {}
+        self.failed = set()
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, text: str, language: str) -> str:
+        key = hashlib.sha1(f"{language}\0{self.voice}\0{self.rate}\0{text}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{key}.wav")
+
+    def has(self, text: str, language: str) -> bool:
+        return (text, language) in self.clips or os.path.exists(self.path_for(text, language))
+
+    def load(self, text: str, language: str) -> Optional[np.ndarray]:
+        """16-bit mono samples of one fragment, or None if it has not been synthesized"""
+        clip = self.clips.get((text, language))
+        if clip is None:
+            path = self.path_for(text, language)
+            if not os.path.exists(path):
+                return None
+            clip = self.clips[text, language] = read_wav(path, self.sample_rate)
+        return clip
+
+    def add(self, text: str, language: str, raw_path: str):
+        """Normalize an engine-written file (rate, channels, edge silence) into the store"""
+        try:
+            samples = trim_silence(read_wav(raw_path, self.sample_rate), self.sample_rate)
+        except (wave.Error, EOFError, ValueError):
+            # Engines that write something other than PCM WAV keep using live speech for this fragment
+            self.failed.add((text, language))
+            return
+        finally:
+            if os.path.exists(raw_path):
+                os.remove(raw_path)
+        write_wav(self.path_for(text, language), samples, self.sample_rate)
+        self.clips[text, language] = samples
+
+    def synthesize(self, engine, fragments: List[Tuple[str, str]]):
+        """Have a pyttsx3-style engine render fragments to files in one runAndWait() pass"""
+        pending = []
+        for text, language in fragments:
+            raw_path = self.path_for(text, language) + ".raw"
+            engine.save_to_file(text, raw_path)
+            pending.append((text, language, raw_path))
+        engine.runAndWait()
+        for text, language, raw_path in pending:
+            self.add(text, language, raw_path)
+
+
+def read_wav(path: str, sample_rate: int) -> np.ndarray:
+    """16-bit mono samples at sample_rate from any PCM WAV"""
+    with wave.open(path, "rb") as wav:
+        width, channels, rate = wav.getsampwidth(), wav.getnchannels(), wav.getframerate()
+        data = wav.readframes(wav.getnframes())
+    if width != 2:
+        raise ValueError(f"{path} is not 16-bit PCM")
+    samples = np.frombuffer(data, dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    if rate != sample_rate and len(samples):
+        positions = np.arange(int(len(samples) * sample_rate / rate)) * rate / sample_rate
+        samples = np.interp(positions, np.arange(len(samples)), samples).astype(np.int16)
+    return samples
+
+
+def write_wav(path: str, samples: np.ndarray, sample_rate: int):
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.astype(np.int16).tobytes())
+
+
+def trim_silence(samples: np.ndarray, sample_rate: int, margin: float = 0.01) -> np.ndarray:
+    """Cut leading and trailing silence so fragments join tightly and start sounding at once"""
+    loud = np.flatnonzero(np.abs(samples.astype(np.int32)) > SILENCE_LEVEL)
+    if len(loud) == 0:
+        return samples
+    pad = int(margin * sample_rate)
+    return samples[max(loud[0] - pad, 0):loud[-1] + pad + 1].copy()
+
+
+class PhraseMatcher:
+    def __init__(self, labels: List[str], languages: Iterable[str] = ("en", "hi"),
+                 templates: Iterable[str] = CLIP_TEMPLATES, prefixes: Iterable[str] = ()):
+        """Split spoken text into cacheable fragments: template literals, labels and number words"""
+        self.patterns: List[Tuple[str, re.Pattern, List[str], List[str]]] = []
+        self.slot_values: Dict[Tuple[str, str], set] = {}
+        self.prefixes = list(prefixes)
+        for language in languages:
+            table = PHRASE_TABLES.get(language, {})
+            if language == "en":
+                names = set(labels) | {pluralize(label) for label in labels}
+            else:
+                names = {table.get(label, label) for label in labels}
+            self.slot_values[language, "label"] = names
+            self.slot_values[language, "count"] = set(NUMBER_WORDS.get(language, NUMBER_WORDS["en"]))
+            for template in templates:
+                localized = table.get(template, template) if language != "en" else template
+                parts = SLOT_PATTERN.split(localized)
+                literals, slots = parts[0::2], parts[1::2]
+                regex = "".join(
+                    re.escape(part) if i % 2 == 0 else f"(?P<{part}>.+?)" for i, part in enumerate(parts)
+                )
+                self.patterns.append((language, re.compile(regex), literals, slots))
+
+    def fragments(self, text: str) -> Optional[List[Tuple[str, str]]]:
+        """(fragment, language) pairs with None marking a pause between phrases, or None if any part is free-form"""
+        result = []
+        for name in self.prefixes:
+            if text.startswith(f"{name}: "):
+                # Source names are spoken in the same voice whatever the language
+                result += [(name, "en"), None]
+                text = text[len(name) + 2:]
+                break
+        whole = self.match(text)
+        if whole is not None:
+            return result + whole
+        # Scene deltas join several phrases with commas
+        for index, phrase in enumerate(text.split(", ")):
+            matched = self.match(phrase)
+            if matched is None:
+                return None
+            if index:
+                result.append(None)
+            result += matched
+        return result
+
+    def match(self, phrase: str) -> Optional[List[Tuple[str, str]]]:
+        for language, regex, literals, slots in self.patterns:
+            found = regex.fullmatch(phrase)
+            if found is None:
+                continue
+            if any(found.group(slot) not in self.slot_values[language, slot] for slot in slots):
+                continue
+            parts = []
+            for i, literal in enumerate(literals):
+                if literal.strip():
+                    parts.append((literal.strip(), language))
+                if i < len(slots):
+                    parts.append((found.group(slots[i]), language))
+            return parts
+        return None
+
+    def vocabulary(self, language: str) -> List[str]:
+        """Every fragment a language can need, template literals first"""
+        literals = []
+        for pattern_language, _, parts, _ in self.patterns:
+            if pattern_language == language:
+                literals += [part.strip() for part in parts if part.strip()]
+        words = sorted(self.slot_values[language, "label"]) + list(self.slot_values[language, "count"])
+        return list(dict.fromkeys(literals + words))
+
+
+class PyAudioSink:
+    def __init__(self, sample_rate: int = CLIP_SAMPLE_RATE, chunk_samples: int = CHUNK_SAMPLES):
+        """Output stream opened once and kept open, so playback starts without device set-up"""
+        import pyaudio
+        self.sample_rate = sample_rate
+        self.chunk_samples = chunk_samples
+        self.audio = pyaudio.PyAudio()
+        self.stream = self.audio.open(
+            format=pyaudio.paInt16, channels=1, rate=sample_rate, output=True, frames_per_buffer=chunk_samples
+        )
+
+    def write(self, chunk: np.ndarray):
+        self.stream.write(chunk.tobytes())
+
+    def close(self):
+        self.stream.stop_stream()
+        self.stream.close()
+        self.audio.terminate()
+
+
+class NullAudioSink:
+    def __init__(self, sample_rate: int = CLIP_SAMPLE_RATE, chunk_samples: int = CHUNK_SAMPLES,
+                 realtime: bool = False):
+        """Sink that discards audio, optionally taking as long as real playback would"""
+        self.sample_rate = sample_rate
+        self.chunk_samples = chunk_samples
+        self.realtime = realtime
+        self.samples_written = 0
+
+    def write(self, chunk: np.ndarray):
+        self.samples_written += len(chunk)
+        if self.realtime:
+            time.sleep(len(chunk) / self.sample_rate)
+
+    def close(self):
+        pass
+
+
+class ClipSpeechEngine:
+    def __init__(self, store: ClipStore, matcher: PhraseMatcher, sink, live_factory: Callable[[], object],
+                 language: Callable[[], str] = lambda: "en", logger: Optional[logging.Logger] = None,
+                 played_history: Optional[int] = 100):
+        """pyttsx3-compatible engine that plays fixed phrases from cached fragments and
+        hands free-form text to live TTS; played_history=None keeps every onset, for benchmarks"""
+        self.store = store
+        self.matcher = matcher
+        self.sink = sink
+        self.live_factory = live_factory
+        self.live = None
+        self.language = language
+        self.logger = logger or logging.getLogger(__name__)
+        self.callbacks: Dict[str, List[Callable]] = {}
+        self.queue: List[Tuple[str, float]] = []
+        self.stopping = threading.Event()
+        self.missing: List[Tuple[str, str]] = []
+        self.queued_missing = set()
+        self.stats = {"clip": 0, "live": 0}
+        # (text, path, perf_counter when sound started) of recent utterances, for latency measurement
+        self.played = deque(maxlen=played_history)
+
+    def connect(self, name: str, callback: Callable):
+        self.callbacks.setdefault(name, []).append(callback)
+        if self.live is not None and hasattr(self.live, "connect"):
+            self.live.connect(name, callback)
+
+    def say(self, text: str):
+        self.queue.append((text, time.perf_counter()))
+
+    def stop(self):
+        self.stopping.set()
+        if self.live is not None:
+            self.live.stop()
+
+    def runAndWait(self):
+        queued, self.queue = self.queue, []
+        self.stopping.clear()
+        for text, queued_at in queued:
+            if self.stopping.is_set():
+                break
+            samples = self.render(text)
+            if samples is not None:
+                self.stats["clip"] += 1
+                self.play(text, samples, queued_at)
+            else:
+                self.stats["live"] += 1
+                self.speak_live(text, queued_at)
+
+    def render(self, text: str) -> Optional[np.ndarray]:
+        """The whole utterance as one buffer of concatenated fragments, or None if it needs live TTS"""
+        fragments = self.matcher.fragments(text)
+        if fragments is None:
+            return None
+        missing = [f for f in fragments if f is not None and self.store.load(*f) is None]
+        if missing:
+            # Fill the gaps in the background; this utterance is spoken live
+            for fragment in missing:
+                self._want(fragment)
+            return None
+
+        rate = self.store.sample_rate
+        fragment_gap = np.zeros(int(FRAGMENT_GAP * rate), dtype=np.int16)
+        phrase_gap = np.zeros(int(PHRASE_GAP * rate), dtype=np.int16)
+        pieces = []
+        for fragment in fragments:
+            if fragment is None:
+                pieces.append(phrase_gap)
+                continue
+            if pieces and pieces[-1] is not phrase_gap:
+                pieces.append(fragment_gap)
+            pieces.append(self.store.load(*fragment))
+        return np.concatenate(pieces)
+
+    def play(self, text: str, samples: np.ndarray, queued_at: float):
+        """Write the buffer in small chunks, checking for interruption between them"""
+        chunk = self.sink.chunk_samples
+        started = time.perf_counter()
+        self.played.append((text, "clip", started))
+        metrics.observe("speech_onset_clip", started - queued_at)
+        for offset in range(0, len(samples), chunk):
+            for callback in self.callbacks.get("started-word", ()):
+                callback(None, offset, chunk)
+            if self.stopping.is_set():
+                return
+            self.sink.write(samples[offset:offset + chunk])
+
+    def speak_live(self, text: str, queued_at: float):
+        live = self._live_engine()
+        started = time.perf_counter()
+        self.played.append((text, "live", started))
+        metrics.observe("speech_onset_live", started - queued_at)
+        live.say(text)
+        live.runAndWait()
+
+    def _live_engine(self):
+        """The live engine, created on first use with every registered callback attached"""
+        if self.live is None:
+            self.live = self.live_factory()
+            if hasattr(self.live, "connect"):
+                for name, callbacks in self.callbacks.items():
+                    for callback in callbacks:
+                        self.live.connect(name, callback)
+        return self.live
+
+    def prepare(self, languages: Iterable[str]):
+        """Queue every fragment of these languages that is not on disk yet, for idle-time synthesis"""
+        for language in languages:
+            for text in self.matcher.vocabulary(language):
+                if not self.store.has(text, language):
+                    self._want((text, language))
+
+    def idle(self) -> bool:
+        """Synthesize one missing fragment while nothing is being said; True while more remain.
+        One at a time keeps a hazard that arrives meanwhile waiting for a single short fragment at most"""
+        if not self.missing:
+            return False
+        live = self._live_engine()
+        # The selected language first, so its fragments are ready soonest
+        current = self.language()
+        self.missing.sort(key=lambda fragment: fragment[1] != current)
+        fragment = self.missing.pop(0)
+        started = time.perf_counter()
+        try:
+            self.store.synthesize(live, [fragment])
+        except Exception as e:
+            self.logger.error(f"Clip synthesis error: {str(e)}")
+            self.missing = []
+            return False
+        metrics.observe("clip_synthesis", time.perf_counter() - started)
+        if not self.missing:
+            self.logger.info(f"Audio clip cache complete in {self.store.directory}")
+        return bool(self.missing)
+
+    def close(self):
+        self.sink.close()
+
+    def _want(self, fragment: Tuple[str, str]):
+        if fragment not in self.queued_missing and fragment not in self.store.failed:
+            self.queued_missing.add(fragment)
+            self.missing.append(fragment)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-synthesize the fixed announcement vocabulary")
+    parser.add_argument("--directory", default="audio_clips")
+    parser.add_argument("--language", nargs="+", default=["en", "hi"])
+    parser.add_argument("--rate", type=int, default=150)
+    args = parser.parse_args(argv)
+
+    import pyttsx3
+    engine = pyttsx3.init()
+    engine.setProperty("rate", args.rate)
+    store = ClipStore(args.directory, engine.getProperty("voice"), args.rate)
+    matcher = PhraseMatcher(list(COCO_LABELS), args.language)
+    for language in args.language:
+        missing = [(text, language) for text in matcher.vocabulary(language) if not store.has(text, language)]
+        started = time.perf_counter()
+        store.synthesize(engine, missing)
+        print(f"{language}: {len(missing)} clips in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
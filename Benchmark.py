@@ -0,0 +1,268 @@
+import argparse
+import json
+import os
+import sys
+import time
+import cv2
+import numpy as np
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from AudioClips import NullAudioSink, write_wav, CLIP_SAMPLE_RATE
+from FrameBuffers import FramePool, read_into
+from Metrics import summarize
+from ObjectDetectionWithAssistantAndList import IntelligentAssistant
+from SpeechScheduler import PRIORITY_HAZARD, PRIORITY_REPLY
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+STAGES = ("decode", "preprocess", "inference", "postprocess", "spatial", "announcement")
+
+
+class NullSpeechEngine:
+    def __init__(self):
+        """pyttsx3 stand-in that records what would have been spoken"""
+        self.spoken: List[Tuple[float, str]] = []
+
+    def say(self, text):
+        self.spoken.append((time.perf_counter(), text))
+
+    def getProperty(self, name):
+        return {"voice": "null", "rate": 150}.get(name)
+
+    def save_to_file(self, text, path):
+        """Write a placeholder tone as long as the text would take to say, for building a clip cache offline"""
+        duration = 0.06 * len(text)
+        t = np.arange(int(duration * CLIP_SAMPLE_RATE)) / CLIP_SAMPLE_RATE
+        write_wav(path, (8000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16), CLIP_SAMPLE_RATE)
+
+    def runAndWait(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def connect(self, name, callback):
+        pass
+
+
+class BenchmarkAssistant(IntelligentAssistant):
+    def __init__(self, clip_dir: Optional[str] = None, **kwargs):
+        """Assistant with silent speech and no microphone, for offline measurement;
+        clip_dir plays fixed phrases from a placeholder clip cache into a null audio sink"""
+        self.null_engine = NullSpeechEngine()
+        self.clip_dir = clip_dir
+        self.clip_engine = None
+        self.hazard_times: List[float] = []
+        self.hazard_texts: List[str] = []
+        # Hazards that are in view but not urgent are announced at routine priority
+        self.hazard_notice_times: List[float] = []
+        super().__init__(**kwargs)
+        # Frames are stamped with video time from zero, so history places the video as starting now
+        self.clock_offset = time.time()
+
+    @property
+    def console(self):
+        """stderr, so the JSON report printed to stdout stays parseable"""
+        return sys.stderr
+
+    def create_speech_engine(self):
+        if self.clip_dir is None:
+            return self.null_engine
+        # Every onset is kept so warning_onsets() can match each hazard warning
+        self.clip_engine = self.create_clip_engine(
+            self.null_engine, NullAudioSink(), self.clip_dir, played_history=None
+        )
+        # Placeholder clips are instant to make, so build the whole cache before measuring
+        while self.clip_engine.idle():
+            pass
+        return self.clip_engine
+
+    def speak(self, text, priority=PRIORITY_REPLY, wait=False):
+        if priority == PRIORITY_HAZARD:
+            self.hazard_times.append(time.perf_counter())
+            self.hazard_texts.append(text)
+        super().speak(text, priority, wait=wait)
+
+    def announce_events(self, events, source=None, urgent_ids=None):
+        notices = super().announce_events(events, source, urgent_ids)
+        if notices:
+            self.hazard_notice_times.append(time.perf_counter())
+        return notices
+
+    def first_hazard_announcement(self) -> Optional[float]:
+        """When the first announcement about a hazard was issued, whatever its priority"""
+        times = self.hazard_times[:1] + self.hazard_notice_times[:1]
+        return min(times) if times else None
+
+    def sound_started(self) -> List[Tuple[float, str]]:
+        """(time sound started, text) for every utterance that reached the speaker"""
+        if self.clip_engine is not None:
+            return [(started, text) for text, _, started in self.clip_engine.played]
+        return self.null_engine.spoken
+
+
+def warning_onsets(assistant: BenchmarkAssistant) -> List[float]:
+    """Seconds from each hazard warning being issued to its sound starting"""
+    started = assistant.sound_started()
+    onsets = []
+    for issued, text in zip(assistant.hazard_times, assistant.hazard_texts):
+        later = [at for at, spoken in started if spoken == text and at >= issued]
+        if later:
+            onsets.append(min(later) - issued)
+    return onsets
+
+
+def read_frames(source: str, pool: Optional[FramePool] = None) -> Iterator[np.ndarray]:
+    """Yield frames from a video file or a directory of images; video frames are decoded into pool buffers"""
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                frame = cv2.imread(os.path.join(source, name))
+                if frame is not None:
+                    yield frame
+        return
+
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise RuntimeError(f"Cannot open video source {source}")
+    pool = pool or FramePool(size=1)
+    try:
+        while True:
+            buffer = pool.acquire()
+            ret, frame = read_into(cap, buffer)
+            if not ret:
+                return
+            pool.adopt(buffer, frame)
+            yield frame
+            # The caller is done with the frame once it asks for the next one
+            pool.release(frame)
+    finally:
+        cap.release()
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in megabytes"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    except ImportError:
+        try:
+            import psutil
+            return round(psutil.Process().memory_info().peak_wset / (1024 * 1024), 1)
+        except Exception:
+            return None
+
+
+def run_benchmark(assistant: IntelligentAssistant, source: str, max_frames: Optional[int] = None,
+                  motion_gating: bool = False, fps: float = 30.0) -> Dict:
+    """Feed every frame through process_frame() and the announcement path, timing each stage"""
+    stages = {stage: [] for stage in STAGES}
+    frames = inferred = 0
+    first_hazard_frame_time = None
+    pool = FramePool(size=1)
+    frames_iter = read_frames(source, pool)
+    started = time.perf_counter()
+
+    while max_frames is None or frames < max_frames:
+        decode_started = time.perf_counter()
+        frame = next(frames_iter, None)
+        if frame is None:
+            break
+        decoded = time.perf_counter()
+        stages["decode"].append(decoded - decode_started)
+        if frames == 0:
+            assistant.spatial.set_frame_width(frame.shape[1])
+        frames += 1
+
+        # Optionally let the motion scheduler skip frames, using video time as the clock
+        if motion_gating and not assistant.scheduler.should_infer(frame, frames / fps):
+            continue
+
+        detections = assistant.process_frame(frame)
+        inferred += 1
+        for stage in ("preprocess", "inference", "postprocess"):
+            stages[stage].append(assistant.backend.timings[stage])
+        if motion_gating:
+            assistant.scheduler.record_inference(time.perf_counter() - decoded)
+
+        if first_hazard_frame_time is None and np.any(detections["hazard"]):
+            first_hazard_frame_time = decode_started
+
+        # Video time keeps closing speeds and time-to-contact independent of processing speed
+        announce_started = time.perf_counter()
+        assistant.handle_detections(detections, frames / fps)
+        stages["announcement"].append(time.perf_counter() - announce_started)
+        stages["spatial"].append(assistant.spatial.last_duration)
+
+    elapsed = time.perf_counter() - started
+    # Let queued warnings reach the (null) speaker before measuring their onset
+    deadline = time.monotonic() + 2.0
+    while assistant.speech.pending_count() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assistant.speech.stop()
+    if assistant.history is not None:
+        assistant.history.close()
+
+    time_to_first_warning = None
+    first_announcement = assistant.first_hazard_announcement()
+    if first_hazard_frame_time is not None and first_announcement is not None:
+        time_to_first_warning = round((first_announcement - first_hazard_frame_time) * 1000, 3)
+
+    return {
+        "source": source,
+        "backend": assistant.backend.name,
+        "imgsz": assistant.backend.imgsz,
+        "frames": frames,
+        "inferred_frames": inferred,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_fps": round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+        "stages": {stage: summarize(samples) for stage, samples in stages.items()},
+        "peak_rss_mb": peak_rss_mb(),
+        "frame_buffers": pool.stats(),
+        "preprocess_buffers": assistant.backend.buffers.stats() if hasattr(assistant.backend, "buffers") else None,
+        "hazard_warnings": len(assistant.hazard_times),
+        "hazard_notices": len(assistant.hazard_notice_times),
+        "time_to_first_warning_ms": time_to_first_warning,
+        "warning_onset": summarize(warning_onsets(assistant)),
+        "clip_utterances": assistant.clip_engine.stats if assistant.clip_engine is not None else None,
+        "utterances": assistant.speech.stats["spoken"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the assistant on recorded video or images")
+    parser.add_argument("source", help="video file or directory of images")
+    parser.add_argument("--model", default="yolov8n.pt")
+    parser.add_argument("--backend", default="auto", help="auto, torch, onnx or openvino")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--int8", action="store_true")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--conf", type=float, default=0.3)
+    parser.add_argument("--tiling", default="off", help="off, fast, balanced or accurate")
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--motion-gating", action="store_true", help="skip frames with the motion scheduler")
+    parser.add_argument("--fps", type=float, default=30.0, help="source frame rate used for motion gating")
+    parser.add_argument("--clips", metavar="DIR",
+                        help="speak fixed phrases from a placeholder clip cache in DIR through a null audio sink")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    assistant = BenchmarkAssistant(
+        clip_dir=args.clips,
+        model_path=args.model, confidence_threshold=args.conf, backend=args.backend,
+        imgsz=args.imgsz, int8=args.int8, threads=args.threads, language='en', camera_index=None,
+        tiling=args.tiling
+    )
+    report = run_benchmark(assistant, args.source, args.max_frames, args.motion_gating, args.fps)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
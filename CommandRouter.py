@@ -0,0 +1,265 @@
+import re
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# \w alone splits Devanagari words at vowel signs, so include the whole block
+TOKEN_PATTERN = re.compile(r"[\w\u0900-\u097F]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased whole words of an utterance"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class Intent:
+    def __init__(self, name: str, handler: Callable[..., str], keywords: Iterable[str] = (),
+                 patterns: Iterable[str] = (), exact: Iterable[str] = (), priority: int = 100,
+                 stopwords: Optional[Dict[str, Iterable[str]]] = None):
+        """A command: trigger words, slot-extracting patterns and the handler to call;
+        stopwords lists filler words trimmed from the ends of each named slot"""
+        self.name = name
+        self.handler = handler
+        self.keywords = tuple(keyword.lower() for keyword in keywords)
+        self.patterns = [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+        self.exact = frozenset(phrase.lower() for phrase in exact)
+        self.priority = priority
+        self.stopwords = {slot: frozenset(words) for slot, words in (stopwords or {}).items()}
+
+    def match(self, text: str) -> Optional[Dict[str, str]]:
+        """Slots from the first matching pattern, {} if only keywords matched, None if no pattern fits"""
+        for pattern in self.patterns:
+            found = pattern.search(text)
+            if found:
+                slots = {name: self.clean(name, value) for name, value in found.groupdict().items() if value}
+                return {name: value for name, value in slots.items() if value}
+        return {} if not self.patterns else None
+
+    def clean(self, slot: str, value: str) -> str:
+        """Slot value without leading and trailing filler words, such as "like" in 'what is the weather like'"""
+        stopwords = self.stopwords.get(slot)
+        if not stopwords:
+            return value.strip()
+        words = value.split()
+        while words and words[0].strip("?!.,") in stopwords:
+            words.pop(0)
+        while words and words[-1].strip("?!.,") in stopwords:
+            words.pop()
+        return " ".join(words).strip("?!., ")
+
+
+class CommandRouter:
+    def __init__(self):
+        """Keyword-indexed intent registry; handlers are added with register() instead of an if/elif chain"""
+        self.intents: Dict[str, Intent] = {}
+        self.keyword_index: Dict[Tuple[str, ...], List[Intent]] = {}
+        self.exact_index: Dict[str, Intent] = {}
+        self.max_keyword_length = 1
+
+    def register(self, name: str, handler: Callable[..., str], keywords: Iterable[str] = (),
+                 patterns: Iterable[str] = (), exact: Iterable[str] = (), priority: int = 100,
+                 stopwords: Optional[Dict[str, Iterable[str]]] = None) -> Intent:
+        """Add an intent; lower priority values win when several intents match one utterance"""
+        intent = Intent(name, handler, keywords, patterns, exact, priority, stopwords)
+        self.intents[name] = intent
+        for keyword in intent.keywords:
+            key = tuple(tokenize(keyword))
+            self.max_keyword_length = max(self.max_keyword_length, len(key))
+            candidates = self.keyword_index.setdefault(key, [])
+            candidates.append(intent)
+            candidates.sort(key=lambda candidate: candidate.priority)
+        for phrase in intent.exact:
+            self.exact_index[" ".join(tokenize(phrase))] = intent
+        return intent
+
+    def candidates(self, tokens: List[str]) -> List[Intent]:
+        """Intents whose keyword (single word or phrase) occurs as whole words in the utterance"""
+        found = {}
+        for start in range(len(tokens)):
+            for length in range(1, min(self.max_keyword_length, len(tokens) - start) + 1):
+                for intent in self.keyword_index.get(tuple(tokens[start:start + length]), ()):
+                    found[intent.name] = intent
+        return sorted(found.values(), key=lambda intent: intent.priority)
+
+    def route(self, text: str) -> Tuple[Optional[Intent], Dict[str, str]]:
+        """Find the intent and slots for an utterance"""
+        text = text.lower().strip()
+        tokens = tokenize(text)
+
+        exact = self.exact_index.get(" ".join(tokens))
+        if exact is not None:
+            return exact, {}
+
+        for intent in self.candidates(tokens):
+            slots = intent.match(text)
+            if slots is not None:
+                return intent, slots
+        return None, {}
+
+    def dispatch(self, text: str, fallback: Callable[[], str]) -> str:
+        """Route an utterance and return the handler's reply"""
+        intent, slots = self.route(text)
+        if intent is None:
+            return fallback()
+        return intent.handler(**slots)
+
+
+# Words that turn instrumentation on; any other state word in a metrics command turns it off
+METRICS_ON_WORDS = ("start", "enable", "resume", "on", "चालू")
+
+# Built-in assistant commands in English and Hindi; handlers are supplied by the caller
+COMMAND_INTENTS = [
+    {
+        "name": "weather", "priority": 10,
+        "keywords": ["weather", "मौसम"],
+        "patterns": [
+            r"weather (?:in|at|for) (?P<location>.+)",
+            r"(?P<location>.+?) (?:में|का|की) मौसम",
+            r"weather (?P<location>\w.*)",
+            r"weather|मौसम",
+        ],
+        # Words that end up around a place name but are not part of it
+        "stopwords": {"location": [
+            "like", "today", "tonight", "tomorrow", "now", "right", "currently", "outside", "here", "there",
+            "please", "is", "it", "the", "going", "to", "be", "forecast", "report", "update", "in", "at", "for",
+            "आज", "कल", "अभी", "यहाँ", "यहां", "बाहर", "का", "की", "में",
+        ]},
+    },
+    {
+        "name": "translate", "priority": 20,
+        "keywords": ["translate", "अनुवाद"],
+        "patterns": [
+            r"translate (?P<text>.+)",
+            r"(?P<text>.+?) (?:का|को) अनुवाद",
+            r"translate|अनुवाद",
+        ],
+    },
+    {
+        "name": "call", "priority": 30,
+        "keywords": ["call", "dial", "कॉल", "फ़ोन", "फोन"],
+        "patterns": [r"(?P<number>\+?\d[\d\s-]*\d)", r"call|dial|कॉल|फ़ोन|फोन"],
+    },
+    {
+        "name": "time", "priority": 40,
+        "keywords": ["time", "समय", "बजे"],
+    },
+    {
+        "name": "search", "priority": 50,
+        "keywords": ["search", "खोजो", "खोजें", "सर्च"],
+        "patterns": [
+            r"search (?:for )?(?P<query>.+)",
+            r"(?P<query>.+?) (?:खोजो|खोजें|सर्च करो)",
+        ],
+    },
+    {
+        "name": "describe", "priority": 60,
+        "keywords": ["see", "front", "around", "दिख", "देख"],
+        "patterns": [
+            r"what do you see",
+            r"what(?:'s| is) (?:in front|around)",
+            r"दिख रहा",
+            r"क्या देख",
+        ],
+    },
+    {
+        "name": "change_language", "priority": 70,
+        "keywords": ["language", "भाषा"],
+        "patterns": [r"(?:change|switch) (?:the )?language", r"भाषा बदल"],
+    },
+    {
+        "name": "metrics", "priority": 75,
+        "keywords": ["metrics", "मेट्रिक्स"],
+        "patterns": [
+            r"(?P<state>start|enable|resume|stop|disable|pause) (?:the )?metrics",
+            r"(?:turn|switch) (?P<state>on|off) (?:the )?metrics",
+            r"metrics (?P<state>on|off)",
+            r"मेट्रिक्स (?P<state>चालू|बंद)",
+            r"metrics|मेट्रिक्स",
+        ],
+    },
+    {
+        "name": "exit", "priority": 80,
+        "keywords": ["goodbye", "अलविदा"],
+        "exact": ["goodbye", "stop", "exit", "बंद करो", "अलविदा"],
+    },
+    {
+        "name": "help", "priority": 90,
+        "keywords": ["help", "मदद"],
+    },
+]
+
+
+def build_router(handlers: Dict[str, Callable[..., str]], intents=COMMAND_INTENTS) -> CommandRouter:
+    """Router with the built-in intents bound to the given handlers by intent name"""
+    router = CommandRouter()
+    for spec in intents:
+        if spec["name"] in handlers:
+            router.register(
+                spec["name"], handlers[spec["name"]], spec.get("keywords", ()),
+                spec.get("patterns", ()), spec.get("exact", ()), spec.get("priority", 100),
+                spec.get("stopwords")
+            )
+    return router
+
+
+# Utterances and the intent each should reach; None means it must not match anything
+COMMAND_CORPUS = [
+    ("weather in london", "weather"),
+    ("what's the weather in new delhi", "weather"),
+    ("weather", "weather"),
+    ("दिल्ली में मौसम कैसा है", "weather"),
+    ("मुंबई का मौसम", "weather"),
+    ("translate good morning", "translate"),
+    ("सुप्रभात का अनुवाद करो", "translate"),
+    ("call 9876543210", "call"),
+    ("please call 555 123 4567", "call"),
+    ("9876543210 पर कॉल करो", "call"),
+    ("what time is it", "time"),
+    ("tell me the time", "time"),
+    ("कितने बजे हैं", "time"),
+    ("समय क्या है", "time"),
+    ("search for cats", "search"),
+    ("बिल्लियाँ खोजो", "search"),
+    ("what do you see", "describe"),
+    ("what is in front of me", "describe"),
+    ("क्या दिख रहा है", "describe"),
+    ("change language", "change_language"),
+    ("भाषा बदलो", "change_language"),
+    ("start metrics", "metrics"),
+    ("turn off the metrics", "metrics"),
+    ("मेट्रिक्स बंद करो", "metrics"),
+    ("goodbye", "exit"),
+    ("stop", "exit"),
+    ("बंद करो", "exit"),
+    ("help", "help"),
+    ("मदद", "help"),
+    ("i can't recall his name", None),
+    ("sometimes i walk alone", None),
+    ("stop the music in the kitchen", None),
+]
+
+
+def benchmark_dispatch(router: CommandRouter, corpus=COMMAND_CORPUS, repeat: int = 1000) -> Dict:
+    """Routing accuracy on the corpus and mean routing cost per utterance"""
+    errors = []
+    for text, expected in corpus:
+        intent, _ = router.route(text)
+        name = intent.name if intent else None
+        if name != expected:
+            errors.append((text, expected, name))
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text, _ in corpus:
+            router.route(text)
+    elapsed = time.perf_counter() - started
+    return {
+        "utterances": len(corpus),
+        "errors": errors,
+        "mean_route_us": elapsed / (repeat * len(corpus)) * 1e6,
+    }
+
+
+if __name__ == "__main__":
+    import json
+    router = build_router({spec["name"]: (lambda **slots: "") for spec in COMMAND_INTENTS})
+    print(json.dumps(benchmark_dispatch(router), ensure_ascii=False, indent=2))
@@ -0,0 +1,347 @@
+import argparse
+import datetime
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+
+from DetectionPostProcess import COCO_LABELS
+from Metrics import metrics
+
+# One entry per kept detection, stored column by column
+HISTORY_COLUMNS = {
+    "timestamp": np.float64,   # wall-clock capture time, seconds since the epoch
+    "stream": np.int8,         # index into the segment's stream names
+    "class_id": np.int16,
+    "confidence": np.float32,
+    "x": np.float32,
+    "y": np.float32,
+    "w": np.float32,
+    "h": np.float32,
+    "zone": np.int8,
+    "hazard": np.bool_,
+    "track_id": np.int32,      # -1 when the tracker had no track for the detection
+}
+DETECTION_FIELDS = ("class_id", "confidence", "x", "y", "w", "h", "zone", "hazard")
+SEGMENT_PREFIX = "history-"
+SEGMENT_SUFFIX = ".npz"
+
+
+class HistoryChunk:
+    def __init__(self, size: int):
+        """Fixed-size column arrays filled in place until full"""
+        self.size = size
+        self.columns = {name: np.empty(size, dtype=dtype) for name, dtype in HISTORY_COLUMNS.items()}
+        self.reset()
+
+    def reset(self):
+        self.rows = 0
+        self.frames = 0
+        self.started = time.monotonic()
+        # Capture times of the earliest and latest frame, including frames without detections
+        self.first = np.inf
+        self.last = -np.inf
+
+    def view(self) -> Dict[str, np.ndarray]:
+        return {name: column[:self.rows] for name, column in self.columns.items()}
+
+
+class DetectionHistory:
+    def __init__(self, directory: str, streams: Sequence[str] = ("camera",), chunk_rows: int = 8192,
+                 flush_interval: float = 60.0, max_bytes: int = 256 * 1024 * 1024, max_age_days: float = 30.0,
+                 max_pending: int = 4, logger: Optional[logging.Logger] = None):
+        """Append-only detection log: rows go into column chunks in memory, a writer thread saves full chunks
+        as compressed segment files and deletes the oldest segments past max_bytes or max_age_days"""
+        self.directory = directory
+        self.streams = list(streams)
+        self.chunk_rows = chunk_rows
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400
+        self.max_pending = max_pending
+        self.logger = logger or logging.getLogger(__name__)
+        os.makedirs(directory, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.chunk = HistoryChunk(chunk_rows)
+        # A spare chunk so the first rotation does not allocate on the frame loop
+        self.free: List[HistoryChunk] = [HistoryChunk(chunk_rows)]
+        self.pending = queue.Queue()
+        self.sequence = 0
+        # Keeps names unique across restarts within a second and processes sharing the directory
+        self.instance = uuid.uuid4().hex[:8]
+        self.stats = {"rows": 0, "frames": 0, "segments": 0, "dropped": 0, "pruned": 0}
+        self.writer = threading.Thread(target=self._write_loop, daemon=True)
+        self.writer.start()
+
+    def append(self, detections: np.ndarray, track_ids: Optional[np.ndarray] = None,
+               captured_at: Optional[float] = None, stream: int = 0):
+        """Copy one frame's detections into the open chunk; captured_at is wall-clock epoch seconds,
+        defaulting to now. Never touches the disk"""
+        now = time.monotonic()
+        captured_at = time.time() if captured_at is None else captured_at
+        count = min(len(detections), self.chunk_rows)
+        with self.lock:
+            chunk = self.chunk
+            if chunk.rows + count > chunk.size or now - chunk.started >= self.flush_interval:
+                chunk = self._rotate()
+            chunk.frames += 1
+            chunk.first = min(chunk.first, captured_at)
+            chunk.last = max(chunk.last, captured_at)
+            if count == 0:
+                return
+            start, end = chunk.rows, chunk.rows + count
+            columns = chunk.columns
+            columns["timestamp"][start:end] = captured_at
+            columns["stream"][start:end] = stream
+            for field in DETECTION_FIELDS:
+                columns[field][start:end] = detections[field][:count]
+            if track_ids is not None and len(track_ids) == len(detections):
+                columns["track_id"][start:end] = track_ids[:count]
+            else:
+                columns["track_id"][start:end] = -1
+            chunk.rows = end
+
+    def flush(self):
+        """Hand the open chunk to the writer even though it is not full"""
+        with self.lock:
+            self._rotate()
+
+    def close(self):
+        """Write what is buffered and stop the writer"""
+        self.flush()
+        self.pending.put(None)
+        self.writer.join(timeout=10.0)
+
+    def _rotate(self) -> HistoryChunk:
+        """Queue the open chunk for writing and open a recycled one; caller holds the lock"""
+        full = self.chunk
+        if full.frames:
+            if self.pending.qsize() >= self.max_pending:
+                # The disk cannot keep up; lose history rather than stall the frame loop
+                self.stats["dropped"] += full.rows
+                metrics.increment("history_dropped", full.rows)
+                full.reset()
+                return full
+            self.pending.put(full)
+            self.chunk = self.free.pop() if self.free else HistoryChunk(self.chunk_rows)
+        self.chunk.reset()
+        return self.chunk
+
+    def _write_loop(self):
+        while True:
+            try:
+                chunk = self.pending.get(timeout=self._until_due())
+            except queue.Empty:
+                # No frames may arrive for a long while, so the open chunk is aged out from here too
+                with self.lock:
+                    if time.monotonic() - self.chunk.started >= self.flush_interval:
+                        self._rotate()
+                continue
+            if chunk is None:
+                return
+            try:
+                with metrics.timer("history_write"):
+                    self._write(chunk)
+                self._prune()
+            except Exception as e:
+                self.logger.error(f"History write error: {str(e)}")
+            with self.lock:
+                if len(self.free) < 2:
+                    self.free.append(chunk)
+
+    def _until_due(self) -> float:
+        """Seconds until the open chunk is flush_interval old"""
+        with self.lock:
+            return max(self.chunk.started + self.flush_interval - time.monotonic(), 0.05)
+
+    def _write(self, chunk: HistoryChunk):
+        """Save one chunk as a segment; readers only ever see complete files"""
+        columns = chunk.view()
+        started = chunk.first if chunk.frames else time.time()
+        stamp = datetime.datetime.fromtimestamp(started).strftime("%Y%m%d-%H%M%S")
+        self.sequence += 1
+        name = f"{SEGMENT_PREFIX}{stamp}-{self.instance}-{self.sequence:06d}"
+        temporary = os.path.join(self.directory, name + ".tmp" + SEGMENT_SUFFIX)
+        np.savez_compressed(
+            temporary, frames=np.int64(chunk.frames), span=np.array([chunk.first, chunk.last]),
+            streams=np.array(self.streams), **columns
+        )
+        os.replace(temporary, os.path.join(self.directory, name + SEGMENT_SUFFIX))
+        self.stats["rows"] += chunk.rows
+        self.stats["frames"] += chunk.frames
+        self.stats["segments"] += 1
+        metrics.increment("history_rows", chunk.rows)
+
+    def _prune(self):
+        """Delete the oldest segments beyond the age and size limits"""
+        segments = list_segments(self.directory)
+        sizes = [os.path.getsize(path) for path in segments]
+        total = sum(sizes)
+        cutoff = time.time() - self.max_age
+        for path, size in zip(segments[:-1], sizes):
+            if total <= self.max_bytes and os.path.getmtime(path) >= cutoff:
+                break
+            os.remove(path)
+            total -= size
+            self.stats["pruned"] += 1
+
+
+def list_segments(directory: str) -> List[str]:
+    """Segment files oldest first"""
+    if not os.path.isdir(directory):
+        return []
+    names = sorted(
+        name for name in os.listdir(directory)
+        if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX) and ".tmp" not in name
+    )
+    return [os.path.join(directory, name) for name in names]
+
+
+class HistoryQuery:
+    def __init__(self, directory: str, labels: List[str], start: Optional[float] = None,
+                 end: Optional[float] = None, columns: Optional[Sequence[str]] = None):
+        """Load the wanted columns of the rows captured between start and end (epoch seconds).
+        frames counts every frame of each segment whose time span overlaps the window, so it is only
+        as precise as a segment, a minute of frames by default"""
+        self.labels = labels
+        wanted = ["timestamp"] + [name for name in (columns or HISTORY_COLUMNS) if name != "timestamp"]
+        parts = {name: [] for name in wanted}
+        self.frames = 0
+        self.streams: List[str] = []
+        for path in list_segments(directory):
+            with np.load(path) as segment:
+                timestamps = segment["timestamp"]
+                # Segments from before spans were saved only know the times of their detections
+                first, last = segment["span"] if "span" in segment.files else (
+                    (timestamps.min(), timestamps.max()) if len(timestamps) else (np.nan, np.nan)
+                )
+                if (start is not None or end is not None) and np.isnan(first):
+                    continue
+                if (start is not None and last < start) or (end is not None and first >= end):
+                    continue
+                keep = np.ones(len(timestamps), dtype=bool)
+                if start is not None:
+                    keep &= timestamps >= start
+                if end is not None:
+                    keep &= timestamps < end
+                self.frames += int(segment["frames"])
+                self.streams = [str(name) for name in segment["streams"]]
+                for name in wanted:
+                    parts[name].append(segment[name][keep])
+        self.columns = {
+            name: np.concatenate(arrays) if arrays else np.empty(0, dtype=HISTORY_COLUMNS[name])
+            for name, arrays in parts.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.columns["timestamp"])
+
+    def hours(self) -> np.ndarray:
+        return (self.columns["timestamp"] // 3600).astype(np.int64)
+
+    def _encounters(self, mask: np.ndarray) -> Dict[str, np.ndarray]:
+        """Rows under mask reduced to one per (hour, stream, track), keeping untracked rows as they are"""
+        hours = self.hours()[mask]
+        class_ids = self.columns["class_id"][mask].astype(np.int64)
+        track_ids = self.columns["track_id"][mask].astype(np.int64)
+        streams = self.columns["stream"][mask].astype(np.int64)
+        tracked = track_ids >= 0
+        keys = np.stack([hours[tracked], streams[tracked], track_ids[tracked], class_ids[tracked]], axis=1)
+        unique = np.unique(keys, axis=0) if len(keys) else keys.reshape(0, 4)
+        return {
+            "hour": np.concatenate([unique[:, 0], hours[~tracked]]),
+            "class_id": np.concatenate([unique[:, 3], class_ids[~tracked]]),
+        }
+
+    def counts_per_hour(self, distinct_tracks: bool = True, mask: Optional[np.ndarray] = None) -> List[Dict]:
+        """Detections per class per hour; with distinct_tracks an object followed across frames counts once"""
+        mask = np.ones(len(self), dtype=bool) if mask is None else mask
+        if distinct_tracks:
+            rows = self._encounters(mask)
+            hours, class_ids = rows["hour"], rows["class_id"]
+        else:
+            hours, class_ids = self.hours()[mask], self.columns["class_id"][mask].astype(np.int64)
+        pairs, counts = np.unique(np.stack([hours, class_ids], axis=1), axis=0, return_counts=True)
+        return [
+            {
+                "hour": datetime.datetime.fromtimestamp(int(hour) * 3600).isoformat(timespec="minutes"),
+                "label": self.labels[class_id] if 0 <= class_id < len(self.labels) else str(class_id),
+                "count": int(count),
+            }
+            for (hour, class_id), count in zip(pairs.tolist(), counts.tolist())
+        ]
+
+    def hazard_frequencies(self) -> Dict[str, Dict]:
+        """Per hazard class: detections, distinct encounters and encounters per active hour"""
+        hazard = self.columns["hazard"]
+        active_hours = max(len(np.unique(self.hours())), 1)
+        encounters = self._encounters(hazard)
+        report = {}
+        for class_id in np.unique(self.columns["class_id"][hazard]).tolist():
+            label = self.labels[class_id] if 0 <= class_id < len(self.labels) else str(class_id)
+            seen = int(np.count_nonzero(encounters["class_id"] == class_id))
+            report[label] = {
+                "detections": int(np.count_nonzero(self.columns["class_id"][hazard] == class_id)),
+                "encounters": seen,
+                "per_hour": round(seen / active_hours, 2),
+            }
+        return report
+
+    def confidence_by_class(self, percentiles: Sequence[float] = (10, 50, 90)) -> Dict[str, Dict]:
+        """Confidence spread per class, for picking per-class thresholds"""
+        class_ids = self.columns["class_id"]
+        confidence = self.columns["confidence"]
+        order = np.argsort(class_ids, kind="stable")
+        ids, starts = np.unique(class_ids[order], return_index=True)
+        report = {}
+        for class_id, group in zip(ids.tolist(), np.split(confidence[order], starts[1:])):
+            label = self.labels[class_id] if 0 <= class_id < len(self.labels) else str(class_id)
+            values = np.percentile(group, percentiles)
+            report[label] = {"count": len(group)}
+            report[label].update({f"p{int(p)}": round(float(v), 3) for p, v in zip(percentiles, values)})
+        return report
+
+    def summary(self) -> Dict:
+        """Everything above in one JSON-ready report"""
+        timestamps = self.columns["timestamp"]
+        span = [
+            datetime.datetime.fromtimestamp(value).isoformat(timespec="seconds")
+            for value in ((timestamps.min(), timestamps.max()) if len(self) else ())
+        ]
+        return {
+            "rows": len(self),
+            "frames": self.frames,
+            "streams": self.streams,
+            "first": span[0] if span else None,
+            "last": span[-1] if span else None,
+            "per_hour": self.counts_per_hour(),
+            "hazards": self.hazard_frequencies(),
+            "confidence": self.confidence_by_class(),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize the recorded detection history")
+    parser.add_argument("directory", nargs="?", default="detection_history")
+    parser.add_argument("--hours", type=float, help="only the last N hours")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    start = time.time() - args.hours * 3600 if args.hours else None
+    report = HistoryQuery(args.directory, list(COCO_LABELS), start=start).summary()
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
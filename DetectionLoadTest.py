@@ -0,0 +1,185 @@
+import argparse
+import base64
+import http.client
+import json
+import os
+import socket
+import threading
+import time
+import cv2
+import numpy as np
+from collections import Counter
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from DetectionServer import ws_send, ws_receive, ws_accept_key, WS_BINARY, WS_CLOSE
+from Metrics import summarize
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def load_payloads(source: Optional[str], limit: int = 100, size=(640, 480)) -> List[bytes]:
+    """JPEG bodies to send: images from a directory, frames of a video, or random noise frames"""
+    frames = []
+    if source is None:
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8) for _ in range(8)]
+    elif os.path.isdir(source):
+        for name in sorted(os.listdir(source))[:limit]:
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                frame = cv2.imread(os.path.join(source, name))
+                if frame is not None:
+                    frames.append(frame)
+    else:
+        cap = cv2.VideoCapture(source)
+        while len(frames) < limit:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+    if not frames:
+        raise RuntimeError(f"No frames found in {source}")
+    return [cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes() for frame in frames]
+
+
+class HttpClient:
+    def __init__(self, url: str, client_id: str):
+        """One keep-alive connection posting frames to /detect"""
+        parsed = urlparse(url)
+        self.connection = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=30)
+        self.headers = {"Content-Type": "image/jpeg", "X-Client-Id": client_id}
+
+    def send(self, payload: bytes):
+        self.connection.request("POST", "/detect", payload, self.headers)
+        response = self.connection.getresponse()
+        body = response.read()
+        return response.status, body
+
+    def close(self):
+        self.connection.close()
+
+
+class WebSocketClient:
+    def __init__(self, url: str, client_id: str):
+        """One WebSocket to /ws, sending a binary frame and waiting for its JSON answer"""
+        parsed = urlparse(url)
+        self.sock = socket.create_connection((parsed.hostname, parsed.port or 80), timeout=30)
+        self.rfile = self.sock.makefile("rb")
+        self.wfile = self.sock.makefile("wb")
+        key = base64.b64encode(os.urandom(16)).decode("ascii")
+        self.wfile.write((
+            f"GET /ws?client={client_id} HTTP/1.1\r\nHost: {parsed.hostname}\r\nUpgrade: websocket\r\n"
+            f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+        ).encode("ascii"))
+        self.wfile.flush()
+        headers = b""
+        while not headers.endswith(b"\r\n\r\n"):
+            chunk = self.rfile.read(1)
+            if not chunk:
+                raise ConnectionError("WebSocket handshake failed")
+            headers += chunk
+        if ws_accept_key(key).encode("ascii") not in headers:
+            raise ConnectionError("WebSocket handshake rejected")
+
+    def send(self, payload: bytes):
+        ws_send(self.wfile, WS_BINARY, payload, mask=True)
+        message = ws_receive(self.rfile)
+        if message is None:
+            raise ConnectionError("WebSocket closed")
+        body = message[1]
+        return json.loads(body)["status"], body
+
+    def close(self):
+        try:
+            ws_send(self.wfile, WS_CLOSE, b"", mask=True)
+        finally:
+            self.sock.close()
+
+
+def run_client(url: str, index: int, payloads: List[bytes], fps: float, deadline: float, websocket: bool,
+               results: List, lock: threading.Lock):
+    """Send frames at a fixed rate (or back to back with fps=0) until the deadline"""
+    client_class = WebSocketClient if websocket else HttpClient
+    client = client_class(url, f"load-{index}")
+    latencies, statuses = [], Counter()
+    next_send = time.monotonic()
+    sent = 0
+    try:
+        while time.monotonic() < deadline:
+            started = time.monotonic()
+            try:
+                status, _ = client.send(payloads[(index + sent) % len(payloads)])
+            except (OSError, http.client.HTTPException, ConnectionError):
+                statuses["error"] += 1
+                break
+            sent += 1
+            statuses[status] += 1
+            if status == 200:
+                latencies.append(time.monotonic() - started)
+            if fps > 0:
+                next_send += 1.0 / fps
+                delay = next_send - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    # Running behind: don't burst to catch up
+                    next_send = time.monotonic()
+    finally:
+        client.close()
+        with lock:
+            results.append((latencies, statuses))
+
+
+def run_load(url: str, clients: int, fps: float, duration: float, payloads: List[bytes],
+             websocket: bool = False) -> Dict:
+    """Drive the server with concurrent clients and report latency, throughput and rejections"""
+    results, lock = [], threading.Lock()
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=run_client, args=(url, i, payloads, fps, deadline, websocket, results, lock))
+        for i in range(clients)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    latencies = [value for client_latencies, _ in results for value in client_latencies]
+    statuses = sum((client_statuses for _, client_statuses in results), Counter())
+    return {
+        "clients": clients,
+        "transport": "websocket" if websocket else "http",
+        "target_fps_per_client": fps,
+        "elapsed_s": round(elapsed, 3),
+        "requests": sum(statuses.values()),
+        "throughput_fps": round(statuses[200] / elapsed, 2) if elapsed > 0 else 0.0,
+        "statuses": {str(status): statuses[status] for status in sorted(statuses, key=str)},
+        "latency": summarize(latencies),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test a running DetectionServer")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--source", help="video file or directory of images; random frames if omitted")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--fps", type=float, default=10.0, help="frames per second per client, 0 for back to back")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--websocket", action="store_true")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = run_load(args.url, args.clients, args.fps, args.duration, load_payloads(args.source), args.websocket)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import numpy as np
+from typing import Iterable, List, Optional
+
+ZONE_LEFT = 0
+ZONE_CENTER = 1
+ZONE_RIGHT = 2
+ZONE_NAMES = ("left", "center", "right")
+
+HAZARD_LABELS = ("car", "truck", "bicycle")
+
+# Class names in the order of the COCO-trained model's class ids
+COCO_LABELS = (
+    "person", "bicycle", "car", "motorcycle", "airplane", "bus", "train", "truck", "boat",
+    "traffic light", "fire hydrant", "stop sign", "parking meter", "bench", "bird", "cat",
+    "dog", "horse", "sheep", "cow", "elephant", "bear", "zebra", "giraffe", "backpack",
+    "umbrella", "handbag", "tie", "suitcase", "frisbee", "skis", "snowboard", "sports ball",
+    "kite", "baseball bat", "baseball glove", "skateboard", "surfboard", "tennis racket",
+    "bottle", "wine glass", "cup", "fork", "knife", "spoon", "bowl", "banana", "apple",
+    "sandwich", "orange", "broccoli", "carrot", "hot dog", "pizza", "donut", "cake", "chair",
+    "couch", "potted plant", "bed", "dining table", "toilet", "tv", "laptop", "mouse",
+    "remote", "keyboard", "cell phone", "microwave", "oven", "toaster", "sink", "refrigerator",
+    "book", "clock", "vase", "scissors", "teddy bear", "hair drier", "toothbrush"
+)
+
+# One row per kept detection; box is center x/y, width, height in frame pixels
+DETECTION_DTYPE = np.dtype([
+    ("class_id", np.int16),
+    ("confidence", np.float32),
+    ("x", np.float32),
+    ("y", np.float32),
+    ("w", np.float32),
+    ("h", np.float32),
+    ("zone", np.int8),
+    ("hazard", np.bool_),
+])
+
+
+def empty_detections() -> np.ndarray:
+    """Detection record with no rows"""
+    return np.empty(0, dtype=DETECTION_DTYPE)
+
+
+class DetectionPostProcessor:
+    def __init__(self, labels: List[str], confidence_threshold: float,
+                 hazard_labels: Iterable[str] = HAZARD_LABELS,
+                 class_filter: Optional[Iterable[str]] = None, center_band: float = 0.2):
+        """Turn raw model outputs into a detection record using whole-array operations"""
+        self.labels = labels
+        self.confidence_threshold = confidence_threshold
+        self.center_band = center_band
+
+        index = {label: i for i, label in enumerate(labels)}
+        self.hazard_mask = np.zeros(len(labels), dtype=bool)
+        self.hazard_mask[[index[label] for label in hazard_labels if label in index]] = True
+
+        if class_filter is None:
+            self.class_mask = np.ones(len(labels), dtype=bool)
+        else:
+            self.class_mask = np.zeros(len(labels), dtype=bool)
+            self.class_mask[[index[label] for label in class_filter if label in index]] = True
+
+    def process(self, result, frame_width: int) -> np.ndarray:
+        """Pull conf/cls/xywh from an ultralytics result once and build the detection record"""
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return empty_detections()
+        return self.from_arrays(
+            boxes.conf.cpu().numpy(),
+            boxes.cls.cpu().numpy(),
+            boxes.xywh.cpu().numpy(),
+            frame_width
+        )
+
+    def process_all(self, results, frame_width: int) -> np.ndarray:
+        """Merge the records of every result produced for one frame"""
+        records = [self.process(result, frame_width) for result in results]
+        if not records:
+            return empty_detections()
+        if len(records) == 1:
+            return records[0]
+        return np.concatenate(records)
+
+    def from_arrays(self, conf: np.ndarray, cls: np.ndarray, xywh: np.ndarray, frame_width: int) -> np.ndarray:
+        """Threshold, filter, flag hazards and assign zones for N detections at once"""
+        class_ids = cls.astype(np.int64, copy=False)
+        valid = (class_ids >= 0) & (class_ids < len(self.labels))
+        keep = valid & (conf > self.confidence_threshold)
+        keep[valid] &= self.class_mask[class_ids[valid]]
+
+        count = int(np.count_nonzero(keep))
+        detections = np.empty(count, dtype=DETECTION_DTYPE)
+        if count == 0:
+            return detections
+
+        class_ids = class_ids[keep]
+        boxes = xywh[keep]
+        detections["class_id"] = class_ids
+        detections["confidence"] = conf[keep]
+        detections["x"] = boxes[:, 0]
+        detections["y"] = boxes[:, 1]
+        detections["w"] = boxes[:, 2]
+        detections["h"] = boxes[:, 3]
+        detections["hazard"] = self.hazard_mask[class_ids]
+
+        half_band = frame_width * self.center_band / 2
+        edges = np.array([frame_width / 2 - half_band, frame_width / 2 + half_band], dtype=np.float32)
+        detections["zone"] = np.digitize(boxes[:, 0], edges)
+        return detections
+
+    def label_list(self, detections: np.ndarray) -> List[str]:
+        """Label names for each row of a detection record"""
+        return [self.labels[class_id] for class_id in detections["class_id"].tolist()]
@@ -0,0 +1,451 @@
+import argparse
+import base64
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+import logging
+import cv2
+import numpy as np
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+from DetectionPostProcess import DetectionPostProcessor, COCO_LABELS, ZONE_NAMES
+from InferenceBackends import select_backend
+from Metrics import metrics, PrometheusServer
+from SceneDescription import SceneState
+from TranslationCache import TranslationCache
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+WS_TEXT, WS_BINARY, WS_CLOSE, WS_PING, WS_PONG = 0x1, 0x2, 0x8, 0x9, 0xA
+MAX_MESSAGE_BYTES = 8 * 1024 * 1024
+
+
+class Overloaded(Exception):
+    """The inference queue is full; the client should back off and retry"""
+
+
+class MicroBatcher:
+    def __init__(self, detect_batch: Callable[[List[np.ndarray]], List[np.ndarray]], max_batch: int = 8,
+                 max_wait: float = 0.01, max_pending: int = 64, logger: Optional[logging.Logger] = None):
+        """Collect frames from concurrent requests into batches of up to max_batch, waiting at most
+        max_wait after the first one, with a bounded queue in front"""
+        self.detect_batch = detect_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_pending = max_pending
+        self.logger = logger or logging.getLogger(__name__)
+        self.queue = deque()
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread = None
+        self.stats = {"batches": 0, "frames": 0, "rejected": 0}
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._batch_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+
+    def submit(self, frame: np.ndarray) -> Future:
+        """Queue a frame; the Future resolves to its detection record"""
+        future = Future()
+        with self.condition:
+            if len(self.queue) >= self.max_pending:
+                self.stats["rejected"] += 1
+                metrics.increment("server_overloaded")
+                raise Overloaded(f"{len(self.queue)} frames already waiting")
+            self.queue.append((frame, future, time.monotonic()))
+            self.condition.notify_all()
+        return future
+
+    def pending(self) -> int:
+        with self.condition:
+            return len(self.queue)
+
+    def _batch_loop(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.queue or not self.running)
+                if not self.running:
+                    break
+                # The oldest frame sets the deadline; a full batch goes out at once
+                deadline = self.queue[0][2] + self.max_wait
+                while self.running and len(self.queue) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                batch = [self.queue.popleft() for _ in range(min(self.max_batch, len(self.queue)))]
+                metrics.gauge("server_queue_depth", len(self.queue))
+
+            frames = [frame for frame, _, _ in batch]
+            started = time.monotonic()
+            try:
+                results = self.detect_batch(frames)
+            except Exception as e:
+                self.logger.error(f"Inference error: {str(e)}")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            metrics.observe("server_inference", time.monotonic() - started)
+            metrics.observe("server_batch_size", len(batch))
+            self.stats["batches"] += 1
+            self.stats["frames"] += len(batch)
+            for (_, future, queued_at), detections in zip(batch, results):
+                metrics.observe("server_queue_wait", started - queued_at)
+                future.set_result(detections)
+
+        # Nothing will serve what is still queued
+        with self.condition:
+            for _, future, _ in self.queue:
+                future.set_exception(Overloaded("server stopping"))
+            self.queue.clear()
+
+
+class ClientSession:
+    def __init__(self, rate: float, burst: float, scene: SceneState):
+        """Token bucket and scene memory of one client"""
+        self.rate = rate
+        self.tokens = burst
+        self.burst = burst
+        self.updated = time.monotonic()
+        self.scene = scene
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Take one token if the client is within its rate"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+def detections_to_json(detections: np.ndarray, labels: List[str]) -> List[Dict]:
+    """Detection record as a list of plain dicts"""
+    return [
+        {
+            "label": labels[class_id], "confidence": round(confidence, 3),
+            "box": [round(x, 1), round(y, 1), round(w, 1), round(h, 1)],
+            "zone": ZONE_NAMES[zone], "hazard": hazard,
+        }
+        for class_id, confidence, x, y, w, h, zone, hazard in zip(
+            detections["class_id"].tolist(), detections["confidence"].tolist(),
+            detections["x"].tolist(), detections["y"].tolist(), detections["w"].tolist(),
+            detections["h"].tolist(), detections["zone"].tolist(), detections["hazard"].tolist()
+        )
+    ]
+
+
+def ws_accept_key(key: str) -> str:
+    return base64.b64encode(hashlib.sha1((key + WS_GUID).encode("ascii")).digest()).decode("ascii")
+
+
+def ws_send(wfile, opcode: int, payload: bytes, mask: bool = False):
+    """Write one unfragmented WebSocket frame; clients must mask, servers must not"""
+    header = bytearray([0x80 | opcode])
+    mask_bit = 0x80 if mask else 0
+    if len(payload) < 126:
+        header.append(mask_bit | len(payload))
+    elif len(payload) < 1 << 16:
+        header.append(mask_bit | 126)
+        header += struct.pack(">H", len(payload))
+    else:
+        header.append(mask_bit | 127)
+        header += struct.pack(">Q", len(payload))
+    if mask:
+        key = os.urandom(4)
+        header += key
+        payload = _apply_mask(payload, key)
+    wfile.write(bytes(header) + payload)
+    wfile.flush()
+
+
+def ws_receive(rfile, max_bytes: int = MAX_MESSAGE_BYTES,
+               on_control: Optional[Callable[[int, bytes], None]] = None) -> Optional[Tuple[int, bytes]]:
+    """Read one complete message as (opcode, payload), joining fragments; None when the peer is gone.
+    Pings and pongs go to on_control without ending the message; a close is returned at once"""
+    opcode, parts, size = None, [], 0
+    while True:
+        head = rfile.read(2)
+        if len(head) < 2:
+            return None
+        fin, frame_opcode = head[0] & 0x80, head[0] & 0x0F
+        masked, length = head[1] & 0x80, head[1] & 0x7F
+        if length == 126:
+            length = struct.unpack(">H", rfile.read(2))[0]
+        elif length == 127:
+            length = struct.unpack(">Q", rfile.read(8))[0]
+        # Control payloads are at most 125 bytes and are not part of the message
+        if frame_opcode < 0x8:
+            size += length
+        if size > max_bytes:
+            return None
+        key = rfile.read(4) if masked else None
+        payload = rfile.read(length)
+        if len(payload) < length:
+            return None
+        if key is not None:
+            payload = _apply_mask(payload, key)
+        if frame_opcode == WS_CLOSE:
+            return frame_opcode, payload
+        if frame_opcode >= 0x8:
+            # Control frames may arrive between the fragments of a message, which keeps accumulating
+            if on_control is not None:
+                on_control(frame_opcode, payload)
+            continue
+        opcode = opcode if frame_opcode == 0 else frame_opcode
+        parts.append(payload)
+        if fin:
+            return opcode, b"".join(parts)
+
+
+def _apply_mask(payload: bytes, key: bytes) -> bytes:
+    """XOR with the 4-byte key, a 32-bit word at a time"""
+    data = np.frombuffer(payload, dtype=np.uint8).copy()
+    words = len(data) // 4
+    data[:words * 4].view(np.uint32)[...] ^= np.frombuffer(key, dtype=np.uint32)[0]
+    data[words * 4:] ^= np.frombuffer(key, dtype=np.uint8)[:len(data) - words * 4]
+    return data.tobytes()
+
+
+class DetectionServer:
+    def __init__(self, backend, labels: List[str], host: str = "127.0.0.1", port: int = 8765,
+                 max_batch: int = 8, max_wait: float = 0.01, max_pending: int = 64, rate: float = 15.0,
+                 burst: float = 30.0, request_timeout: float = 5.0, session_ttl: float = 300.0,
+                 translator: Optional[TranslationCache] = None, logger: Optional[logging.Logger] = None):
+        """Headless detection service: one model shared by many clients over HTTP and WebSocket"""
+        self.backend = backend
+        self.labels = labels
+        self.logger = logger or logging.getLogger(__name__)
+        self.batcher = MicroBatcher(backend.detect_batch, max_batch, max_wait, max_pending, self.logger)
+        self.rate = rate
+        self.burst = burst
+        self.request_timeout = request_timeout
+        self.session_ttl = session_ttl
+        self.translator = translator or TranslationCache(logger=self.logger)
+        self.sessions: Dict[Tuple[str, str], ClientSession] = {}
+        self.sessions_lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def start(self):
+        self.batcher.start()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.logger.info(f"Detection server listening on port {self.port}")
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.batcher.stop()
+        self.translator.close()
+
+    def session(self, client_id: str, language: str) -> ClientSession:
+        """The client's session, created on first use; sessions idle for session_ttl are dropped"""
+        key = (client_id, language)
+        with self.sessions_lock:
+            session = self.sessions.get(key)
+            if session is None:
+                now = time.monotonic()
+                for stale in [k for k, s in self.sessions.items() if now - s.updated > self.session_ttl]:
+                    del self.sessions[stale]
+                scene = SceneState(self.labels, self.translator, language,
+                                   hazard_mask=self.backend.postprocessor.hazard_mask)
+                session = self.sessions[key] = ClientSession(self.rate, self.burst, scene)
+            return session
+
+    def handle_frame(self, client_id: str, payload: bytes, language: str = "en") -> Tuple[int, Dict]:
+        """Detect objects in one JPEG and describe what changed for this client; returns (status, body)"""
+        started = time.monotonic()
+        metrics.increment("server_requests")
+        session = self.session(client_id, language)
+        if not session.allow():
+            metrics.increment("server_rate_limited")
+            return 429, {"error": "rate limit exceeded", "retry_after": round(1 / self.rate, 3)}
+
+        frame = cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            return 400, {"error": "body is not a decodable image"}
+        try:
+            detections = self.batcher.submit(frame).result(timeout=self.request_timeout)
+        except Overloaded as e:
+            return 503, {"error": f"overloaded: {str(e)}", "retry_after": round(self.batcher.max_wait * 4, 3)}
+        except FutureTimeout:
+            return 504, {"error": "inference timed out"}
+        except Exception as e:
+            return 500, {"error": str(e)}
+
+        with session.lock:
+            announcement = session.scene.update(detections)
+        latency = time.monotonic() - started
+        metrics.observe("server_latency", latency)
+        return 200, {
+            "detections": detections_to_json(detections, self.labels),
+            "announcement": announcement,
+            "latency_ms": round(latency * 1000, 2),
+        }
+
+    def health(self) -> Dict:
+        return {
+            "status": "ok", "backend": self.backend.name, "pending": self.batcher.pending(),
+            "clients": len(self.sessions), **self.batcher.stats,
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, so a client can stream frames over one connection
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == "/health":
+                    self.send_json(200, server.health())
+                elif url.path == "/ws" and self.headers.get("Upgrade", "").lower() == "websocket":
+                    self.serve_websocket(parse_qs(url.query))
+                else:
+                    self.send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                if url.path != "/detect":
+                    self.send_json(404, {"error": "not found"})
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                if length > MAX_MESSAGE_BYTES:
+                    self.send_json(413, {"error": "frame too large"})
+                    self.close_connection = True
+                    return
+                payload = self.rfile.read(length)
+                query = parse_qs(url.query)
+                status, body = server.handle_frame(
+                    self.client_id(query), payload, query.get("lang", ["en"])[0]
+                )
+                self.send_json(status, body)
+
+            def client_id(self, query) -> str:
+                """The id the client sent, else its connection, so clients sharing an address stay apart"""
+                anonymous = f"{self.client_address[0]}:{self.client_address[1]}"
+                return self.headers.get("X-Client-Id") or query.get("client", [anonymous])[0]
+
+            def send_json(self, status: int, body: Dict):
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                if "retry_after" in body:
+                    self.send_header("Retry-After", str(max(1, int(np.ceil(body["retry_after"])))))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def serve_websocket(self, query):
+                """Binary messages carry JPEG frames; each is answered with one JSON text message"""
+                self.send_response(101)
+                self.send_header("Upgrade", "websocket")
+                self.send_header("Connection", "Upgrade")
+                self.send_header("Sec-WebSocket-Accept", ws_accept_key(self.headers["Sec-WebSocket-Key"]))
+                self.end_headers()
+                self.wfile.flush()
+                self.close_connection = True
+
+                client_id = self.client_id(query)
+                language = query.get("lang", ["en"])[0]
+                def answer_ping(opcode, payload):
+                    if opcode == WS_PING:
+                        ws_send(self.wfile, WS_PONG, payload)
+
+                while True:
+                    message = ws_receive(self.rfile, on_control=answer_ping)
+                    if message is None:
+                        return
+                    opcode, payload = message
+                    if opcode == WS_CLOSE:
+                        ws_send(self.wfile, WS_CLOSE, payload[:2])
+                        return
+                    if opcode != WS_BINARY:
+                        continue
+                    status, body = server.handle_frame(client_id, payload, language)
+                    body["status"] = status
+                    ws_send(self.wfile, WS_TEXT, json.dumps(body, ensure_ascii=False).encode("utf-8"))
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve object detection to thin clients over HTTP and WebSocket")
+    parser.add_argument("--model", default="yolov8n.pt")
+    parser.add_argument("--backend", default="auto", help="auto, torch, onnx or openvino")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--int8", action="store_true")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--conf", type=float, default=0.3)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=10.0)
+    parser.add_argument("--max-pending", type=int, default=64, help="queued frames before answering 503")
+    parser.add_argument("--rate", type=float, default=15.0, help="frames per second allowed per client")
+    parser.add_argument("--burst", type=float, default=30.0)
+    parser.add_argument("--metrics-port", type=int, default=None, help="also serve Prometheus metrics")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    logger = logging.getLogger("DetectionServer")
+    labels = list(COCO_LABELS)
+    postprocessor = DetectionPostProcessor(labels, args.conf)
+    backend = select_backend(
+        args.model, postprocessor, preferred=args.backend, imgsz=args.imgsz, int8=args.int8,
+        threads=args.threads, logger=logger, batch=args.max_batch
+    )
+    backend.warmup()
+
+    exporter = None
+    if args.metrics_port:
+        metrics.set_enabled(True)
+        exporter = PrometheusServer(args.metrics_port)
+        exporter.start()
+
+    server = DetectionServer(
+        backend, labels, args.host, args.port, args.max_batch, args.max_wait_ms / 1000, args.max_pending,
+        args.rate, args.burst, logger=logger
+    )
+    server.start()
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        backend.close()
+        if exporter is not None:
+            exporter.stop()
+
+
+if __name__ == "__main__":
+    main()
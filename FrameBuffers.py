@@ -0,0 +1,130 @@
+import threading
+import cv2
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from Metrics import metrics
+
+NORMALIZE_SCALE = np.float32(1.0 / 255.0)
+
+
+def read_into(cap, buffer: Optional[np.ndarray]):
+    """cap.read() decoding straight into buffer when the capture can; returns (ret, frame)"""
+    if buffer is None:
+        return cap.read()
+    return cap.read(buffer)
+
+
+class FramePool:
+    def __init__(self, size: int = 3):
+        """Recycled frame-sized arrays so capture stops allocating a new image per frame"""
+        # One frame being captured, one waiting for inference and one being inferred
+        self.size = size
+        self.lock = threading.Lock()
+        self.free: List[np.ndarray] = []
+        self.shape: Optional[Tuple[int, ...]] = None
+        self.dtype = np.uint8
+        self.live = 0
+        self.allocations = 0
+        self.reuses = 0
+
+    def acquire(self) -> Optional[np.ndarray]:
+        """A free buffer of the current frame shape, or None until the first frame has been seen"""
+        with self.lock:
+            if self.free:
+                return self.free.pop()
+            if self.shape is None:
+                return None
+            self._allocated()
+        return np.empty(self.shape, dtype=self.dtype)
+
+    def adopt(self, buffer: Optional[np.ndarray], frame: np.ndarray):
+        """Account for a read that did not land in buffer: the capture allocated frame itself"""
+        with self.lock:
+            if frame is buffer:
+                self.reuses += 1
+                return
+            if buffer is not None:
+                self.live -= 1
+            if frame.shape != self.shape or frame.dtype != self.dtype:
+                # Resolution changed, so the recycled buffers no longer fit
+                self.live -= len(self.free)
+                self.free.clear()
+                self.shape, self.dtype = frame.shape, frame.dtype
+            self._allocated()
+
+    def release(self, buffer: Optional[np.ndarray]):
+        """Return a buffer once nothing reads from it any more"""
+        if buffer is None:
+            return
+        with self.lock:
+            if any(item is buffer for item in self.free):
+                return
+            if buffer.shape == self.shape and buffer.dtype == self.dtype and len(self.free) < self.size:
+                self.free.append(buffer)
+            else:
+                self.live -= 1
+            metrics.gauge("frame_buffers", self.live)
+
+    def stats(self) -> Dict[str, int]:
+        """Buffer count, footprint and how many reads were served without allocating"""
+        with self.lock:
+            frame_bytes = int(np.prod(self.shape)) * np.dtype(self.dtype).itemsize if self.shape else 0
+            return {
+                "buffers": self.live,
+                "free": len(self.free),
+                "bytes": self.live * frame_bytes,
+                "allocations": self.allocations,
+                "reuses": self.reuses,
+            }
+
+    def _allocated(self):
+        self.live += 1
+        self.allocations += 1
+        metrics.increment("frame_allocations")
+        metrics.gauge("frame_buffers", self.live)
+
+
+class PreprocessBuffers:
+    def __init__(self, imgsz: int, color: int = 114):
+        """Letterbox canvas and NCHW float blob reused across frames instead of reallocated per call"""
+        self.imgsz = imgsz
+        self.color = color
+        self.canvas = np.full((imgsz, imgsz, 3), color, dtype=np.uint8)
+        self.geometry = None
+        self.batch = np.empty((1, 3, imgsz, imgsz), dtype=np.float32)
+        self.allocations = 2
+
+    def letterbox(self, frame: np.ndarray) -> Tuple[np.ndarray, float, int, int]:
+        """Resize into the shared canvas keeping aspect ratio; returns (canvas, scale, pad_x, pad_y)"""
+        height, width = frame.shape[:2]
+        scale = min(self.imgsz / height, self.imgsz / width)
+        new_width, new_height = int(round(width * scale)), int(round(height * scale))
+        pad_x, pad_y = (self.imgsz - new_width) // 2, (self.imgsz - new_height) // 2
+
+        # The padding only needs repainting when the frame geometry changes
+        geometry = (new_width, new_height, pad_x, pad_y)
+        if geometry != self.geometry:
+            self.canvas[...] = self.color
+            self.geometry = geometry
+        cv2.resize(
+            frame, (new_width, new_height), dst=self.canvas[pad_y:pad_y + new_height, pad_x:pad_x + new_width],
+            interpolation=cv2.INTER_LINEAR
+        )
+        return self.canvas, scale, pad_x, pad_y
+
+    def blob(self, count: int) -> np.ndarray:
+        """The first count slots of the (N, 3, imgsz, imgsz) input blob, grown only when a larger batch arrives"""
+        if count > len(self.batch):
+            self.batch = np.empty((count, 3, self.imgsz, self.imgsz), dtype=np.float32)
+            self.allocations += 1
+            metrics.increment("preprocess_allocations")
+        return self.batch[:count]
+
+    def normalize(self, image: np.ndarray, out: np.ndarray):
+        """BGR uint8 HWC to RGB float CHW in [0, 1], written straight into one blob slot"""
+        for channel in range(3):
+            np.multiply(image[:, :, 2 - channel], NORMALIZE_SCALE, out=out[channel], dtype=np.float32)
+
+    def stats(self) -> Dict[str, int]:
+        return {"bytes": self.canvas.nbytes + self.batch.nbytes, "allocations": self.allocations}
@@ -0,0 +1,323 @@
+import threading
+import time
+import logging
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from FrameBuffers import FramePool, read_into
+from Metrics import metrics
+
+
+class DropOldestQueue:
+    def __init__(self, maxsize: int = 1):
+        """Bounded queue that discards the oldest item when a new one arrives while full"""
+        self.items = deque()
+        self.maxsize = maxsize
+        self.condition = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item):
+        """Add an item, dropping the oldest pending item if the queue is full"""
+        with self.condition:
+            if len(self.items) >= self.maxsize:
+                self.items.popleft()
+                self.dropped += 1
+                metrics.increment("results_dropped")
+            self.items.append(item)
+            self.condition.notify()
+
+    def get(self, timeout: Optional[float] = None):
+        """Return the oldest pending item, or None if nothing arrived before the timeout"""
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.items, timeout):
+                return None
+            return self.items.popleft()
+
+    def clear(self):
+        """Discard all pending items"""
+        with self.condition:
+            self.items.clear()
+
+    def __len__(self):
+        return len(self.items)
+
+
+class FrameGrabber:
+    def __init__(self, cap, logger: Optional[logging.Logger] = None,
+                 condition: Optional[threading.Condition] = None, pool: Optional[FramePool] = None):
+        """Capture thread that continuously drains the camera and keeps only the newest frame"""
+        self.cap = cap
+        # Frames are decoded into recycled buffers; whoever takes a frame hands it back with release()
+        self.pool = pool or FramePool()
+        self.logger = logger or logging.getLogger(__name__)
+        # Grabbers may share one condition so a consumer can wait for any of them
+        self.condition = condition or threading.Condition()
+        self.frame = None
+        self.frame_id = 0
+        self.consumed_id = 0
+        self.timestamp = 0.0
+        self.dropped_frames = 0
+        self.failed = False
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        """Start the capture thread"""
+        self.running = True
+        self.thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the capture thread"""
+        self.running = False
+        with self.condition:
+            self.condition.notify_all()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=1.0)
+
+    def _capture_loop(self):
+        """Read frames as fast as the camera delivers them"""
+        while self.running:
+            buffer = self.pool.acquire()
+            with metrics.timer("capture"):
+                ret, frame = read_into(self.cap, buffer)
+            if not ret:
+                self.pool.release(buffer)
+                self.logger.error("Failed to read frame")
+                with self.condition:
+                    self.failed = True
+                    self.condition.notify_all()
+                return
+            self.pool.adopt(buffer, frame)
+
+            with self.condition:
+                if self.frame_id > self.consumed_id:
+                    self.dropped_frames += 1
+                    metrics.increment("frames_dropped")
+                    # Nobody took the stale frame, so its buffer is free again
+                    self.pool.release(self.frame)
+                self.frame = frame
+                self.frame_id += 1
+                self.timestamp = time.monotonic()
+                self.condition.notify_all()
+
+    def read_latest(self, last_id: int, timeout: float = 1.0) -> Optional[Tuple[int, float, Any]]:
+        """Wait for a frame newer than last_id and return (frame_id, timestamp, frame)"""
+        with self.condition:
+            self.condition.wait_for(
+                lambda: self.frame_id > last_id or self.failed or not self.running,
+                timeout
+            )
+            if self.frame_id <= last_id:
+                return None
+            self.consumed_id = self.frame_id
+            return self.frame_id, self.timestamp, self.frame
+
+    def release(self, frame):
+        """Give back a frame returned by read_latest() once it has been fully used"""
+        self.pool.release(frame)
+
+
+class DetectionPipeline:
+    def __init__(self, cap, detect: Callable[[Any], Any], announce: Callable[[Any, float], None],
+                 logger: Optional[logging.Logger] = None, result_queue_size: int = 1, scheduler=None,
+                 latency_observer: Optional[Callable[[float], None]] = None):
+        """Capture, inference and announcement stages connected by bounded drop-oldest queues"""
+        self.logger = logger or logging.getLogger(__name__)
+        self.grabber = FrameGrabber(cap, self.logger)
+        self.detect = detect
+        self.announce = announce
+        self.scheduler = scheduler
+        self.latency_observer = latency_observer
+        self.results = DropOldestQueue(result_queue_size)
+        self.running = False
+        self.threads = []
+
+    @property
+    def failed(self) -> bool:
+        """True once the camera stopped delivering frames"""
+        return self.grabber.failed
+
+    def start(self):
+        """Start capture, inference and announcement workers"""
+        self.running = True
+        self.grabber.start()
+        for target in (self._inference_loop, self._announcement_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self):
+        """Stop all workers"""
+        self.running = False
+        self.grabber.stop()
+        for thread in self.threads:
+            thread.join(timeout=1.0)
+        self.threads = []
+
+    def _inference_loop(self):
+        """Run detection on the newest frame, skipping any that went stale meanwhile"""
+        last_id = 0
+        while self.running:
+            item = self.grabber.read_latest(last_id, timeout=0.5)
+            if item is None:
+                if self.grabber.failed:
+                    self.running = False
+                continue
+
+            last_id, timestamp, frame = item
+            try:
+                # Static scenes keep the previous detections instead of running the model again
+                if self.scheduler is not None and not self.scheduler.should_infer(frame, timestamp):
+                    metrics.increment("frames_reused")
+                    continue
+
+                started = time.monotonic()
+                detections = self.detect(frame)
+            except Exception as e:
+                self.logger.error(f"Inference error: {str(e)}")
+                continue
+            finally:
+                self.grabber.release(frame)
+            duration = time.monotonic() - started
+            metrics.observe("detect", duration)
+            if self.scheduler is not None:
+                self.scheduler.record_inference(duration)
+            self.results.put((timestamp, detections))
+            metrics.gauge("results_queue_depth", len(self.results))
+
+    def _announcement_loop(self):
+        """Hand the freshest detection result to the announcer"""
+        while self.running:
+            item = self.results.get(timeout=0.5)
+            if item is None:
+                continue
+
+            timestamp, detections = item
+            try:
+                with metrics.timer("announcement"):
+                    self.announce(detections, timestamp)
+            except Exception as e:
+                self.logger.error(f"Announcement error: {str(e)}")
+            # Capture to announcement decision, the vision part of a hazard warning's latency
+            latency = time.monotonic() - timestamp
+            metrics.observe("frame_latency", latency)
+            if self.latency_observer:
+                self.latency_observer(latency)
+
+
+
+class MultiStreamPipeline:
+    def __init__(self, caps: Dict[str, Any], detect_batch: Callable[[List[Any]], List[Any]],
+                 announce: Callable[[str, Any, float], None], logger: Optional[logging.Logger] = None,
+                 result_queue_size: int = 1, schedulers: Optional[Dict[str, Any]] = None,
+                 latency_observer: Optional[Callable[[float], None]] = None):
+        """Several captures feeding one batched inference worker, with results routed back per source"""
+        self.logger = logger or logging.getLogger(__name__)
+        self.condition = threading.Condition()
+        self.grabbers = {name: FrameGrabber(cap, self.logger, self.condition) for name, cap in caps.items()}
+        self.detect_batch = detect_batch
+        self.announce = announce
+        self.schedulers = schedulers or {}
+        self.latency_observer = latency_observer
+        self.results = {name: DropOldestQueue(result_queue_size) for name in caps}
+        self.running = False
+        self.threads = []
+
+    @property
+    def failed(self) -> bool:
+        """True once every source stopped delivering frames"""
+        return all(grabber.failed for grabber in self.grabbers.values())
+
+    def start(self):
+        """Start one capture worker per source, the inference worker and one announcer per source"""
+        self.running = True
+        for grabber in self.grabbers.values():
+            grabber.start()
+        targets = [(self._inference_loop, ())]
+        targets += [(self._announcement_loop, (name,)) for name in self.results]
+        for target, args in targets:
+            thread = threading.Thread(target=target, args=args, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self):
+        """Stop all workers"""
+        self.running = False
+        for grabber in self.grabbers.values():
+            grabber.stop()
+        for thread in self.threads:
+            thread.join(timeout=1.0)
+        self.threads = []
+
+    def _inference_loop(self):
+        """Each tick, batch the newest unseen frame of every source into one detector call"""
+        last_ids = {name: 0 for name in self.grabbers}
+
+        def has_new_frame():
+            return not self.running or self.failed or any(
+                grabber.frame_id > last_ids[name] for name, grabber in self.grabbers.items()
+            )
+
+        while self.running:
+            with self.condition:
+                self.condition.wait_for(has_new_frame, 0.5)
+            if self.failed:
+                self.running = False
+                break
+
+            names, timestamps, frames = [], [], []
+            for name, grabber in self.grabbers.items():
+                item = grabber.read_latest(last_ids[name], timeout=0)
+                if item is None:
+                    continue
+                last_ids[name], timestamp, frame = item
+                scheduler = self.schedulers.get(name)
+                if scheduler is not None and not scheduler.should_infer(frame, timestamp):
+                    metrics.increment("frames_reused")
+                    grabber.release(frame)
+                    continue
+                names.append(name)
+                timestamps.append(timestamp)
+                frames.append(frame)
+            if not frames:
+                continue
+
+            started = time.monotonic()
+            try:
+                batch = self.detect_batch(frames)
+            except Exception as e:
+                self.logger.error(f"Inference error: {str(e)}")
+                continue
+            finally:
+                for name, frame in zip(names, frames):
+                    self.grabbers[name].release(frame)
+            duration = time.monotonic() - started
+            metrics.observe("detect", duration)
+            metrics.gauge("batch_size", len(frames))
+
+            for name, timestamp, detections in zip(names, timestamps, batch):
+                scheduler = self.schedulers.get(name)
+                if scheduler is not None:
+                    # Each source is charged its share of the batch
+                    scheduler.record_inference(duration / len(frames))
+                self.results[name].put((timestamp, detections))
+
+    def _announcement_loop(self, name: str):
+        """Hand the freshest detection result of one source to the announcer"""
+        results = self.results[name]
+        while self.running:
+            item = results.get(timeout=0.5)
+            if item is None:
+                continue
+
+            timestamp, detections = item
+            try:
+                with metrics.timer("announcement"):
+                    self.announce(name, detections, timestamp)
+            except Exception as e:
+                self.logger.error(f"Announcement error ({name}): {str(e)}")
+            latency = time.monotonic() - timestamp
+            metrics.observe("frame_latency", latency)
+            if self.latency_observer:
+                self.latency_observer(latency)
@@ -0,0 +1,277 @@
+import os
+import time
+import logging
+import cv2
+import numpy as np
+from typing import List, Optional
+
+from DetectionPostProcess import DetectionPostProcessor, empty_detections
+from FrameBuffers import PreprocessBuffers
+
+
+def nms_indices(boxes: np.ndarray, confidences: np.ndarray, class_ids: np.ndarray,
+                score_threshold: float, nms_threshold: float) -> np.ndarray:
+    """Indices kept by class-aware NMS over center/size boxes"""
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int64)
+    # Offset each class into its own coordinate range so boxes of different classes never suppress each other;
+    # the range spans every box, however large the frame or tile
+    top_left = boxes[:, :2] - boxes[:, 2:4] / 2
+    offset = float((top_left + boxes[:, 2:4]).max() - top_left.min()) + 1.0
+    rects = np.hstack([top_left + class_ids[:, None] * offset, boxes[:, 2:4]])
+    selected = cv2.dnn.NMSBoxes(rects.tolist(), confidences.tolist(), score_threshold, nms_threshold)
+    return np.asarray(selected, dtype=np.int64).reshape(-1)
+
+
+class InferenceBackend:
+    name = "base"
+
+    def __init__(self, model_path: str, postprocessor: DetectionPostProcessor, imgsz: int = 640,
+                 threads: Optional[int] = None, logger: Optional[logging.Logger] = None, batch: int = 1):
+        """Common interface: frame in, detection record out"""
+        self.model_path = model_path
+        self.postprocessor = postprocessor
+        self.imgsz = imgsz
+        self.threads = threads
+        self.batch = batch
+        self.logger = logger or logging.getLogger(__name__)
+        # Seconds spent in each stage of the most recent detect() call
+        self.timings = {"preprocess": 0.0, "inference": 0.0, "postprocess": 0.0}
+
+    def detect(self, frame: np.ndarray) -> np.ndarray:
+        """Run the model on a BGR frame and return a detection record"""
+        raise NotImplementedError
+
+    def detect_batch(self, frames: List[np.ndarray]) -> List[np.ndarray]:
+        """Run the model on several frames, one detection record per frame"""
+        return [self.detect(frame) for frame in frames]
+
+    def warmup(self, runs: int = 1) -> float:
+        """Run dummy frames through the model; returns the mean time of the timed runs"""
+        dummies = [np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8)] * self.batch
+        self.detect_batch(dummies)
+        started = time.perf_counter()
+        for _ in range(runs):
+            self.detect_batch(dummies)
+        return (time.perf_counter() - started) / max(runs, 1)
+
+    def close(self):
+        """Release model resources"""
+
+
+class TorchBackend(InferenceBackend):
+    name = "torch"
+
+    def __init__(self, *args, **kwargs):
+        """ultralytics YOLO running on PyTorch"""
+        super().__init__(*args, **kwargs)
+        from ultralytics import YOLO
+        if self.threads:
+            import torch
+            torch.set_num_threads(self.threads)
+        self.model = YOLO(self.model_path)
+
+    def detect(self, frame: np.ndarray) -> np.ndarray:
+        results = list(self.model(frame, imgsz=self.imgsz, stream=True, verbose=False))
+        started = time.perf_counter()
+        detections = self.postprocessor.process_all(results, frame.shape[1])
+        finished = time.perf_counter()
+
+        # ultralytics reports its own per-stage speed in milliseconds
+        speed = results[0].speed if results else {}
+        self.timings["preprocess"] = speed.get("preprocess", 0.0) / 1000
+        self.timings["inference"] = speed.get("inference", 0.0) / 1000
+        self.timings["postprocess"] = speed.get("postprocess", 0.0) / 1000 + (finished - started)
+        return detections
+
+    def detect_batch(self, frames: List[np.ndarray]) -> List[np.ndarray]:
+        """One model call for all frames"""
+        if len(frames) == 1:
+            return [self.detect(frames[0])]
+        results = self.model(frames, imgsz=self.imgsz, verbose=False)
+        started = time.perf_counter()
+        detections = [
+            self.postprocessor.process(result, frame.shape[1]) for result, frame in zip(results, frames)
+        ]
+        finished = time.perf_counter()
+
+        # Per-image speeds, so scale them up to the whole batch
+        speed = results[0].speed if results else {}
+        self.timings["preprocess"] = speed.get("preprocess", 0.0) * len(frames) / 1000
+        self.timings["inference"] = speed.get("inference", 0.0) * len(frames) / 1000
+        self.timings["postprocess"] = speed.get("postprocess", 0.0) * len(frames) / 1000 + (finished - started)
+        return detections
+
+
+class OpenVinoBackend(TorchBackend):
+    name = "openvino"
+
+    def __init__(self, model_path: str, *args, int8: bool = False, **kwargs):
+        """OpenVINO export of the model, loaded back through ultralytics"""
+        imgsz, dynamic = kwargs.get("imgsz", 640), kwargs.get("batch", 1) > 1
+        export_dir = exported_model_path(model_path, "openvino", imgsz, int8, dynamic)
+        if not os.path.isdir(export_dir):
+            from ultralytics import YOLO
+            exported = YOLO(model_path).export(format="openvino", imgsz=imgsz, int8=int8, dynamic=dynamic)
+            os.replace(exported, export_dir)
+        super().__init__(export_dir, *args, **kwargs)
+
+
+class OnnxBackend(InferenceBackend):
+    name = "onnx"
+
+    def __init__(self, *args, int8: bool = False, **kwargs):
+        """ONNX Runtime session on an exported (and optionally int8-quantized) copy of the model"""
+        super().__init__(*args, **kwargs)
+        import onnxruntime as ort
+
+        onnx_path = self.ensure_exported(int8)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.threads:
+            options.intra_op_num_threads = self.threads
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.nms_threshold = 0.45
+        # Only a dynamic-batch export can take several frames in one run
+        self.batched = not isinstance(self.session.get_inputs()[0].shape[0], int)
+        self.buffers = PreprocessBuffers(self.imgsz)
+
+    def ensure_exported(self, int8: bool) -> str:
+        """Export to ONNX once per input size and keep the file next to the weights"""
+        dynamic = self.batch > 1
+        onnx_path = exported_model_path(self.model_path, "onnx", self.imgsz, False, dynamic)
+        if not os.path.exists(onnx_path):
+            from ultralytics import YOLO
+            self.logger.info(f"Exporting {self.model_path} to ONNX at {self.imgsz}px")
+            exported = YOLO(self.model_path).export(format="onnx", imgsz=self.imgsz, dynamic=dynamic)
+            os.replace(exported, onnx_path)
+
+        if not int8:
+            return onnx_path
+
+        quantized_path = exported_model_path(self.model_path, "onnx", self.imgsz, True, dynamic)
+        if not os.path.exists(quantized_path):
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+            self.logger.info(f"Quantizing {onnx_path} to int8")
+            quantize_dynamic(onnx_path, quantized_path, weight_type=QuantType.QUInt8)
+        return quantized_path
+
+    def preprocess(self, frames: List[np.ndarray]):
+        """Letterbox, BGR to RGB, scale to [0, 1] and lay out as NCHW, all inside the reused input blob"""
+        blob = self.buffers.blob(len(frames))
+        geometry = []
+        for slot, frame in zip(blob, frames):
+            image, scale, pad_x, pad_y = self.buffers.letterbox(frame)
+            self.buffers.normalize(image, slot)
+            geometry.append((scale, pad_x, pad_y))
+        return blob, geometry
+
+    def detect(self, frame: np.ndarray) -> np.ndarray:
+        return self.detect_batch([frame])[0]
+
+    def detect_batch(self, frames: List[np.ndarray]) -> List[np.ndarray]:
+        """Letterbox the frames into one NCHW blob and run the session once"""
+        if len(frames) > 1 and not self.batched:
+            return [self.detect(frame) for frame in frames]
+        started = time.perf_counter()
+        blob, geometry = self.preprocess(frames)
+        preprocessed = time.perf_counter()
+        output = self.session.run(None, {self.input_name: blob})[0]
+        inferred = time.perf_counter()
+        detections = [
+            self.decode(output[i:i + 1], scale, pad_x, pad_y, frame.shape[1])
+            for i, ((scale, pad_x, pad_y), frame) in enumerate(zip(geometry, frames))
+        ]
+
+        self.timings["preprocess"] = preprocessed - started
+        self.timings["inference"] = inferred - preprocessed
+        self.timings["postprocess"] = time.perf_counter() - inferred
+        return detections
+
+    def decode(self, output: np.ndarray, scale: float, pad_x: int, pad_y: int, frame_width: int) -> np.ndarray:
+        """Turn the raw (1, 4 + classes, anchors) YOLOv8 head into a detection record"""
+        predictions = output[0].T
+        scores = predictions[:, 4:]
+        class_ids = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(scores)), class_ids]
+
+        keep = confidences > self.postprocessor.confidence_threshold
+        if not np.any(keep):
+            return empty_detections()
+        boxes = predictions[keep, :4].copy()
+        confidences = confidences[keep]
+        class_ids = class_ids[keep]
+
+        selected = nms_indices(
+            boxes, confidences, class_ids, self.postprocessor.confidence_threshold, self.nms_threshold
+        )
+
+        boxes = boxes[selected]
+        boxes[:, 0] = (boxes[:, 0] - pad_x) / scale
+        boxes[:, 1] = (boxes[:, 1] - pad_y) / scale
+        boxes[:, 2:4] /= scale
+        return self.postprocessor.from_arrays(
+            confidences[selected], class_ids[selected], boxes, frame_width
+        )
+
+    def close(self):
+        self.session = None
+
+
+BACKENDS = {
+    TorchBackend.name: TorchBackend,
+    OnnxBackend.name: OnnxBackend,
+    OpenVinoBackend.name: OpenVinoBackend,
+}
+
+
+def exported_model_path(model_path: str, fmt: str, imgsz: int, int8: bool, dynamic: bool = False) -> str:
+    """Cache location of an exported model for a given format, input size, precision and batch layout"""
+    stem, _ = os.path.splitext(model_path)
+    suffix = f"_{imgsz}" + ("_int8" if int8 else "") + ("_dynamic" if dynamic else "")
+    return f"{stem}{suffix}.onnx" if fmt == "onnx" else f"{stem}{suffix}_{fmt}_model"
+
+
+def create_backend(name: str, model_path: str, postprocessor: DetectionPostProcessor, imgsz: int = 640,
+                   int8: bool = False, threads: Optional[int] = None,
+                   logger: Optional[logging.Logger] = None, batch: int = 1) -> InferenceBackend:
+    """Instantiate a backend by name"""
+    backend_class = BACKENDS[name]
+    if backend_class is TorchBackend:
+        return backend_class(model_path, postprocessor, imgsz=imgsz, threads=threads, logger=logger, batch=batch)
+    return backend_class(
+        model_path, postprocessor, imgsz=imgsz, threads=threads, logger=logger, batch=batch, int8=int8
+    )
+
+
+def select_backend(model_path: str, postprocessor: DetectionPostProcessor, preferred: str = "auto",
+                   imgsz: int = 640, int8: bool = False, threads: Optional[int] = None,
+                   candidates: Optional[List[str]] = None,
+                   logger: Optional[logging.Logger] = None, batch: int = 1) -> InferenceBackend:
+    """Return the requested backend, or with "auto" time every available one and keep the fastest"""
+    logger = logger or logging.getLogger(__name__)
+    if preferred != "auto":
+        return create_backend(preferred, model_path, postprocessor, imgsz, int8, threads, logger, batch)
+
+    best, best_time = None, float("inf")
+    for name in candidates or [OnnxBackend.name, OpenVinoBackend.name, TorchBackend.name]:
+        try:
+            backend = create_backend(name, model_path, postprocessor, imgsz, int8, threads, logger, batch)
+            elapsed = backend.warmup(runs=3)
+        except Exception as e:
+            logger.info(f"Backend {name} unavailable: {str(e)}")
+            continue
+
+        logger.info(f"Backend {name}: {elapsed * 1000:.1f} ms per batch of {batch} at {imgsz}px")
+        if elapsed < best_time:
+            if best is not None:
+                best.close()
+            best, best_time = backend, elapsed
+        else:
+            backend.close()
+
+    if best is None:
+        raise RuntimeError("No inference backend could be loaded")
+    logger.info(f"Using {best.name} inference backend")
+    return best
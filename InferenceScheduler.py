@@ -0,0 +1,80 @@
+import time
+import cv2
+from typing import Optional, Tuple
+
+
+class InferenceScheduler:
+    def __init__(self, min_fps: float = 1.0, max_fps: float = 10.0, motion_threshold: float = 6.0,
+                 boost_seconds: float = 2.0, cpu_budget: float = 0.6,
+                 thumbnail_size: Tuple[int, int] = (64, 48)):
+        """Decide per frame whether to run the detector or keep the last detections, based on motion"""
+        self.min_fps = min_fps
+        self.max_fps = max_fps
+        self.motion_threshold = motion_threshold
+        self.boost_seconds = boost_seconds
+        self.cpu_budget = cpu_budget
+        self.thumbnail_size = thumbnail_size
+
+        self.reference = None
+        self.candidate = None
+        self.last_inference = float("-inf")
+        self.boost_until = float("-inf")
+        self.inference_time = 0.0
+        self.last_motion = 0.0
+        self.stats = {"inferred": 0, "reused": 0, "boosts": 0}
+
+    def thumbnail(self, frame):
+        """Small grayscale copy used for cheap frame differencing"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        return cv2.resize(gray, self.thumbnail_size, interpolation=cv2.INTER_AREA)
+
+    def motion_score(self, thumb) -> float:
+        """Mean absolute difference to the last frame that went through the detector"""
+        if self.reference is None:
+            return float("inf")
+        return float(cv2.absdiff(thumb, self.reference).mean())
+
+    def max_rate(self) -> float:
+        """Highest inference rate allowed by max_fps and the CPU budget"""
+        rate = self.max_fps
+        if self.inference_time > 0:
+            rate = min(rate, self.cpu_budget / self.inference_time)
+        return max(rate, self.min_fps)
+
+    def should_infer(self, frame, now: Optional[float] = None) -> bool:
+        """True to run full detection on this frame, False to reuse the previous detections"""
+        now = time.monotonic() if now is None else now
+        elapsed = now - self.last_inference
+        if elapsed < 1.0 / self.max_rate():
+            self.stats["reused"] += 1
+            return False
+
+        self.candidate = self.thumbnail(frame)
+        self.last_motion = self.motion_score(self.candidate)
+        if self.last_motion >= self.motion_threshold:
+            if now >= self.boost_until:
+                self.stats["boosts"] += 1
+            self.boost_until = now + self.boost_seconds
+            return self._accept(now)
+
+        # Keep the raised rate for a while after motion, then decay to the idle rate
+        rate = self.max_rate() if now < self.boost_until else self.min_fps
+        if elapsed >= 1.0 / rate:
+            return self._accept(now)
+
+        self.stats["reused"] += 1
+        return False
+
+    def record_inference(self, duration: float, smoothing: float = 0.2):
+        """Feed back how long the detector took so the CPU budget can be enforced"""
+        if self.inference_time == 0:
+            self.inference_time = duration
+        else:
+            self.inference_time += smoothing * (duration - self.inference_time)
+
+    def _accept(self, now: float) -> bool:
+        """Remember this frame as the new motion reference"""
+        self.reference = self.candidate
+        self.last_inference = now
+        self.stats["inferred"] += 1
+        return True
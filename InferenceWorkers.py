@@ -0,0 +1,224 @@
+import os
+import threading
+import logging
+import multiprocessing
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, List, Optional
+
+from DetectionPostProcess import DetectionPostProcessor, empty_detections
+from InferenceBackends import InferenceBackend, select_backend
+from Metrics import metrics
+
+DEFAULT_FRAME_BYTES = 1920 * 1080 * 3
+
+
+def _worker_main(conn, shm_name: str, model_path: str, postprocessor: DetectionPostProcessor,
+                 preferred: str, imgsz: int, int8: bool, threads: Optional[int],
+                 backend_factory: Callable[..., InferenceBackend] = select_backend):
+    """Worker process: load a backend, then run detection on frames placed in shared memory"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        try:
+            backend = backend_factory(
+                model_path, postprocessor, preferred=preferred, imgsz=imgsz, int8=int8, threads=threads
+            )
+            backend.warmup(runs=0)
+        except Exception as e:
+            conn.send(("error", str(e)))
+            return
+        conn.send(("ready", backend.name))
+        while True:
+            request = conn.recv()
+            if request is None:
+                break
+            job_id, shape = request
+            # A view onto the shared buffer; the parent does not touch it until we reply
+            frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+            detections = backend.detect(frame)
+            conn.send((job_id, detections, dict(backend.timings)))
+        backend.close()
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        shm.close()
+
+
+class InferenceWorker:
+    def __init__(self, index: int, context, capacity: int, args: tuple, logger: logging.Logger):
+        """One worker process with its own shared frame buffer and request pipe"""
+        self.index = index
+        self.context = context
+        self.capacity = capacity
+        self.args = args
+        self.logger = logger
+        self.lock = threading.Lock()
+        self.process = None
+        self.conn = None
+        self.shm = None
+        self.backend_name = None
+        self.job_id = 0
+        self.restarts = 0
+
+    def start(self, ready_timeout: float = 120.0):
+        """Spawn the process and wait until its model is loaded"""
+        self.shm = shared_memory.SharedMemory(create=True, size=self.capacity)
+        self.conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(
+            target=_worker_main, args=(child_conn, self.shm.name) + self.args,
+            name=f"inference-{self.index}", daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        try:
+            if not self.conn.poll(ready_timeout):
+                raise RuntimeError("timed out loading the model")
+            status, detail = self.conn.recv()
+        except EOFError:
+            status, detail = "error", "process exited"
+        except RuntimeError as e:
+            status, detail = "error", str(e)
+        if status != "ready":
+            self.stop()
+            raise RuntimeError(f"Inference worker {self.index} failed to start: {detail}")
+        self.backend_name = detail
+
+    def stop(self):
+        """Ask the process to exit, then make sure it has, and free the shared buffer"""
+        if self.process is not None:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout=2.0)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join(timeout=1.0)
+            self.conn.close()
+            self.process = None
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def restart(self, capacity: Optional[int] = None):
+        """Replace a crashed, hung or too-small worker with a fresh one"""
+        self.stop()
+        if capacity is not None:
+            self.capacity = capacity
+        self.restarts += 1
+        metrics.increment("inference_worker_restarts")
+        self.logger.info(f"Restarting inference worker {self.index}")
+        self.start()
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def detect(self, frame: np.ndarray, timeout: float):
+        """Copy the frame into shared memory and wait for the worker's detections"""
+        with self.lock:
+            frame = np.ascontiguousarray(frame, dtype=np.uint8)
+            if frame.nbytes > self.capacity:
+                self.restart(frame.nbytes)
+            np.ndarray(frame.shape, dtype=np.uint8, buffer=self.shm.buf)[...] = frame
+
+            self.job_id += 1
+            try:
+                self.conn.send((self.job_id, frame.shape))
+                if not self.conn.poll(timeout):
+                    raise TimeoutError(f"Inference worker {self.index} timed out")
+                job_id, detections, timings = self.conn.recv()
+            except (EOFError, OSError, TimeoutError) as e:
+                self.logger.error(f"Inference worker {self.index} error: {str(e) or type(e).__name__}")
+                self.restart()
+                return empty_detections(), None
+            if job_id != self.job_id:
+                self.restart()
+                return empty_detections(), None
+            return detections, timings
+
+
+class ProcessPoolBackend(InferenceBackend):
+    name = "process"
+
+    def __init__(self, model_path: str, postprocessor: DetectionPostProcessor, imgsz: int = 640,
+                 threads: Optional[int] = None, logger: Optional[logging.Logger] = None, batch: int = 1,
+                 workers: int = 2, preferred: str = "onnx", int8: bool = False, request_timeout: float = 10.0,
+                 frame_bytes: int = DEFAULT_FRAME_BYTES, health_interval: float = 1.0,
+                 backend_factory: Callable[..., InferenceBackend] = select_backend):
+        """Inference in separate processes, fed through shared-memory frame buffers, so the GIL stays free;
+        backend_factory must be a module-level function, since it is sent to spawned processes"""
+        super().__init__(model_path, postprocessor, imgsz, threads, logger, batch)
+        self.request_timeout = request_timeout
+        # Each call waits for its frames, so workers beyond the frames per call would sit idle holding a model
+        if workers > batch:
+            self.logger.warning(
+                f"Using {batch} inference worker(s) instead of {workers}: each call has only {batch} frame(s)"
+            )
+            workers = batch
+        # Split the cores between workers unless told otherwise
+        worker_threads = threads or max(1, (os.cpu_count() or 1) // workers)
+        args = (model_path, postprocessor, preferred, imgsz, int8, worker_threads, backend_factory)
+
+        # spawn, not fork: the parent already runs capture, speech and audio threads
+        context = multiprocessing.get_context("spawn")
+        self.workers = [InferenceWorker(i, context, frame_bytes, args, self.logger) for i in range(workers)]
+        try:
+            for worker in self.workers:
+                worker.start()
+        except Exception:
+            self.close()
+            raise
+        self.logger.info(f"Started {workers} {self.workers[0].backend_name} inference workers")
+
+        self.next_worker = 0
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference-client")
+        self.stopped = threading.Event()
+        self.monitor = threading.Thread(target=self._monitor_loop, args=(health_interval,), daemon=True)
+        self.monitor.start()
+
+    def detect(self, frame: np.ndarray) -> np.ndarray:
+        worker = self.workers[self.next_worker]
+        self.next_worker = (self.next_worker + 1) % len(self.workers)
+        detections, timings = worker.detect(frame, self.request_timeout)
+        if timings:
+            self.timings.update(timings)
+        return detections
+
+    def detect_batch(self, frames: List[np.ndarray]) -> List[np.ndarray]:
+        """Spread the frames over the workers and run them in parallel"""
+        if len(frames) == 1:
+            return [self.detect(frames[0])]
+        futures = [
+            self.executor.submit(self.workers[i % len(self.workers)].detect, frame, self.request_timeout)
+            for i, frame in enumerate(frames)
+        ]
+        results = [future.result() for future in futures]
+        for _, timings in results:
+            if timings:
+                self.timings.update(timings)
+        return [detections for detections, _ in results]
+
+    def _monitor_loop(self, interval: float):
+        """Restart idle workers whose process died between requests"""
+        while not self.stopped.wait(interval):
+            for worker in self.workers:
+                if worker.alive or not worker.lock.acquire(blocking=False):
+                    continue
+                try:
+                    if not self.stopped.is_set():
+                        worker.restart()
+                except Exception as e:
+                    self.logger.error(f"Inference worker restart failed: {str(e)}")
+                finally:
+                    worker.lock.release()
+            metrics.gauge("inference_workers_alive", sum(worker.alive for worker in self.workers))
+
+    def close(self):
+        if hasattr(self, "stopped"):
+            self.stopped.set()
+            self.executor.shutdown(wait=False)
+        for worker in self.workers:
+            worker.stop()
@@ -0,0 +1,225 @@
+import json
+import threading
+import time
+import logging
+import numpy as np
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Latency percentiles in milliseconds"""
+    if not samples:
+        return {}
+    values = np.asarray(samples) * 1000
+    return {
+        "count": len(values),
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p90_ms": round(float(np.percentile(values, 90)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
+
+
+class Histogram:
+    def __init__(self, window: int = 1024):
+        """Rolling window of recent samples plus lifetime count and sum"""
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def snapshot(self) -> Dict[str, float]:
+        """Count, sum, mean and quantiles over the current window"""
+        values = sorted(self.samples)
+        result = {"count": self.count, "sum": self.total}
+        if values:
+            result["mean"] = sum(values) / len(values)
+            for q in QUANTILES:
+                result[f"p{int(q * 100)}"] = values[min(len(values) - 1, int(q * len(values)))]
+        return result
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _Timer:
+    __slots__ = ("metrics", "name", "started")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.started)
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    def __init__(self, enabled: bool = False, window: int = 1024):
+        """Stage timers, counters and gauges; every call is a cheap no-op while disabled"""
+        self.enabled = enabled
+        self.window = window
+        self.lock = threading.Lock()
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, float] = {}
+
+    def set_enabled(self, enabled: bool):
+        """Turn collection on or off at runtime"""
+        self.enabled = enabled
+
+    def timer(self, name: str):
+        """Context manager recording the duration of a block in seconds"""
+        if not self.enabled:
+            return NULL_TIMER
+        return _Timer(self, name)
+
+    def observe(self, name: str, value: float):
+        """Add a sample to a histogram"""
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(self.window)
+            histogram.observe(value)
+
+    def increment(self, name: str, amount: float = 1):
+        """Increase a counter"""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def gauge(self, name: str, value: float):
+        """Record the current value of something, e.g. a queue depth"""
+        if not self.enabled:
+            return
+        self.gauges[name] = value
+
+    def reset(self):
+        """Forget everything collected so far"""
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.gauges.clear()
+
+    def snapshot(self) -> Dict:
+        """Point-in-time view of all metrics"""
+        with self.lock:
+            return {
+                "timestamp": time.time(),
+                "histograms": {name: h.snapshot() for name, h in self.histograms.items()},
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+            }
+
+    def prometheus_text(self, prefix: str = "drishti") -> str:
+        """Render the snapshot in the Prometheus text exposition format"""
+        data = self.snapshot()
+        lines = []
+        for name, summary in sorted(data["histograms"].items()):
+            metric = f"{prefix}_{name}_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for q in QUANTILES:
+                key = f"p{int(q * 100)}"
+                if key in summary:
+                    lines.append(f'{metric}{{quantile="{q}"}} {summary[key]:.6f}')
+            lines.append(f"{metric}_sum {summary['sum']:.6f}")
+            lines.append(f"{metric}_count {summary['count']}")
+        for name, value in sorted(data["counters"].items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+        for name, value in sorted(data["gauges"].items()):
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+# Shared instance used by every module of the assistant
+metrics = Metrics()
+
+
+class JsonLinesExporter:
+    def __init__(self, path: str = "metrics.jsonl", interval: float = 10.0, source: Metrics = metrics,
+                 logger: Optional[logging.Logger] = None):
+        """Append a metrics snapshot to a JSON lines file every interval seconds"""
+        self.path = path
+        self.interval = interval
+        self.source = source
+        self.logger = logger or logging.getLogger(__name__)
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._export_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+
+    def _export_loop(self):
+        while not self.stopped.wait(self.interval):
+            if not self.source.enabled:
+                continue
+            try:
+                with open(self.path, "a") as f:
+                    f.write(json.dumps(self.source.snapshot()) + "\n")
+            except Exception as e:
+                self.logger.error(f"Metrics export error: {str(e)}")
+
+
+class PrometheusServer:
+    def __init__(self, port: int = 9464, host: str = "127.0.0.1", source: Metrics = metrics):
+        """Local HTTP endpoint serving /metrics in Prometheus text format"""
+        source_metrics = source
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = source_metrics.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,223 @@
+import threading
+import time
+import logging
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Optional
+
+from Metrics import metrics
+
+OPENWEATHER_URL = "http://api.openweathermap.org/data/2.5/weather"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service that has been failing"""
+
+
+class ServiceError(Exception):
+    """A call failed in a way worth retrying, e.g. a 5xx response"""
+
+
+class TTLCache:
+    def __init__(self, ttl: float, max_entries: int = 256):
+        """Small thread-safe cache whose entries expire after ttl seconds"""
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        """Stop calling a service after repeated failures, then probe it again after reset_timeout"""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        """True if a call may go out now; only one probe is let through while half-open"""
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.probing = False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class ServiceClient:
+    def __init__(self, max_workers: int = 4, pool_size: int = 8, logger: Optional[logging.Logger] = None):
+        """Worker pool and pooled HTTP session for every outbound call, with deadlines, retries and breakers"""
+        self.logger = logger or logging.getLogger(__name__)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="service")
+        # Runs clients that take no timeout, so a hung request holds one of these threads, not the caller
+        self.untimed = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="untimed")
+        self.pool_size = pool_size
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.lock = threading.Lock()
+        self._session = None
+
+    @property
+    def session(self):
+        """Shared requests session with a bounded connection pool, created on first use"""
+        if self._session is None:
+            with self.lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+        return self._session
+
+    def breaker(self, name: str) -> CircuitBreaker:
+        with self.lock:
+            if name not in self.breakers:
+                self.breakers[name] = CircuitBreaker()
+            return self.breakers[name]
+
+    def call(self, name: str, func: Callable[..., Any], *args, deadline: float = 5.0, retries: int = 2,
+             backoff: float = 0.25, **kwargs) -> Any:
+        """Call func(*args, timeout=remaining, **kwargs) with retries and exponential backoff inside the deadline"""
+        breaker = self.breaker(name)
+        give_up_at = time.monotonic() + deadline
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                metrics.increment(f"{name}_circuit_open")
+                raise CircuitOpenError(f"{name} service unavailable")
+
+            remaining = give_up_at - time.monotonic()
+            started = time.perf_counter()
+            try:
+                result = func(*args, timeout=max(remaining, 0.1), **kwargs)
+            except Exception as e:
+                breaker.record_failure()
+                metrics.increment(f"{name}_errors")
+                delay = backoff * (2 ** attempt)
+                attempt += 1
+                if attempt > retries or time.monotonic() + delay >= give_up_at:
+                    raise
+                self.logger.info(f"Retrying {name} after error: {str(e)}")
+                time.sleep(delay)
+                continue
+
+            breaker.record_success()
+            metrics.observe(f"{name}_request", time.perf_counter() - started)
+            return result
+
+    def bounded(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap a client call that has no timeout of its own so call() can still enforce the deadline;
+        the caller stops waiting after timeout seconds and the attempt counts as failed"""
+        def run(*args, timeout: float, **kwargs):
+            future = self.untimed.submit(func, *args, **kwargs)
+            try:
+                return future.result(timeout)
+            except FutureTimeout:
+                future.cancel()
+                raise
+        return run
+
+    def submit(self, name: str, func: Callable[..., Any], *args, **kwargs) -> Future:
+        """Run call() on the worker pool and return a Future"""
+        return self.executor.submit(self.call, name, func, *args, **kwargs)
+
+    def get_json(self, url: str, params: Optional[Dict[str, Any]] = None, timeout: float = 5.0):
+        """GET a JSON document; 5xx responses raise ServiceError so they are retried"""
+        response = self.session.get(url, params=params, timeout=timeout)
+        if response.status_code >= 500:
+            raise ServiceError(f"{url} returned {response.status_code}")
+        return response.status_code, response.json()
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.untimed.shutdown(wait=False, cancel_futures=True)
+        if self._session is not None:
+            self._session.close()
+
+
+def completed(value) -> Future:
+    """A Future that already holds a value"""
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+class WeatherService:
+    def __init__(self, client: ServiceClient, api_key: Optional[str], base_url: str = OPENWEATHER_URL,
+                 ttl: float = 600.0, deadline: float = 5.0):
+        """OpenWeatherMap current conditions, cached per location for ttl seconds"""
+        self.client = client
+        self.api_key = api_key
+        self.base_url = base_url
+        self.deadline = deadline
+        self.cache = TTLCache(ttl)
+
+    def current(self, location: str) -> Future:
+        """Future of (status_code, data) for a location, served from cache when fresh"""
+        key = location.strip().lower()
+        cached = self.cache.get(key)
+        if cached is not None:
+            metrics.increment("weather_cache_hits")
+            return completed(cached)
+
+        future = self.client.submit("weather", self._fetch, location, deadline=self.deadline)
+        future.add_done_callback(lambda f: self._remember(key, f))
+        return future
+
+    def _fetch(self, location: str, timeout: float):
+        params = {"q": location, "appid": self.api_key, "units": "metric"}
+        return self.client.get_json(self.base_url, params=params, timeout=timeout)
+
+    def _remember(self, key: str, future: Future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        status, _ = future.result()
+        if status == 200:
+            self.cache.put(key, future.result())
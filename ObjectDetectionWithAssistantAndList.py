@@ -1,35 +1,239 @@
 import cv2
-import pyttsx3
+import numpy as np
 import time
-from ultralytics import YOLO
 import logging
 import sys
 import speech_recognition as sr
 import threading
 import queue
-import requests
-import phonenumbers
 import datetime
-import webbrowser
 import json
 import os
+import signal
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, Any, List
-from deep_translator import GoogleTranslator
+from FramePipeline import DetectionPipeline, MultiStreamPipeline
+from SpeechScheduler import SpeechScheduler, PRIORITY_HAZARD, PRIORITY_REPLY, PRIORITY_ROUTINE
+from AudioClips import ClipStore, PhraseMatcher, ClipSpeechEngine, PyAudioSink
+from DetectionPostProcess import DetectionPostProcessor, empty_detections, COCO_LABELS, ZONE_LEFT, ZONE_RIGHT
+from InferenceScheduler import InferenceScheduler
+from QualityGovernor import QualityGovernor, QUALITY_LEVELS, initial_level
+from InferenceBackends import select_backend
+from InferenceWorkers import ProcessPoolBackend
+from TiledInference import create_tiled_backend, tiled_batch
+from ObjectTracker import ObjectTracker, TRACK_BIRTH, TRACK_ZONE_CHANGE, TRACK_APPROACH
+from SpatialReasoning import SpatialEstimator
+from SceneDescription import SceneState
+from SessionLog import SessionRecorder, RecordingCapture, RecordingAudioSource
+from DetectionHistory import DetectionHistory
+from WakeWord import (
+    WakeWordListener, MicrophoneSource, VoskKeywordSpotter, RecognizerKeywordSpotter,
+    VoskRecognizer, RECOGNIZERS, SAMPLE_RATE
+)
+from CommandRouter import build_router, METRICS_ON_WORDS
+from Metrics import metrics, JsonLinesExporter, PrometheusServer
+from NetworkServices import ServiceClient, WeatherService, OPENWEATHER_URL
+from TranslationCache import TranslationCache, GREETING_TEXT, HELP_TEXT
+
+CONFIG_PATH = "assistant_config.json"
 
 class IntelligentAssistant:
-    def __init__(self, model_path="yolov8n.pt", confidence_threshold=0.3):
-        """Initialize the Intelligent Assistant"""
+    def __init__(self, model_path="yolov8n.pt", confidence_threshold=0.3, backend="auto", imgsz=640,
+                 int8=False, threads=None, language=None, camera_index=0, sources=None, workers=None,
+                 tiling=None):
+        """Initialize the Intelligent Assistant; sources maps stream names to camera indices, URLs or files,
+        workers > 0 runs inference in that many separate processes, tiling names a TILING_PRESETS entry"""
+        startup_started = time.perf_counter()
+        self.startup_times: Dict[str, float] = {}
         self.setup_logging()
-        self.initialize_components(model_path, confidence_threshold)
         self.load_labels()
+        self.load_config()
+        self.initialize_components(confidence_threshold)
         self.assistant_mode = False
         self.load_api_keys()
-        self.language = self.select_language()
+        self.setup_metrics()
+        self.setup_recording()
         self.load_object_descriptions()
+        self.register_commands()
+        if sources is None and camera_index is not None:
+            sources = self.config.get("sources")
+        batch = len(sources) if sources else 1
+        if workers is None:
+            workers = self.config.get("inference_workers", 0)
+        if tiling is None:
+            tiling = self.config.get("tiling", "off")
+        # With a latency SLO the governor picks the model and input size, starting from the last level used
+        slo_ms = self.config.get("latency_slo_ms") if camera_index is not None else None
+        levels = self.config.get("quality_levels", QUALITY_LEVELS)
+        level = None
+        if slo_ms:
+            level = initial_level(levels, self.config.get("quality_level"), model_path, imgsz)
+            model_path, imgsz = levels[level]["model"], levels[level]["imgsz"]
+        self.model_path, self.imgsz = model_path, imgsz
+        self.detector_options = (backend, int8, threads, batch, workers, tiling)
+        
+        # Model load + warm-up and camera open overlap with TTS start-up and language selection
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="startup") as pool:
+            backend_future = pool.submit(
+                self.timed_phase, "model", self.load_detector, model_path, backend, imgsz, int8, threads, batch,
+                workers, tiling
+            )
+            if sources:
+                camera_future = pool.submit(self.timed_phase, "camera", self.open_streams, sources)
+            else:
+                camera_future = pool.submit(self.timed_phase, "camera", self.open_camera, camera_index)
+            self.language = self.timed_phase("language", self.resolve_language, language)
+            self.backend = backend_future.result()
+            self.cap = camera_future.result()
+        self.spatial = self.create_spatial_estimator(None if sources else self.cap)
+        self.scene = self.create_scene_state()
+        if sources:
+            self.stream_scenes = {name: self.create_scene_state() for name in self.cap}
+        self.setup_history(list(self.cap) if sources else ["camera"])
+        self.precompute_object_details()
+        if slo_ms:
+            self.apply_quality_level(levels[level])
+            self.governor = QualityGovernor(
+                levels, self.apply_quality_level, slo_ms / 1000.0, level,
+                event_log=self.config.get("governor_log"), logger=self.logger
+            )
+        
+        self.startup_times["total"] = time.perf_counter() - startup_started
+        self.report_startup()
+        
+    def timed_phase(self, name, function, *args):
+        """Run one startup phase and remember how long it took"""
+        started = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self.startup_times[name] = time.perf_counter() - started
+
+    def report_startup(self):
+        """Log how long each startup phase took"""
+        if self.speech.ready.wait(timeout=5.0):
+            self.startup_times["tts"] = self.speech.engine_init_time
+        for phase, seconds in self.startup_times.items():
+            metrics.observe(f"startup_{phase}", seconds)
+        self.logger.info("Startup: " + ", ".join(
+            f"{phase} {seconds:.2f}s" for phase, seconds in self.startup_times.items()
+        ))
+
+    def load_config(self):
+        """Load saved settings such as the last chosen language"""
+        self.config: Dict[str, Any] = {}
+        try:
+            if os.path.exists(CONFIG_PATH):
+                with open(CONFIG_PATH, encoding="utf-8") as f:
+                    self.config = json.load(f)
+        except Exception as e:
+            self.logger.error(f"Config error: {str(e)}")
+
+    def save_config(self):
+        """Persist settings for the next start"""
+        try:
+            with open(CONFIG_PATH, "w", encoding="utf-8") as f:
+                json.dump(self.config, f, indent=2)
+        except Exception as e:
+            self.logger.error(f"Config error: {str(e)}")
+
+    def resolve_language(self, language=None) -> str:
+        """Use the given or last saved language, asking the user only when neither exists"""
+        language = language or self.config.get("language") or self.select_language()
+        if self.config.get("language") != language:
+            self.config["language"] = language
+            self.save_config()
+        return language
+
+    def load_detector(self, model_path, backend="auto", imgsz=640, int8=False, threads=None, batch=1, workers=0,
+                      tiling="off"):
+        """Load the inference backend and warm it up with a dummy frame"""
+        # Tiles share the model call with their frame, so the export needs room for them in its batch
+        batch = tiled_batch(batch, tiling)
+        try:
+            if workers:
+                # Each worker process loads and warms up its own copy of the model
+                detector = ProcessPoolBackend(
+                    model_path, self.postprocessor, imgsz, threads, self.logger, batch,
+                    workers=workers, preferred=backend, int8=int8
+                )
+            else:
+                detector = select_backend(
+                    model_path, self.postprocessor, preferred=backend, imgsz=imgsz, int8=int8,
+                    threads=threads, logger=self.logger, batch=batch
+                )
+                # Automatic selection already ran the model while timing it
+                if backend != "auto":
+                    detector.warmup(runs=0)
+            return create_tiled_backend(detector, self.postprocessor, tiling)
+        except Exception as e:
+            self.logger.error(f"Model loading error: {str(e)}")
+            raise
+
+    def apply_quality_level(self, level):
+        """Switch to a governor quality level, reloading the model only when its variant or input size changed"""
+        if (level["model"], level["imgsz"]) != (self.model_path, self.imgsz):
+            backend, int8, threads, batch, workers, tiling = self.detector_options
+            # The new model loads and warms up while the old one keeps serving frames
+            detector = self.load_detector(
+                level["model"], backend, level["imgsz"], int8, threads, batch, workers, tiling
+            )
+            with self.backend_lock:
+                previous, self.backend = self.backend, detector
+            self.model_path, self.imgsz = level["model"], level["imgsz"]
+            if previous is not None:
+                previous.close()
+        schedulers = [self.scheduler] + list(getattr(self, "stream_schedulers", {}).values())
+        for scheduler in schedulers:
+            scheduler.max_fps = level["max_fps"]
+        if self.config.get("quality_level") != level["name"]:
+            self.config["quality_level"] = level["name"]
+            self.save_config()
+
+    def open_camera(self, camera_index=0):
+        """Open the camera ahead of run() so the first frame is not delayed"""
+        if camera_index is None:
+            return None
+        cap = cv2.VideoCapture(camera_index)
+        if cap.isOpened():
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return cap
+
+    def open_streams(self, sources):
+        """Open every source of multi-stream mode with its own tracker and inference scheduler"""
+        caps = {}
+        for name, source in sources.items():
+            cap = self.open_camera(source)
+            if cap.isOpened():
+                caps[name] = cap
+            else:
+                self.logger.error(f"Failed to open source {name}: {source}")
+        self.stream_trackers = {name: ObjectTracker() for name in caps}
+        self.stream_schedulers = {name: InferenceScheduler() for name in caps}
+        self.stream_detections = {name: empty_detections() for name in caps}
+        self.stream_spatial = {name: self.create_spatial_estimator(cap) for name, cap in caps.items()}
+        self.primary_stream = next(iter(caps), None)
+        return caps
         
+    def create_spatial_estimator(self, cap=None):
+        """Distance and time-to-contact estimator for one camera, calibrated from the config if possible"""
+        frame_width = 640
+        if cap is not None and cap.isOpened():
+            frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or frame_width
+        return SpatialEstimator(
+            self.labels, focal_px=self.config.get("focal_px"), frame_width=frame_width,
+            fov_degrees=self.config.get("fov_degrees", 70.0)
+        )
+        
+    def create_scene_state(self):
+        """Incremental per-class, per-zone counts that describe what changed in the view"""
+        return SceneState(
+            self.labels, self.translator, self.language, hazard_mask=self.postprocessor.hazard_mask
+        )
+
     def select_language(self) -> str:
         """Let user choose language"""
-        self.speak_english("Please choose your language. Say 'English' या 'Hindi' बोलें")
+        self.speak_english("Please choose your language. Say 'English' या 'Hindi' बोलें", wait=True)
         with sr.Microphone() as source:
             self.recognizer.adjust_for_ambient_noise(source)
             try:
@@ -48,6 +252,67 @@ class IntelligentAssistant:
     def load_api_keys(self):
         """Load API keys from environment variables"""
         self.weather_api_key = os.getenv('WEATHER_API_KEY')
+        self.weather = WeatherService(
+            self.services, self.weather_api_key, base_url=os.getenv('DRISHTI_WEATHER_URL', OPENWEATHER_URL)
+        )
+
+    def setup_metrics(self):
+        """Start the metrics exporters and enable instrumentation from environment variables;
+        the exporters stay idle while metrics are off, so they can be turned on later"""
+        self.metrics_exporters = []
+        metrics.set_enabled(os.getenv('DRISHTI_METRICS', '0') == '1')
+        # SIGUSR1 toggles collection on a device without voice input
+        if hasattr(signal, "SIGUSR1") and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.set_metrics_enabled(not metrics.enabled))
+
+        exporter = JsonLinesExporter(
+            os.getenv('DRISHTI_METRICS_FILE', 'metrics.jsonl'),
+            float(os.getenv('DRISHTI_METRICS_INTERVAL', '10')),
+            logger=self.logger
+        )
+        exporter.start()
+        self.metrics_exporters.append(exporter)
+        
+        port = os.getenv('DRISHTI_METRICS_PORT')
+        if port:
+            try:
+                server = PrometheusServer(int(port))
+                server.start()
+                self.metrics_exporters.append(server)
+            except Exception as e:
+                self.logger.error(f"Metrics endpoint error: {str(e)}")
+
+    def set_metrics_enabled(self, enabled):
+        """Turn instrumentation on or off at runtime"""
+        metrics.set_enabled(enabled)
+        self.logger.info(f"Metrics {'enabled' if enabled else 'disabled'}")
+
+    def setup_recording(self):
+        """Log the session for later replay when DRISHTI_RECORD names a file"""
+        path = os.getenv('DRISHTI_RECORD')
+        self.recorder = SessionRecorder(path) if path else None
+        if self.recorder is not None and self.recorder.path != path:
+            self.logger.info(f"{path} already holds a session, recording to {self.recorder.path}")
+
+    def setup_history(self, streams):
+        """Keep every detection for later analysis when DRISHTI_HISTORY or history_dir names a directory"""
+        directory = os.getenv('DRISHTI_HISTORY') or self.config.get("history_dir")
+        self.history = DetectionHistory(
+            directory, streams, max_bytes=int(self.config.get("history_max_mb", 256)) * 1024 * 1024,
+            max_age_days=self.config.get("history_max_days", 30), logger=self.logger
+        ) if directory else None
+        self.stream_index = {name: index for index, name in enumerate(streams)}
+        # The pipelines stamp frames with time.monotonic(); this turns those stamps into wall-clock time
+        self.clock_offset = time.time() - time.monotonic()
+
+    def capture_time(self, timestamp=None) -> float:
+        """Wall-clock epoch seconds of a frame's capture timestamp"""
+        return time.time() if timestamp is None else timestamp + self.clock_offset
+
+    @property
+    def console(self):
+        """Stream for log lines and the echo of spoken text"""
+        return sys.stdout
 
     def setup_logging(self):
         """Configure logging"""
@@ -56,35 +321,75 @@ class IntelligentAssistant:
             format='%(asctime)s - %(levelname)s - %(message)s',
             handlers=[
                 logging.FileHandler('assistant.log'),
-                logging.StreamHandler(sys.stdout)
+                logging.StreamHandler(self.console)
             ]
         )
         self.logger = logging.getLogger(__name__)
 
-    def initialize_components(self, model_path, confidence_threshold):
+    def initialize_components(self, confidence_threshold):
         """Initialize components"""
         try:
-            self.engine = pyttsx3.init()
-            self.engine.setProperty("rate", 150)
-            self.engine.setProperty("volume", 1.0)
+            self.speech = SpeechScheduler(self.create_speech_engine, self.logger)
+            self.speech.start()
             
-            self.model = YOLO(model_path)
             self.confidence_threshold = confidence_threshold
+            self.postprocessor = DetectionPostProcessor(self.labels, confidence_threshold)
+            self.backend = None
+            self.backend_lock = threading.Lock()
+            self.governor = None
+            self.cap = None
+            
+            # Every outbound call goes through one worker pool and connection pool
+            self.services = ServiceClient(logger=self.logger)
+            self.translator = TranslationCache(logger=self.logger, services=self.services)
             
             self.recognizer = sr.Recognizer()
             self.command_queue = queue.Queue()
             
             self.running = False
             self.paused = False
+            self.pipeline = None
+            self.listener = None
             
             self.context: Dict[str, Any] = {}
             self.conversation_history = []
-            self.current_detections = []
+            self.current_detections = empty_detections()
+            self.tracker = ObjectTracker()
+            self.scheduler = InferenceScheduler()
             
         except Exception as e:
             self.logger.error(f"Initialization error: {str(e)}")
             raise
 
+    def create_speech_engine(self):
+        """Create the TTS engine on the speech thread that will own it"""
+        import pyttsx3
+        engine = pyttsx3.init()
+        engine.setProperty("rate", 150)
+        engine.setProperty("volume", 1.0)
+        if not self.config.get("audio_clips", True):
+            return engine
+        try:
+            return self.create_clip_engine(engine)
+        except Exception as e:
+            self.logger.error(f"Audio clip error: {str(e)}")
+            return engine
+
+    def create_clip_engine(self, live, sink=None, directory=None, played_history=100):
+        """Speak fixed announcements from pre-synthesized fragments, handing everything else to the live engine"""
+        store = ClipStore(
+            directory or self.config.get("audio_clip_dir", "audio_clips"),
+            live.getProperty("voice"), live.getProperty("rate")
+        )
+        matcher = PhraseMatcher(self.labels, prefixes=self.config.get("sources") or {})
+        clips = ClipSpeechEngine(
+            store, matcher, sink or PyAudioSink(store.sample_rate), lambda: live,
+            lambda: getattr(self, "language", "en"), self.logger, played_history
+        )
+        # Missing fragments are synthesized with the live engine whenever speech is idle
+        clips.prepare(["en", "hi"])
+        return clips
+
     def load_object_descriptions(self):
         """Load object descriptions and suggestions"""
         self.object_info = {
@@ -120,68 +425,72 @@ class IntelligentAssistant:
             }
         }
 
-    def translate_text(self, text: str, target_lang: str) -> str:
-        """Translate text between English and Hindi"""
+    def translate_text(self, text: str, target_lang: str, wait: bool = False) -> str:
+        """Translate text between English and Hindi, from cache unless wait allows a network call"""
         try:
-            if target_lang == self.language:
-                return text
-            translator = GoogleTranslator(source='auto', target=target_lang)
-            return translator.translate(text)
+            return self.translator.translate(text, target_lang, wait=wait)
         except Exception as e:
             self.logger.error(f"Translation error: {str(e)}")
             return text
 
-    def speak_english(self, text):
+    def localize(self, template: str, **slots) -> str:
+        """Render a fixed English phrase template in the selected language"""
+        return self.translator.compose(template, self.language, **slots)
+
+    def speak_english(self, text, wait=False):
         """Speak in English regardless of selected language"""
         try:
-            print(f"Assistant: {text}")
-            self.engine.say(text)
-            self.engine.runAndWait()
+            print(f"Assistant: {text}", file=self.console)
+            self.speech.say(text, PRIORITY_REPLY, wait=wait)
         except Exception as e:
             self.logger.error(f"Speech error: {str(e)}")
 
-    def speak(self, text):
-        """Speak in selected language"""
+    def speak(self, text, priority=PRIORITY_REPLY, wait=False):
+        """Schedule already localized speech without blocking the caller"""
         try:
-            if self.language == 'hi':
-                translated_text = self.translate_text(text, 'hi')
-            else:
-                translated_text = text
-            print(f"Assistant: {translated_text}")
-            self.engine.say(translated_text)
-            self.engine.runAndWait()
+            print(f"Assistant: {text}", file=self.console)
+            if self.recorder is not None:
+                self.recorder.speech(text, priority)
+            self.speech.say(text, priority, wait=wait)
         except Exception as e:
             self.logger.error(f"Speech error: {str(e)}")
 
-    def get_weather(self, location: str) -> str:
-        """Get weather information for a location"""
-        try:
-            url = f"http://api.openweathermap.org/data/2.5/weather?q={location}&appid={self.weather_api_key}&units=metric"
-            response = requests.get(url)
-            data = response.json()
-            
-            if response.status_code == 200:
-                temp = data['main']['temp']
-                condition = data['weather'][0]['description']
-                return self.translate_text(
-                    f"The weather in {location} is {condition} with a temperature of {temp}°C",
-                    self.language
-                )
-            else:
-                return self.translate_text(f"Sorry, I couldn't get the weather for {location}", self.language)
-        except Exception as e:
-            self.logger.error(f"Weather API error: {str(e)}")
-            return self.translate_text("Sorry, there was an error getting the weather information", self.language)
+    def get_weather(self, location: str) -> Future:
+        """Future of the weather reply for a location; the request runs on the service pool"""
+        reply = Future()
+
+        def finish(request):
+            try:
+                status, data = request.result()
+                if status == 200:
+                    temp = data['main']['temp']
+                    condition = data['weather'][0]['description']
+                    text = self.localize(
+                        "The weather in {location} is {condition} with a temperature of {temp}°C",
+                        location=location,
+                        condition=self.translate_text(condition, self.language),
+                        temp=temp
+                    )
+                else:
+                    text = self.localize("Sorry, I couldn't get the weather for {location}", location=location)
+            except Exception as e:
+                self.logger.error(f"Weather API error: {str(e)}")
+                text = self.localize("Sorry, there was an error getting the weather information")
+            reply.set_result(text)
+
+        self.weather.current(location).add_done_callback(finish)
+        return reply
 
     def make_phone_call(self, number: str) -> str:
         """Simulate making a phone call"""
         try:
+            import phonenumbers
             parsed_number = phonenumbers.parse(number, "US")
             if phonenumbers.is_valid_number(parsed_number):
-                return self.translate_text(f"Initiating phone call to {number}", self.language)
-            return self.translate_text("Invalid phone number", self.language)
+                return self.localize("Initiating phone call to {number}", number=number)
+            return self.localize("Invalid phone number")
         except Exception as e:
-            return self.translate_text("Sorry, I couldn't process that phone number", self.language)
+            return self.localize("Sorry, I couldn't process that phone number")
 
     def get_object_info(self, object_name: str) -> tuple:
         """Get description and suggestion for an object"""
@@ -190,247 +499,420 @@ class IntelligentAssistant:
         suggestion = info["suggestion"][self.language]
         
         if object_name not in self.object_info:
-            translated_name = self.translate_text(object_name, self.language)
-            if self.language == 'hi':
-                description = f"{translated_name} - {description}"
-            else:
-                description = f"{object_name} - {description}"
+            description = self.localize("{label} - {description}", label=object_name, description=description)
                 
         return description, suggestion
 
+    def precompute_object_details(self):
+        """Localized detail line for every label, rebuilt only when the language changes"""
+        self.object_details = []
+        for label in self.labels:
+            description, suggestion = self.get_object_info(label)
+            self.object_details.append(
+                self.localize("{label}: {description}. {suggestion}", label=label,
+                              description=description, suggestion=suggestion)
+            )
+
     def create_detection_announcement(self, detections):
-        """Create detailed announcement for detected objects"""
-        if not detections:
-            return self.translate_text("No objects detected", self.language)
+        """Create detailed announcement for a detection record"""
+        if len(detections) == 0:
+            return self.localize("No objects detected")
         
-        object_count = {}
-        descriptions = []
-        
-        for obj in detections:
-            object_count[obj] = object_count.get(obj, 0) + 1
-            if obj not in [desc.split(':')[0] for desc in descriptions]:
-                description, suggestion = self.get_object_info(obj)
-                descriptions.append(f"{obj}: {description}. {suggestion}")
+        # Count per class in order of first appearance
+        class_ids, first_index, counts = np.unique(
+            detections["class_id"], return_index=True, return_counts=True
+        )
+        order = np.argsort(first_index)
+        class_ids, counts = class_ids[order].tolist(), counts[order].tolist()
         
         counts_text = ", ".join(
-            f"{count} {obj}{'s' if count > 1 else ''}" 
-            for obj, count in object_count.items()
+            self.localize("{count} {label}", count=number, label=label)
+            for number, label in (self.scene.count_words(class_id, count)
+                                  for class_id, count in zip(class_ids, counts))
         )
+        detailed_text = "\n".join(self.object_details[class_id] for class_id in class_ids)
         
-        detailed_text = "\n".join(descriptions)
-        
-        return f"I can see: {counts_text}\n\nDetails:\n{detailed_text}"
+        return f"{self.localize('I can see: {counts}', counts=counts_text)}\n\n{self.localize('Details:')}\n{detailed_text}"
+
+    def register_commands(self):
+        """Bind the built-in intents to their handlers"""
+        self.router = build_router({
+            "weather": self.command_weather,
+            "translate": self.command_translate,
+            "call": self.command_call,
+            "time": self.command_time,
+            "search": self.command_search,
+            "describe": self.command_describe,
+            "change_language": self.command_change_language,
+            "metrics": self.command_metrics,
+            "exit": self.command_exit,
+            "help": self.command_help,
+        })
 
     def process_assistant_command(self, command: str) -> str:
         """Process general assistant commands"""
-        command = command.lower()
-        
-        # Weather queries
-        if "weather" in command:
-            location = command.replace("weather", "").replace("in", "").strip()
-            if location:
-                return self.get_weather(location)
-            return self.translate_text("Please specify a location for the weather", self.language)
-            
-        # Translation command
-        elif "translate" in command:
-            text_to_translate = command.replace("translate", "").strip()
-            if self.language == 'hi':
-                return f"English translation: {self.translate_text(text_to_translate, 'en')}"
-            else:
-                return f"Hindi translation: {self.translate_text(text_to_translate, 'hi')}"
-            
-        # Phone calls
-        elif "call" in command:
-            number = ''.join(filter(str.isdigit, command))
-            if number:
-                return self.make_phone_call(number)
-            return self.translate_text("Please provide a phone number to call", self.language)
-            
-        # Time queries
-        elif "time" in command:
-            current_time = datetime.datetime.now().strftime("%I:%M %p")
-            return self.translate_text(f"The current time is {current_time}", self.language)
-            
-        # Web searches
-        elif "search for" in command:
-            query = command.replace("search for", "").strip()
-            webbrowser.open(f"https://www.google.com/search?q={query}")
-            return self.translate_text(f"Searching for {query}", self.language)
-            
-        # Object detection specific commands
-        elif "what do you see" in command:
-            return self.create_detection_announcement(self.current_detections)
-            
-        # Language switch command
-        elif "change language" in command:
-            self.language = 'en' if self.language == 'hi' else 'hi'
-            return self.translate_text(
-                f"Language changed to {'Hindi' if self.language == 'hi' else 'English'}", 
-                self.language
+        return self.router.dispatch(command, self.command_unknown)
+
+    def command_weather(self, location=None):
+        """Weather queries"""
+        if location:
+            return self.get_weather(location)
+        return self.localize("Please specify a location for the weather")
+
+    def command_translate(self, text=None):
+        """Translate into the other language"""
+        if not text:
+            return self.command_unknown()
+        if self.language == 'hi':
+            return self.services.executor.submit(
+                lambda: self.localize("English translation: {text}", text=self.translate_text(text, 'en', wait=True))
             )
-            
-        # Exit assistant mode
-        elif command in ["goodbye", "stop", "exit", "बंद करो"]:
-            self.assistant_mode = False
-            return self.translate_text("Goodbye! Returning to normal monitoring mode", self.language)
-            
-        # Help command
-        elif "help" in command:
-            help_text = """I can help you with:
-                   - Weather information (e.g., 'weather in London')
-                   - Translations (e.g., 'translate hello')
-                   - Making phone calls (e.g., 'call 123456789')
-                   - Telling the time (e.g., 'what time is it')
-                   - Web searches (e.g., 'search for cats')
-                   - Describing what I see (e.g., 'what do you see')
-                   - Changing language (say 'change language')
-                   Say 'goodbye' to exit assistant mode"""
-            return self.translate_text(help_text, self.language)
-                   
-        # Default response
-        return self.translate_text(
-            "I'm sorry, I didn't understand that command. Say 'help' for a list of things I can do.",
-            self.language
+        return self.services.executor.submit(
+            lambda: self.localize("Hindi translation: {text}", text=self.translate_text(text, 'hi', wait=True))
+        )
+
+    def command_call(self, number=None):
+        """Phone calls"""
+        number = ''.join(filter(str.isdigit, number or ''))
+        if number:
+            return self.make_phone_call(number)
+        return self.localize("Please provide a phone number to call")
+
+    def command_time(self):
+        """Time queries"""
+        current_time = datetime.datetime.now().strftime("%I:%M %p")
+        return self.localize("The current time is {time}", time=current_time)
+
+    def command_search(self, query=None):
+        """Web searches"""
+        if not query:
+            return self.command_unknown()
+        import webbrowser
+        webbrowser.open(f"https://www.google.com/search?q={query}")
+        return self.localize("Searching for {query}", query=query)
+
+    def command_describe(self):
+        """Object detection specific commands"""
+        return self.create_detection_announcement(self.current_detections)
+
+    def command_change_language(self):
+        """Language switch command"""
+        self.language = 'en' if self.language == 'hi' else 'hi'
+        self.config["language"] = self.language
+        self.save_config()
+        for scene in [self.scene] + list(getattr(self, "stream_scenes", {}).values()):
+            scene.set_language(self.language)
+        self.precompute_object_details()
+        return self.localize(
+            "Language changed to {language}",
+            language='Hindi' if self.language == 'hi' else 'English'
+        )
+
+    def command_metrics(self, state=None):
+        """Turn instrumentation on or off, toggling it when no state is given"""
+        enabled = not metrics.enabled if state is None else state.lower() in METRICS_ON_WORDS
+        self.set_metrics_enabled(enabled)
+        return self.localize("Metrics on" if enabled else "Metrics off")
+
+    def command_exit(self):
+        """Exit assistant mode"""
+        self.assistant_mode = False
+        return self.localize("Goodbye! Returning to normal monitoring mode")
+
+    def command_help(self):
+        """Help command"""
+        return self.localize(HELP_TEXT)
+
+    def command_unknown(self):
+        """Default response"""
+        return self.localize(
+            "I'm sorry, I didn't understand that command. Say 'help' for a list of things I can do."
         )
 
     def process_frame(self, frame):
-        """Process a single frame for object detection with hazard detection"""
-        detected_objects = []
-        
+        """Process a single frame for object detection"""
         try:
-            results = self.model(frame, stream=True)
-            
-            for result in results:
-                boxes = result.boxes
-                for box in boxes:
-                    confidence = box.conf.numpy()[0]
-                    if confidence > self.confidence_threshold:
-                        class_id = int(box.cls.numpy()[0])
-                        detected_object = self.labels[class_id]
-                        detected_objects.append(detected_object)
-                        
-                        # Only announce hazards when not in assistant mode
-                        if not self.assistant_mode and detected_object in ['car', 'truck', 'bicycle']:
-                            warning = self.translate_text(f"Warning: {detected_object} ahead!", self.language)
-                            self.speak(warning)
-                            
-                            # Proximity warning
-                            center_x = box.xywh[0][0].numpy()
-                            if center_x < frame.shape[1] / 2:
-                                position = self.translate_text(
-                                    f"{detected_object} detected to the left",
-                                    self.language
-                                )
-                            else:
-                                position = self.translate_text(
-                                    f"{detected_object} detected to the right",
-                                    self.language
-                                )
-                            self.speak(position)
-        
-            return detected_objects
+            with self.backend_lock:
+                detections = self.backend.detect(frame)
+                timings = dict(self.backend.timings)
+            if metrics.enabled:
+                for stage, seconds in timings.items():
+                    metrics.observe(stage, seconds)
+                metrics.gauge("detections", len(detections))
+            return detections
             
         except Exception as e:
             self.logger.error(f"Frame processing error: {str(e)}")
-            return []
+            return empty_detections()
+
+    def process_batch(self, frames):
+        """Detect objects in one frame from each stream with a single model call"""
+        try:
+            with self.backend_lock:
+                batch = self.backend.detect_batch(frames)
+                timings = dict(self.backend.timings)
+            if metrics.enabled:
+                for stage, seconds in timings.items():
+                    metrics.observe(stage, seconds)
+            return batch
+        except Exception as e:
+            self.logger.error(f"Frame processing error: {str(e)}")
+            return [empty_detections() for _ in frames]
+
+    def describe_position(self, label, zone):
+        """Say which side of the view an object is on"""
+        if zone == ZONE_LEFT:
+            return self.localize("{label} detected to the left", label=label)
+        elif zone == ZONE_RIGHT:
+            return self.localize("{label} detected to the right", label=label)
+        return self.localize("{label} detected ahead", label=label)
+
+    def tag_source(self, text, source=None):
+        """Prefix an announcement with the stream it came from in multi-stream mode"""
+        if source is None:
+            return text
+        return self.localize("{source}: {text}", source=source, text=text)
+
+    def announce_events(self, events, source=None, urgent_ids=None):
+        """Speak hazard track events as warnings, only for urgent tracks if urgent_ids is given;
+        returns the routine notices for newly confirmed hazards that are not urgent"""
+        def say(text, priority):
+            self.speak(self.tag_source(text, source), priority)
+
+        notices = []
+        for event in events:
+            if not event.hazard:
+                continue
+            if urgent_ids is not None and event.track_id not in urgent_ids:
+                # Still mention a hazard coming into view, just not as a warning
+                if event.kind == TRACK_BIRTH:
+                    notices.append(self.describe_position(self.labels[event.class_id], event.zone))
+                continue
+            
+            label = self.labels[event.class_id]
+            if event.kind == TRACK_BIRTH:
+                say(self.localize("Warning: {label} ahead!", label=label), PRIORITY_HAZARD)
+                say(self.describe_position(label, event.zone), PRIORITY_HAZARD)
+            elif event.kind == TRACK_ZONE_CHANGE:
+                say(self.describe_position(label, event.zone), PRIORITY_HAZARD)
+            elif event.kind == TRACK_APPROACH:
+                say(self.localize("Warning: {label} approaching!", label=label), PRIORITY_HAZARD)
+        return notices
+
+    def announce_escalations(self, escalated, events, source=None):
+        """Warn about hazards that just became urgent without a track event saying so"""
+        warned = {event.track_id for event in events if event.kind in (TRACK_BIRTH, TRACK_APPROACH)}
+        for row in escalated:
+            if int(row["track_id"]) in warned:
+                continue
+            label = self.labels[row["class_id"]]
+            if np.isfinite(row["ttc"]):
+                text = self.localize("Warning: {label} approaching!", label=label)
+            else:
+                text = self.localize("Warning: {label} ahead!", label=label)
+            self.speak(self.tag_source(text, source), PRIORITY_HAZARD)
+
+    def rank_hazards(self, spatial, tracker, detections, events, timestamp=None, source=None):
+        """Estimate distance and time-to-contact, announce escalations and return the urgent track ids"""
+        with metrics.timer("spatial"):
+            hazards = spatial.update(detections, tracker.last_track_ids, timestamp)
+            # Unconfirmed tracks may be flicker; they escalate once the tracker confirms them
+            confirmed = np.array([track.track_id for track in tracker.tracks if track.confirmed], dtype=np.int32)
+            urgent = spatial.urgent(hazards[np.isin(hazards["track_id"], confirmed)])
+            escalated = spatial.escalations(urgent)
+        if not self.assistant_mode:
+            self.announce_escalations(escalated, events, source)
+        return set(urgent["track_id"].tolist())
+
+    def create_listener(self):
+        """Build the microphone listener with the configured spotter and recognizer, or None without a spotter"""
+        vosk_model = self.config.get("vosk_model") or os.getenv('DRISHTI_VOSK_MODEL')
+        # Without a local model every idle phrase would go to the recognizer, so that takes an explicit opt-in
+        if not vosk_model and not self.config.get("wake_word_fallback", False):
+            self.logger.error(
+                "Voice input disabled: wake word spotting needs a Vosk model (set vosk_model or "
+                "DRISHTI_VOSK_MODEL), or set wake_word_fallback to check every phrase with the recognizer"
+            )
+            return None
+        recognizer_name = self.config.get("recognizer", "vosk" if vosk_model else "google")
+        if recognizer_name == "vosk":
+            recognizer = VoskRecognizer(vosk_model)
+        elif recognizer_name == "google":
+            recognizer = RECOGNIZERS[recognizer_name](services=self.services)
+        else:
+            recognizer = RECOGNIZERS[recognizer_name]()
+        if vosk_model:
+            # Commands and the wake phrase share one loaded model when both use Vosk
+            shared = recognizer if isinstance(recognizer, VoskRecognizer) else vosk_model
+            spotter = VoskKeywordSpotter(shared, sample_rate=SAMPLE_RATE)
+        else:
+            self.logger.warning(
+                f"No Vosk model: every voiced phrase is checked for the wake word with the {recognizer.name} recognizer"
+            )
+            spotter = RecognizerKeywordSpotter(recognizer)
+
+        source = MicrophoneSource()
+        if self.recorder is not None:
+            source = RecordingAudioSource(source, self.recorder)
+        return WakeWordListener(
+            source, spotter, recognizer, self.on_wake_word, self.on_command,
+            lambda: self.assistant_mode, logger=self.logger
+        )
+
+    def on_wake_word(self):
+        """Switch to assistant mode when the wake word is heard"""
+        if self.recorder is not None:
+            self.recorder.wake()
+        if not self.assistant_mode:
+            self.assistant_mode = True
+            self.command_queue.put("hello")
+
+    def on_command(self, text):
+        """Queue a recognized command for the main loop"""
+        if self.recorder is not None:
+            self.recorder.text(text)
+        self.command_queue.put(text)
 
     def listen_for_wake_word(self):
         """Listen for the wake word and subsequent commands"""
-        with sr.Microphone() as source:
-            self.recognizer.adjust_for_ambient_noise(source)
-            while self.running:
-                try:
-                    audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=3)
-                    text = self.recognizer.recognize_google(audio).lower()
-                    
-                    if not self.assistant_mode and "hello assistant" in text:
-                        self.assistant_mode = True
-                        self.command_queue.put("hello")
-                    elif self.assistant_mode:
-                        self.command_queue.put(text)
-                        
-                except sr.WaitTimeoutError:
-                    continue
-                except sr.UnknownValueError:
-                    continue
-                except sr.RequestError:
-                    self.logger.error("Could not request results from speech recognition service")
-                except Exception as e:
-                    self.logger.error(f"Voice recognition error: {str(e)}")
+        try:
+            self.listener = self.create_listener()
+        except Exception as e:
+            self.logger.error(f"Voice recognition error: {str(e)}")
+            return
+        if self.listener is not None:
+            self.listener.run()
+
+    def handle_detections(self, detections, timestamp=None):
+        """Publish the latest detections and announce what changed since the last frame"""
+        self.current_detections = detections
+        if self.recorder is not None:
+            self.recorder.detections(detections, timestamp)
+        events = self.tracker.update(detections)
+        if self.history is not None:
+            self.history.append(detections, self.tracker.last_track_ids, self.capture_time(timestamp))
+        urgent_ids = self.rank_hazards(self.spatial, self.tracker, detections, events, timestamp)
+        delta = self.scene.update(detections)
+        
+        # Only make automatic announcements in normal mode
+        if not self.assistant_mode:
+            # One routine utterance, since a new routine message replaces a pending one
+            routine = self.announce_events(events, urgent_ids=urgent_ids) + ([delta] if delta else [])
+            if routine:
+                self.speak(", ".join(routine), PRIORITY_ROUTINE)
+
+    def handle_stream_detections(self, source, detections, timestamp=None):
+        """Per-stream counterpart of handle_detections for multi-stream mode"""
+        self.stream_detections[source] = detections
+        if source == self.primary_stream:
+            self.current_detections = detections
+        tracker = self.stream_trackers[source]
+        events = tracker.update(detections)
+        if self.history is not None:
+            self.history.append(
+                detections, tracker.last_track_ids, self.capture_time(timestamp), self.stream_index[source]
+            )
+        urgent_ids = self.rank_hazards(
+            self.stream_spatial[source], tracker, detections, events, timestamp, source
+        )
+        delta = self.stream_scenes[source].update(detections)
+        
+        if not self.assistant_mode:
+            routine = self.announce_events(events, source, urgent_ids) + ([delta] if delta else [])
+            if routine:
+                self.speak(self.tag_source(", ".join(routine), source), PRIORITY_ROUTINE)
+
+    def handle_command(self, command):
+        """Answer a queued assistant command"""
+        if command == "hello":
+            response = self.localize(GREETING_TEXT)
+        else:
+            response = self.process_assistant_command(command)
+
+        # Network-backed replies arrive later; never hold the command loop for them
+        if isinstance(response, Future):
+            if not response.done():
+                self.speak(self.localize("Checking, one moment"))
+            response.add_done_callback(lambda future: self.speak(future.result()))
+            return
+        self.speak(response)
 
     def run(self):
         """Main loop"""
         try:
-            cap = cv2.VideoCapture(0)
-            if not cap.isOpened():
+            cap = self.cap if self.cap is not None else self.open_camera(0)
+            multi_stream = isinstance(cap, dict)
+            if not (cap if multi_stream else cap.isOpened()):
                 self.logger.error("Failed to open camera")
-                self.speak("Camera not accessible")
+                self.speak(self.localize("Camera not accessible"), wait=True)
                 return
 
             self.running = True
-            self.speak("Starting enhanced assistant system")
+            self.speak(self.localize("Starting enhanced assistant system"))
             
             voice_thread = threading.Thread(target=self.listen_for_wake_word, daemon=True)
             voice_thread.start()
             
+            # Capture, inference and announcements run on their own workers
+            observer = self.governor.observe if self.governor is not None else None
+            if self.recorder is not None and not multi_stream:
+                cap = RecordingCapture(cap, self.recorder)
+            if multi_stream:
+                self.pipeline = MultiStreamPipeline(
+                    cap, self.process_batch, self.handle_stream_detections, self.logger,
+                    schedulers=self.stream_schedulers, latency_observer=observer
+                )
+            else:
+                self.pipeline = DetectionPipeline(
+                    cap, self.process_frame, self.handle_detections, self.logger, scheduler=self.scheduler,
+                    latency_observer=observer
+                )
+            self.pipeline.start()
+            
             while self.running:
-                if self.assistant_mode:
-                    try:
-                        command = self.command_queue.get_nowait()
-                        if command == "hello":
-                            response = self.translate_text(
-                                "Hello! I'm here to help. You can ask about the weather, translations, make calls, or say 'what do you see' for object detection.",
-                                self.language
-                            )
-                        else:
-                            response = self.process_assistant_command(command)
-                        self.speak(response)
-                    except queue.Empty:
-                        pass
-
-                # Continue object detection regardless of mode
-                ret, frame = cap.read()
-                if not ret:
-                    self.logger.error("Failed to read frame")
-                    self.speak("Camera feed lost")
+                if self.pipeline.failed:
+                    self.speak(self.localize("Camera feed lost"), PRIORITY_HAZARD, wait=True)
                     break
 
-                self.current_detections = self.process_frame(frame)
-                
-                # Only make automatic announcements in normal mode
-                if not self.assistant_mode:
-                    announcement = self.create_detection_announcement(self.current_detections)
-                    self.speak(announcement)
-                
-                time.sleep(0.5)
+                try:
+                    command = self.command_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                metrics.gauge("command_queue_depth", self.command_queue.qsize())
+                if self.assistant_mode:
+                    self.handle_command(command)
 
         except KeyboardInterrupt:
             self.logger.info("Received keyboard interrupt")
-            self.speak("Shutting down")
+            self.speak(self.localize("Shutting down"), wait=True)
         except Exception as e:
             self.logger.error(f"Runtime error: {str(e)}")
-            self.speak("An error occurred")
+            self.speak(self.localize("An error occurred"), wait=True)
         finally:
             self.running = False
+            if self.listener is not None:
+                self.listener.stop()
+            if self.pipeline is not None:
+                self.pipeline.stop()
             if 'cap' in locals():
-                cap.release()
+                for stream in (cap.values() if isinstance(cap, dict) else [cap]):
+                    stream.release()
+            self.speech.stop()
+            self.translator.close()
+            self.services.close()
+            if self.backend is not None:
+                self.backend.close()
+            if self.recorder is not None:
+                self.recorder.close()
+            if self.history is not None:
+                self.history.close()
+            for exporter in self.metrics_exporters:
+                exporter.stop()
             self.logger.info("Shutdown complete")
 
     def load_labels(self):
         """Load COCO dataset labels"""
-        self.labels = [
-            "person", "bicycle", "car", "motorcycle", "airplane", "bus", "train", "truck", "boat",
-            "traffic light", "fire hydrant", "stop sign", "parking meter", "bench", "bird", "cat",
-            "dog", "horse", "sheep", "cow", "elephant", "bear", "zebra", "giraffe", "backpack",
-            "umbrella", "handbag", "tie", "suitcase", "frisbee", "skis", "snowboard", "sports ball",
-            "kite", "baseball bat", "baseball glove", "skateboard", "surfboard", "tennis racket",
-            "bottle", "wine glass", "cup", "fork", "knife", "spoon", "bowl", "banana", "apple",
-            "sandwich", "orange", "broccoli", "carrot", "hot dog", "pizza", "donut", "cake", "chair",
-            "couch", "potted plant", "bed", "dining table", "toilet", "tv", "laptop", "mouse",
-            "remote", "keyboard", "cell phone", "microwave", "oven", "toaster", "sink", "refrigerator",
-            "book", "clock", "vase", "scissors", "teddy bear", "hair drier", "toothbrush"
-        ]
+        self.labels = list(COCO_LABELS)
 
 if __name__ == "__main__":
     try:
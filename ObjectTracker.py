@@ -0,0 +1,198 @@
+import itertools
+import numpy as np
+from typing import List
+
+TRACK_BIRTH = "birth"
+TRACK_ZONE_CHANGE = "zone_change"
+TRACK_APPROACH = "approach"
+TRACK_GONE = "gone"
+
+
+class Track:
+    def __init__(self, track_id: int, class_id: int, box: np.ndarray, zone: int, hazard: bool):
+        """One object followed across frames"""
+        self.track_id = track_id
+        self.class_id = class_id
+        self.box = box
+        self.zone = zone
+        self.hazard = hazard
+        self.age = 1
+        self.hits = 1
+        self.misses = 0
+        self.confirmed = False
+        self.reference_area = float(box[2] * box[3])
+
+
+class TrackEvent:
+    def __init__(self, kind: str, track: Track):
+        """Something worth announcing happened to a track"""
+        self.kind = kind
+        self.track_id = track.track_id
+        self.class_id = track.class_id
+        self.zone = track.zone
+        self.hazard = track.hazard
+
+    def __repr__(self):
+        return f"TrackEvent({self.kind}, id={self.track_id}, class={self.class_id}, zone={self.zone})"
+
+
+def xywh_to_xyxy(boxes: np.ndarray) -> np.ndarray:
+    """Convert center/size boxes to corner boxes"""
+    half = boxes[:, 2:4] / 2
+    return np.hstack([boxes[:, 0:2] - half, boxes[:, 0:2] + half])
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU between two sets of xywh boxes"""
+    a = xywh_to_xyxy(a)
+    b = xywh_to_xyxy(b)
+    top_left = np.maximum(a[:, None, :2], b[None, :, :2])
+    bottom_right = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.where(union > 0, intersection / np.maximum(union, 1e-9), 0.0)
+
+
+class ObjectTracker:
+    def __init__(self, iou_threshold: float = 0.3, centroid_ratio: float = 0.5, min_hits: int = 2,
+                 max_misses: int = 5, approach_ratio: float = 1.4):
+        """IoU tracker with a centroid fallback that reports births, zone changes, approaches and disappearances"""
+        self.iou_threshold = iou_threshold
+        self.centroid_ratio = centroid_ratio
+        self.min_hits = min_hits
+        self.max_misses = max_misses
+        self.approach_ratio = approach_ratio
+        self.tracks: List[Track] = []
+        self.ids = itertools.count(1)
+        self.last_track_ids = np.empty(0, dtype=np.int32)
+
+    def update(self, detections: np.ndarray) -> List[TrackEvent]:
+        """Associate a detection record with existing tracks and return the resulting events"""
+        events = []
+        boxes = np.stack(
+            [detections["x"], detections["y"], detections["w"], detections["h"]], axis=1
+        ).astype(np.float32) if len(detections) else np.empty((0, 4), dtype=np.float32)
+        class_ids = detections["class_id"]
+        track_ids = np.zeros(len(detections), dtype=np.int32)
+
+        matches = self._associate(boxes, class_ids)
+        matched_tracks = set()
+        for track_index, detection_index in matches:
+            track = self.tracks[track_index]
+            matched_tracks.add(track_index)
+            track_ids[detection_index] = track.track_id
+            self._update_track(track, boxes[detection_index], int(detections["zone"][detection_index]), events)
+
+        for track_index, track in enumerate(self.tracks):
+            if track_index not in matched_tracks:
+                track.misses += 1
+                track.age += 1
+
+        survivors = []
+        for track in self.tracks:
+            if track.misses > self.max_misses:
+                if track.confirmed:
+                    events.append(TrackEvent(TRACK_GONE, track))
+            else:
+                survivors.append(track)
+        self.tracks = survivors
+
+        matched_detections = {detection_index for _, detection_index in matches}
+        for detection_index in range(len(detections)):
+            if detection_index in matched_detections:
+                continue
+            track = Track(
+                next(self.ids),
+                int(class_ids[detection_index]),
+                boxes[detection_index],
+                int(detections["zone"][detection_index]),
+                bool(detections["hazard"][detection_index])
+            )
+            track_ids[detection_index] = track.track_id
+            self._confirm(track, events)
+            self.tracks.append(track)
+
+        self.last_track_ids = track_ids
+        return events
+
+    def active_tracks(self) -> List[Track]:
+        """Tracks that have been confirmed and are still in view"""
+        return [track for track in self.tracks if track.confirmed and track.misses == 0]
+
+    def reset(self):
+        """Forget all tracks, including the ids handed out for the last frame"""
+        self.tracks = []
+        self.last_track_ids = np.empty(0, dtype=np.int32)
+
+    def _associate(self, boxes: np.ndarray, class_ids: np.ndarray):
+        """Greedy same-class matching by IoU, then by centroid distance for the leftovers"""
+        if not self.tracks or len(boxes) == 0:
+            return []
+
+        track_boxes = np.stack([track.box for track in self.tracks])
+        track_classes = np.array([track.class_id for track in self.tracks])
+        same_class = track_classes[:, None] == class_ids[None, :]
+
+        ious = np.where(same_class, iou_matrix(track_boxes, boxes), 0.0)
+        matches = self._greedy(ious, ious >= self.iou_threshold, descending=True)
+
+        # Fast or small objects may not overlap their previous box; fall back to centroid distance
+        distances = np.linalg.norm(track_boxes[:, None, :2] - boxes[None, :, :2], axis=2)
+        reach = self.centroid_ratio * np.maximum(track_boxes[:, 2], track_boxes[:, 3])[:, None]
+        allowed = same_class & (distances <= reach)
+        for track_index, detection_index in matches:
+            allowed[track_index, :] = False
+            allowed[:, detection_index] = False
+        matches.extend(self._greedy(distances, allowed, descending=False))
+        return matches
+
+    def _greedy(self, scores: np.ndarray, allowed: np.ndarray, descending: bool):
+        """Pick the best allowed pairs without reusing a row or column"""
+        rows, cols = np.nonzero(allowed)
+        if len(rows) == 0:
+            return []
+        values = scores[rows, cols]
+        order = np.argsort(-values if descending else values, kind="stable")
+
+        used_rows, used_cols, matches = set(), set(), []
+        for i in order.tolist():
+            row, col = int(rows[i]), int(cols[i])
+            if row in used_rows or col in used_cols:
+                continue
+            used_rows.add(row)
+            used_cols.add(col)
+            matches.append((row, col))
+        return matches
+
+    def _update_track(self, track: Track, box: np.ndarray, zone: int, events: List[TrackEvent]):
+        """Refresh a matched track and emit zone change / approach events"""
+        track.box = box
+        track.age += 1
+        track.hits += 1
+        track.misses = 0
+
+        if not track.confirmed:
+            track.zone = zone
+            self._confirm(track, events)
+            return
+
+        if zone != track.zone:
+            track.zone = zone
+            events.append(TrackEvent(TRACK_ZONE_CHANGE, track))
+
+        area = float(box[2] * box[3])
+        if area >= track.reference_area * self.approach_ratio:
+            track.reference_area = area
+            events.append(TrackEvent(TRACK_APPROACH, track))
+        elif area < track.reference_area:
+            # Re-arm on receding so the next approach is measured from the nearest low point
+            track.reference_area = area
+
+    def _confirm(self, track: Track, events: List[TrackEvent]):
+        """Announce a track once it has been seen often enough to not be a flicker"""
+        if not track.confirmed and track.hits >= self.min_hits:
+            track.confirmed = True
+            track.reference_area = float(track.box[2] * track.box[3])
+            events.append(TrackEvent(TRACK_BIRTH, track))
@@ -0,0 +1,171 @@
+import json
+import os
+import threading
+import time
+import logging
+import numpy as np
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from Metrics import metrics
+
+# Cheapest first; each level is a model variant, an input size and a cap on inferences per second
+QUALITY_LEVELS = [
+    {"name": "minimal", "model": "yolov8n.pt", "imgsz": 256, "max_fps": 3.0},
+    {"name": "low", "model": "yolov8n.pt", "imgsz": 320, "max_fps": 5.0},
+    {"name": "medium", "model": "yolov8n.pt", "imgsz": 480, "max_fps": 8.0},
+    {"name": "high", "model": "yolov8n.pt", "imgsz": 640, "max_fps": 10.0},
+    {"name": "max", "model": "yolov8s.pt", "imgsz": 640, "max_fps": 10.0},
+]
+
+
+def initial_level(levels: List[Dict[str, Any]], saved: Optional[str], model_path: str, imgsz: int) -> int:
+    """Index to start from: the level saved on this device, else the one matching the requested model,
+    else the largest level of that model that is no bigger than the requested input size"""
+    names = [level["name"] for level in levels]
+    if saved in names:
+        return names.index(saved)
+    fitting = [
+        i for i, level in enumerate(levels) if level["model"] == model_path and level["imgsz"] <= imgsz
+    ]
+    return fitting[-1] if fitting else 0
+
+
+class QualityGovernor:
+    def __init__(self, levels: List[Dict[str, Any]], apply: Callable[[Dict[str, Any]], None], slo: float,
+                 level: int = 0, window: float = 3.0, min_samples: int = 5, percentile: float = 90.0,
+                 cpu_high: float = 0.85, up_margin: float = 0.6, up_windows: int = 3, cooldown: float = 10.0,
+                 backoff: float = 30.0, max_backoff: float = 600.0, event_log: Optional[str] = None,
+                 logger: Optional[logging.Logger] = None):
+        """Step between quality levels to keep the frame latency percentile under slo seconds"""
+        self.levels = levels
+        self.apply = apply
+        self.slo = slo
+        self.level = level
+        self.window = window
+        self.min_samples = min_samples
+        self.percentile = percentile
+        self.cpu_high = cpu_high
+        # Climb only with clear headroom, and only after several good windows in a row
+        self.up_margin = up_margin
+        self.up_windows = up_windows
+        self.cooldown = cooldown
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.event_log = event_log
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.lock = threading.Lock()
+        self.samples: List[float] = []
+        self.window_started = time.monotonic()
+        self.cpu_started = time.process_time()
+        self.good_windows = 0
+        self.hold_until = time.monotonic() + cooldown
+        # A level that had to be abandoned stays out of reach for a growing while
+        self.blocked_until = [0.0] * len(levels)
+        self.penalties = [0.0] * len(levels)
+        self.switching = False
+        self.events = deque(maxlen=100)
+        metrics.gauge("quality_level", level)
+
+    @property
+    def current(self) -> Dict[str, Any]:
+        return self.levels[self.level]
+
+    def observe(self, latency: float):
+        """Record one capture-to-announcement latency; evaluates once per window"""
+        with self.lock:
+            if self.switching:
+                return
+            self.samples.append(latency)
+            now = time.monotonic()
+            if now - self.window_started < self.window or len(self.samples) < self.min_samples:
+                return
+            decision = self._evaluate(now)
+        if decision is not None:
+            self._switch(*decision)
+
+    def cpu_load(self, now: float) -> float:
+        """Share of all cores this process used since the last window"""
+        cpu = time.process_time()
+        elapsed = max(now - self.window_started, 1e-6)
+        load = (cpu - self.cpu_started) / elapsed / (os.cpu_count() or 1)
+        self.cpu_started = cpu
+        return load
+
+    def _evaluate(self, now: float):
+        """Decide on a level change from the finished window; returns (target, reason, stats) or None"""
+        latency = float(np.percentile(self.samples, self.percentile))
+        cpu = self.cpu_load(now)
+        stats = {"latency_ms": round(latency * 1000, 1), "cpu": round(cpu, 3), "samples": len(self.samples)}
+        self.samples = []
+        self.window_started = now
+        metrics.gauge("governor_latency", latency)
+        metrics.gauge("governor_cpu", cpu)
+
+        over = latency > self.slo or cpu > self.cpu_high
+        if over:
+            self.good_windows = 0
+            if self.level == 0 or now < self.hold_until:
+                return None
+            # Remember that this level could not hold the SLO, for longer each time it fails
+            self.penalties[self.level] = min(self.max_backoff, (self.penalties[self.level] * 2) or self.backoff)
+            self.blocked_until[self.level] = now + self.penalties[self.level]
+            reason = "latency over SLO" if latency > self.slo else "CPU overloaded"
+            return self.level - 1, reason, stats
+
+        headroom = latency < self.slo * self.up_margin and cpu < self.cpu_high * self.up_margin
+        self.good_windows = self.good_windows + 1 if headroom else 0
+        target = self.level + 1
+        if (self.good_windows >= self.up_windows and target < len(self.levels)
+                and now >= self.hold_until and now >= self.blocked_until[target]):
+            self.good_windows = 0
+            return target, "headroom", stats
+        return None
+
+    def _switch(self, target: int, reason: str, stats: Dict[str, Any]):
+        """Apply the new level off the caller's thread; samples taken meanwhile are ignored"""
+        with self.lock:
+            self.switching = True
+        previous = self.level
+        event = {
+            "time": time.time(), "from": self.levels[previous]["name"], "to": self.levels[target]["name"],
+            "reason": reason, **stats,
+        }
+        threading.Thread(target=self._apply, args=(target, event), daemon=True).start()
+
+    def _apply(self, target: int, event: Dict[str, Any]):
+        started = time.monotonic()
+        try:
+            self.apply(self.levels[target])
+        except Exception as e:
+            self.logger.error(f"Quality level change failed: {str(e)}")
+            event["error"] = str(e)
+            # Keep the failing level out of reach for as long as possible
+            self.blocked_until[target] = time.monotonic() + self.max_backoff
+        else:
+            self.level = target
+        event["switch_s"] = round(time.monotonic() - started, 3)
+        self.record(event)
+
+        with self.lock:
+            self.samples = []
+            self.window_started = time.monotonic()
+            self.cpu_started = time.process_time()
+            self.hold_until = self.window_started + self.cooldown
+            self.switching = False
+        metrics.gauge("quality_level", self.level)
+
+    def record(self, event: Dict[str, Any]):
+        """Keep the event in memory, log it and append it to the event log file if configured"""
+        self.events.append(event)
+        self.logger.info(
+            f"Quality {event['from']} -> {event['to']}: {event['reason']} "
+            f"(p{int(self.percentile)} {event['latency_ms']} ms, CPU {event['cpu']:.0%})"
+        )
+        if self.event_log:
+            try:
+                with open(self.event_log, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(event) + "\n")
+            except OSError as e:
+                self.logger.error(f"Governor log error: {str(e)}")
@@ -0,0 +1,129 @@
+import numpy as np
+from typing import List
+
+from DetectionPostProcess import ZONE_LEFT, ZONE_RIGHT
+
+NUMBER_WORDS = {
+    "en": ["zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten"],
+    "hi": ["शून्य", "एक", "दो", "तीन", "चार", "पांच", "छह", "सात", "आठ", "नौ", "दस"],
+}
+
+# English plurals that don't just take an 's'
+IRREGULAR_PLURALS = {
+    "person": "people", "mouse": "mice", "knife": "knives", "sheep": "sheep", "skis": "skis",
+    "scissors": "scissors", "bus": "buses", "couch": "couches", "sandwich": "sandwiches",
+    "wine glass": "wine glasses", "hair drier": "hair driers",
+}
+
+ZONE_COUNT = 3
+
+
+def pluralize(label: str) -> str:
+    """English plural of a label"""
+    if label in IRREGULAR_PLURALS:
+        return IRREGULAR_PLURALS[label]
+    if label.endswith(("s", "x", "ch", "sh")):
+        return label + "es"
+    return label + "s"
+
+
+class SceneState:
+    def __init__(self, labels: List[str], translator, language: str = "en", min_frames: int = 3,
+                 max_items: int = 3, hazard_mask=None):
+        """Per-class, per-zone object counts kept across frames, described as short spoken deltas"""
+        self.labels = labels
+        self.translator = translator
+        self.min_frames = min_frames
+        self.max_items = max_items
+        self.hazard_mask = np.zeros(len(labels), dtype=bool) if hazard_mask is None else hazard_mask
+
+        shape = (len(labels), ZONE_COUNT)
+        self.stable = np.zeros(shape, dtype=np.int32)
+        self.candidate = np.zeros(shape, dtype=np.int32)
+        self.candidate_frames = np.zeros(shape, dtype=np.int32)
+        self.set_language(language)
+
+    def set_language(self, language: str):
+        """Precompute every label's spoken singular and plural so describing never translates"""
+        self.language = language
+        compose = self.translator.compose
+        if language == "en":
+            self.singular = list(self.labels)
+            self.plural = [pluralize(label) for label in self.labels]
+        else:
+            # Hindi nouns are spoken the same for one or many in these phrases
+            self.singular = [compose(label, language) for label in self.labels]
+            self.plural = self.singular
+        self.numbers = NUMBER_WORDS.get(language, NUMBER_WORDS["en"])
+
+    def count_words(self, class_id: int, count: int):
+        """(number, label) spoken for count objects of a class"""
+        number = self.numbers[count] if count < len(self.numbers) else str(count)
+        return number, (self.plural if count > 1 else self.singular)[class_id]
+
+    def observe(self, detections: np.ndarray) -> np.ndarray:
+        """Count detections per (class, zone) in one pass"""
+        cells = detections["class_id"].astype(np.int64) * ZONE_COUNT + detections["zone"]
+        return np.bincount(cells, minlength=self.stable.size).reshape(self.stable.shape).astype(np.int32)
+
+    def update(self, detections: np.ndarray) -> str:
+        """Fold in one frame; returns the spoken delta, or "" if nothing settled into a new count"""
+        observed = self.observe(detections)
+        # A cell only changes after holding the same new value for min_frames frames
+        self.candidate_frames = np.where(observed == self.candidate, self.candidate_frames + 1, 1)
+        self.candidate = observed
+        settled = (self.candidate_frames >= self.min_frames) & (self.candidate != self.stable)
+        if not settled.any():
+            return ""
+
+        previous = self.stable
+        self.stable = np.where(settled, self.candidate, self.stable)
+        return self.describe_delta(previous, self.stable)
+
+    def describe_delta(self, previous: np.ndarray, current: np.ndarray) -> str:
+        """Short phrases for classes whose total changed, hazards and larger changes first"""
+        change = current.sum(axis=1) - previous.sum(axis=1)
+        changed = np.flatnonzero(change)
+        if len(changed) == 0:
+            return ""
+        order = np.lexsort((-np.abs(change[changed]), ~self.hazard_mask[changed]))
+
+        phrases = []
+        for class_id in changed[order][:self.max_items].tolist():
+            delta = int(change[class_id])
+            if delta > 0:
+                grown = current[class_id] - previous[class_id]
+                phrases.append(self._arrival(class_id, delta, int(np.argmax(grown)), previous[class_id].sum() > 0))
+            elif current[class_id].sum() == 0:
+                phrases.append(self.translator.compose("{label} gone", self.language, label=self.singular[class_id]))
+            else:
+                number, label = self.count_words(class_id, -delta)
+                phrases.append(self.translator.compose("{count} fewer {label}", self.language, count=number, label=label))
+        return ", ".join(phrases)
+
+    def describe(self) -> str:
+        """Everything currently in view, e.g. "two people on the left, one car ahead" """
+        phrases = []
+        for class_id, zone in zip(*np.nonzero(self.stable)):
+            number, label = self.count_words(int(class_id), int(self.stable[class_id, zone]))
+            phrases.append(self._in_zone("{count} {label}", int(zone), count=number, label=label))
+        return ", ".join(phrases)
+
+    def reset(self):
+        self.stable[:] = 0
+        self.candidate[:] = 0
+        self.candidate_frames[:] = 0
+
+    def _arrival(self, class_id: int, count: int, zone: int, more: bool) -> str:
+        number, label = self.count_words(class_id, count)
+        template = "{count} more {label}" if more else "{count} {label}"
+        return self._in_zone(template, zone, count=number, label=label)
+
+    def _in_zone(self, template: str, zone: int, **slots) -> str:
+        if zone == ZONE_LEFT:
+            template += " on the left"
+        elif zone == ZONE_RIGHT:
+            template += " on the right"
+        else:
+            template += " ahead"
+        return self.translator.compose(template, self.language, **slots)
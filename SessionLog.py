@@ -0,0 +1,149 @@
+import os
+import struct
+import threading
+import time
+import cv2
+import numpy as np
+from typing import Iterator, Optional, Tuple
+
+from DetectionPostProcess import DETECTION_DTYPE
+from FrameBuffers import read_into
+
+MAGIC = b"DRISHTI-LOG1\n"
+# timestamp (seconds since the session started), record kind, payload length
+RECORD_HEADER = struct.Struct("<dBI")
+
+RECORD_FRAME = 1        # JPEG-encoded camera frame
+RECORD_AUDIO = 2        # raw 16-bit mono PCM chunk
+RECORD_WAKE = 3         # wake word heard, no payload
+RECORD_TEXT = 4         # recognized command text
+RECORD_DETECTIONS = 5   # detection record bytes
+RECORD_SPEECH = 6       # "<priority>\t<text>" handed to the speech scheduler
+RECORD_KINDS = {
+    RECORD_FRAME: "frame", RECORD_AUDIO: "audio", RECORD_WAKE: "wake", RECORD_TEXT: "text",
+    RECORD_DETECTIONS: "detections", RECORD_SPEECH: "speech",
+}
+
+
+def fresh_path(path: str) -> str:
+    """path itself when nothing is there yet, else path with the current time before its extension"""
+    if not os.path.exists(path):
+        return path
+    root, extension = os.path.splitext(path)
+    stamped = f"{root}-{time.strftime('%Y%m%d-%H%M%S')}"
+    candidate, count = stamped + extension, 1
+    while os.path.exists(candidate):
+        candidate, count = f"{stamped}-{count}{extension}", count + 1
+    return candidate
+
+
+class SessionRecorder:
+    def __init__(self, path: str, jpeg_quality: int = 80):
+        """Append-only log of everything that goes in and out of an assistant session;
+        an existing log is never overwritten, the new one gets a timestamped name instead"""
+        self.path = fresh_path(path)
+        self.jpeg_quality = jpeg_quality
+        self.file = open(self.path, "xb")
+        self.file.write(MAGIC)
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.counts = {kind: 0 for kind in RECORD_KINDS}
+
+    def write(self, kind: int, payload: bytes = b"", timestamp: Optional[float] = None):
+        """Append one record; timestamp is a time.monotonic() value, defaulting to now"""
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        with self.lock:
+            if self.file is None:
+                return
+            self.file.write(RECORD_HEADER.pack(timestamp - self.started, kind, len(payload)))
+            self.file.write(payload)
+            self.counts[kind] += 1
+
+    def frame(self, frame: np.ndarray, timestamp: Optional[float] = None):
+        ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if ok:
+            self.write(RECORD_FRAME, encoded.tobytes(), timestamp)
+
+    def audio(self, chunk: bytes):
+        self.write(RECORD_AUDIO, chunk)
+
+    def wake(self):
+        self.write(RECORD_WAKE)
+
+    def text(self, text: str):
+        self.write(RECORD_TEXT, text.encode("utf-8"))
+
+    def detections(self, detections: np.ndarray, timestamp: Optional[float] = None):
+        """Log a frame's detections stamped with its capture time, which ties them to its frame record"""
+        self.write(RECORD_DETECTIONS, np.ascontiguousarray(detections).tobytes(), timestamp)
+
+    def speech(self, text: str, priority: int):
+        self.write(RECORD_SPEECH, f"{priority}\t{text}".encode("utf-8"))
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+def read_log(path: str) -> Iterator[Tuple[float, int, bytes]]:
+    """(timestamp, kind, payload) for every record, stopping cleanly at a truncated tail"""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a session log")
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            timestamp, kind, length = RECORD_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            yield timestamp, kind, payload
+
+
+def decode_frame(payload: bytes) -> np.ndarray:
+    return cv2.imdecode(np.frombuffer(payload, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+def decode_detections(payload: bytes) -> np.ndarray:
+    return np.frombuffer(payload, dtype=DETECTION_DTYPE).copy()
+
+
+def decode_speech(payload: bytes) -> Tuple[int, str]:
+    priority, text = payload.decode("utf-8").split("\t", 1)
+    return int(priority), text
+
+
+class RecordingCapture:
+    def __init__(self, cap, recorder: SessionRecorder):
+        """VideoCapture wrapper that logs every frame it returns"""
+        self.cap = cap
+        self.recorder = recorder
+
+    def read(self, image=None):
+        ret, frame = read_into(self.cap, image)
+        if ret:
+            self.recorder.frame(frame)
+        return ret, frame
+
+    def __getattr__(self, name):
+        return getattr(self.cap, name)
+
+
+class RecordingAudioSource:
+    def __init__(self, source, recorder: SessionRecorder):
+        """Audio source wrapper that logs every chunk it returns"""
+        self.source = source
+        self.recorder = recorder
+        self.sample_rate = source.sample_rate
+
+    def read(self) -> Optional[bytes]:
+        chunk = self.source.read()
+        if chunk is not None:
+            self.recorder.audio(chunk)
+        return chunk
+
+    def close(self):
+        self.source.close()
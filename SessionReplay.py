@@ -0,0 +1,269 @@
+import argparse
+import bisect
+import difflib
+import json
+import sys
+import threading
+import time
+import cv2
+import numpy as np
+from typing import Dict, List, Tuple
+
+from Benchmark import NullSpeechEngine, summarize
+from NetworkServices import ServiceClient, CircuitOpenError
+from ObjectDetectionWithAssistantAndList import IntelligentAssistant
+from SessionLog import (
+    read_log, decode_frame, decode_detections, decode_speech,
+    RECORD_FRAME, RECORD_WAKE, RECORD_TEXT, RECORD_DETECTIONS, RECORD_SPEECH
+)
+from SpeechScheduler import PRIORITY_HAZARD, PRIORITY_REPLY, PRIORITY_ROUTINE
+
+LATENCY_PERCENTILES = ("p50_ms", "p95_ms")
+# Sub-millisecond jitter is never a regression, however small the baseline
+LATENCY_SLACK_MS = 1.0
+
+
+class OfflineServices(ServiceClient):
+    def call(self, name, func, *args, **kwargs):
+        """Every outbound call fails the same way, so replies are reproducible without a network"""
+        raise CircuitOpenError(f"{name} service unavailable during replay")
+
+
+class ReplayCapture:
+    def __init__(self, frames: List[Tuple[float, bytes]], realtime: bool = False):
+        """VideoCapture stand-in serving logged frames, one at a time in lockstep with the announcer"""
+        self.frames = frames
+        self.realtime = realtime
+        self.index = 0
+        self.timestamp = 0.0
+        self.read_at = 0.0
+        self.started = None
+        self.released = threading.Event()
+        self.released.set()
+        self.closed = False
+        first = decode_frame(frames[0][1]) if frames else None
+        self.shape = first.shape if first is not None else (0, 0, 3)
+
+    def isOpened(self) -> bool:
+        return bool(self.frames)
+
+    def set(self, prop, value) -> bool:
+        return True
+
+    def get(self, prop) -> float:
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.shape[1])
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.shape[0])
+        return 0.0
+
+    def read(self, image=None):
+        """Next frame once the previous one has been announced; pacing follows the log in realtime mode.
+        Frames are decoded fresh, so image is ignored like OpenCV does on a shape mismatch"""
+        while not self.released.wait(0.1):
+            if self.closed:
+                return False, None
+        self.released.clear()
+        if self.closed or self.index >= len(self.frames):
+            return False, None
+
+        timestamp, payload = self.frames[self.index]
+        self.index += 1
+        if self.realtime:
+            if self.started is None:
+                self.started = time.monotonic() - timestamp
+            delay = self.started + timestamp - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        self.timestamp = timestamp
+        self.read_at = time.perf_counter()
+        return True, decode_frame(payload)
+
+    def frame_done(self):
+        """Let read() hand out the next frame"""
+        self.released.set()
+
+    def release(self):
+        self.closed = True
+        self.released.set()
+
+
+def inferred_frames(frames: List[Tuple[float, bytes]], inferred_at: List[float]) -> List[Tuple[float, bytes]]:
+    """The frames the live session ran the model on and announced, each matched to the last frame
+    recorded at or before its detections' capture time"""
+    times = [timestamp for timestamp, _ in frames]
+    indexes = sorted({bisect.bisect_right(times, timestamp) - 1 for timestamp in inferred_at} - {-1})
+    return [frames[index] for index in indexes]
+
+
+class ReplayAssistant(IntelligentAssistant):
+    def __init__(self, log_path: str, realtime: bool = False, **kwargs):
+        """Assistant driven entirely from a session log: no camera, microphone, speaker or network"""
+        records = list(read_log(log_path))
+        self.replay_inputs = [(ts, kind, payload) for ts, kind, payload in records
+                              if kind in (RECORD_WAKE, RECORD_TEXT)]
+        self.recorded_detections = [decode_detections(payload) for _, kind, payload in records
+                                    if kind == RECORD_DETECTIONS]
+        self.recorded_speech = [decode_speech(payload) for _, kind, payload in records
+                                if kind == RECORD_SPEECH]
+        self.null_engine = NullSpeechEngine()
+        self.replayed_detections: List[np.ndarray] = []
+        self.spoken: List[Tuple[int, str]] = []
+        self.latencies: List[float] = []
+
+        kwargs.setdefault("language", "en")
+        super().__init__(camera_index=None, **kwargs)
+        frames = [(ts, payload) for ts, kind, payload in records if kind == RECORD_FRAME]
+        inferred_at = [ts for ts, kind, _ in records if kind == RECORD_DETECTIONS]
+        # Frames skipped live by motion gating or a full queue are skipped again; a log without
+        # detections records, e.g. one built by hand, has every frame inferred
+        if inferred_at:
+            frames = inferred_frames(frames, inferred_at)
+        self.cap = ReplayCapture(frames, realtime)
+        self.spatial.set_frame_width(self.cap.shape[1])
+        # Frames are stamped with session time from zero; history places the session as starting now
+        self.clock_offset = time.time()
+        # The log already says which frames were inferred, and each must reach the announcer for the lockstep
+        self.scheduler = None
+
+    @property
+    def console(self):
+        """stderr, so the JSON report printed to stdout stays parseable"""
+        return sys.stderr
+
+    def setup_recording(self):
+        """A replay never records, even with DRISHTI_RECORD set; it would append to the live session log"""
+        self.recorder = None
+
+    def initialize_components(self, confidence_threshold):
+        super().initialize_components(confidence_threshold)
+        self.services.close()
+        self.services = OfflineServices(logger=self.logger)
+        self.translator.services = self.services
+
+    def create_speech_engine(self):
+        return self.null_engine
+
+    def speak(self, text, priority=PRIORITY_REPLY, wait=False):
+        self.spoken.append((priority, text))
+        super().speak(text, priority, wait=False)
+
+    def listen_for_wake_word(self):
+        """Voice input comes from the log, delivered by deliver_inputs()"""
+
+    def on_wake_word(self):
+        if not self.assistant_mode:
+            self.assistant_mode = True
+            self.handle_command("hello")
+
+    def deliver_inputs(self, until: float):
+        """Apply logged wake words and commands up to the given session time, in order"""
+        while self.replay_inputs and self.replay_inputs[0][0] <= until:
+            _, kind, payload = self.replay_inputs.pop(0)
+            if kind == RECORD_WAKE:
+                self.on_wake_word()
+            elif self.assistant_mode:
+                self.handle_command(payload.decode("utf-8"))
+
+    def handle_detections(self, detections, timestamp=None):
+        """Use the logged capture time so speeds and announcements don't depend on replay speed"""
+        timestamp = self.cap.timestamp
+        self.replayed_detections.append(detections)
+        try:
+            self.deliver_inputs(timestamp)
+            super().handle_detections(detections, timestamp)
+        finally:
+            self.latencies.append(time.perf_counter() - self.cap.read_at)
+            self.cap.frame_done()
+
+
+def announcements(spoken: List[Tuple[int, str]]) -> List[str]:
+    """Hazard and routine utterances, the part of the output driven by the camera"""
+    return [text for priority, text in spoken if priority in (PRIORITY_HAZARD, PRIORITY_ROUTINE)]
+
+
+def detection_counts(detections: List[np.ndarray]) -> List[int]:
+    return [len(record) for record in detections]
+
+
+def run_replay(assistant: ReplayAssistant) -> Dict:
+    """Drive run() through the whole log and report latency and behaviour"""
+    started = time.perf_counter()
+    assistant.run()
+    elapsed = time.perf_counter() - started
+
+    replayed = detection_counts(assistant.replayed_detections)
+    recorded = detection_counts(assistant.recorded_detections)
+    mismatched = sum(1 for a, b in zip(replayed, recorded) if a != b) + abs(len(replayed) - len(recorded))
+    return {
+        "frames": assistant.cap.index,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_fps": round(assistant.cap.index / elapsed, 2) if elapsed > 0 else 0.0,
+        "frame_latency": summarize(assistant.latencies),
+        "detection_counts": replayed,
+        "detection_count_mismatches": mismatched,
+        "announcements": announcements(assistant.spoken),
+        "recorded_announcements": announcements(assistant.recorded_speech),
+        "replies": [text for priority, text in assistant.spoken if priority == PRIORITY_REPLY],
+    }
+
+
+def compare_reports(report: Dict, baseline: Dict, latency_tolerance: float = 0.5) -> List[str]:
+    """Differences in announcements and per-frame detection counts against an earlier report, and frame
+    latency percentiles more than latency_tolerance (a fraction) above the baseline's"""
+    differences = list(difflib.unified_diff(
+        baseline["announcements"], report["announcements"], "baseline", "replay", lineterm=""
+    ))
+    if report["detection_counts"] != baseline["detection_counts"]:
+        differences.append("detection counts differ")
+    latency, baseline_latency = report.get("frame_latency", {}), baseline.get("frame_latency", {})
+    for key in LATENCY_PERCENTILES:
+        if key not in latency or key not in baseline_latency:
+            continue
+        limit = baseline_latency[key] * (1 + latency_tolerance) + LATENCY_SLACK_MS
+        if latency[key] > limit:
+            differences.append(
+                f"frame latency {key[:-3]} {latency[key]} ms exceeds baseline {baseline_latency[key]} ms"
+            )
+    return differences
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded assistant session without devices")
+    parser.add_argument("log", help="session log written with DRISHTI_RECORD")
+    parser.add_argument("--realtime", action="store_true", help="pace frames as recorded instead of max speed")
+    parser.add_argument("--model", default="yolov8n.pt")
+    parser.add_argument("--backend", default="auto", help="auto, torch, onnx or openvino")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--conf", type=float, default=0.3)
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--baseline", help="earlier replay report to check for regressions")
+    parser.add_argument("--latency-tolerance", type=float, default=0.5,
+                        help="allowed frame latency p50/p95 increase over the baseline, as a fraction")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    assistant = ReplayAssistant(
+        args.log, realtime=args.realtime, model_path=args.model, confidence_threshold=args.conf,
+        backend=args.backend, imgsz=args.imgsz, language=args.language
+    )
+    report = run_replay(assistant)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            differences = compare_reports(report, json.load(f), args.latency_tolerance)
+        for line in differences:
+            print(line, file=sys.stderr)
+        if differences:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
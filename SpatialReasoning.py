@@ -0,0 +1,139 @@
+import math
+import time
+import numpy as np
+from typing import Dict, List, Optional
+
+# Typical real-world heights in metres, used to turn box height into distance
+OBJECT_HEIGHTS = {
+    "person": 1.7, "bicycle": 1.1, "car": 1.5, "motorcycle": 1.2, "bus": 3.2, "train": 3.8,
+    "truck": 3.0, "traffic light": 0.9, "fire hydrant": 0.8, "stop sign": 0.75, "bench": 0.9,
+    "dog": 0.6, "cat": 0.3, "horse": 1.6, "cow": 1.4, "chair": 0.9, "potted plant": 0.6,
+}
+DEFAULT_HEIGHT = 1.0
+DEFAULT_FOV_DEGREES = 70.0
+
+# One row per tracked detection, in the same order as the detection record
+HAZARD_DTYPE = np.dtype([
+    ("track_id", np.int32),
+    ("class_id", np.int16),
+    ("zone", np.int8),
+    ("hazard", np.bool_),
+    ("distance", np.float32),
+    ("closing_speed", np.float32),
+    ("ttc", np.float32),
+])
+
+
+def focal_length_from_fov(frame_width: int, fov_degrees: float = DEFAULT_FOV_DEGREES) -> float:
+    """Pinhole focal length in pixels from the horizontal field of view"""
+    return (frame_width / 2) / math.tan(math.radians(fov_degrees) / 2)
+
+
+def calibrate_focal_length(distance: float, box_height: float, real_height: float) -> float:
+    """Focal length in pixels from one object of known height seen at a known distance"""
+    return distance * box_height / real_height
+
+
+class SpatialEstimator:
+    def __init__(self, labels: List[str], focal_px: Optional[float] = None, frame_width: int = 640,
+                 fov_degrees: float = DEFAULT_FOV_DEGREES, heights: Dict[str, float] = OBJECT_HEIGHTS,
+                 smoothing: float = 0.5, min_closing_speed: float = 0.3, max_ttc: float = 4.0,
+                 near_distance: float = 3.0, top_k: int = 1, max_age: float = 2.0):
+        """Distance from box height, closing speed from consecutive frames and time-to-contact per track"""
+        self.fov_degrees = fov_degrees
+        self.calibrated = focal_px is not None
+        self.focal_px = focal_px if focal_px is not None else focal_length_from_fov(frame_width, fov_degrees)
+        self.heights = np.array([heights.get(label, DEFAULT_HEIGHT) for label in labels], dtype=np.float32)
+        self.smoothing = smoothing
+        self.min_closing_speed = min_closing_speed
+        self.max_ttc = max_ttc
+        self.near_distance = near_distance
+        self.top_k = top_k
+        self.max_age = max_age
+
+        # Per-track state as parallel arrays sorted by track id
+        self.track_ids = np.empty(0, dtype=np.int32)
+        self.distances = np.empty(0, dtype=np.float32)
+        self.speeds = np.empty(0, dtype=np.float32)
+        self.times = np.empty(0, dtype=np.float64)
+        self.urgent_ids = np.empty(0, dtype=np.int32)
+        self.last_duration = 0.0
+
+    def set_frame_width(self, frame_width: int):
+        """Re-derive the focal length for a new resolution unless it was calibrated explicitly"""
+        if not self.calibrated:
+            self.focal_px = focal_length_from_fov(frame_width, self.fov_degrees)
+
+    def distances_for(self, detections: np.ndarray) -> np.ndarray:
+        """Estimated distance in metres of every detection"""
+        heights = self.heights[detections["class_id"]]
+        return self.focal_px * heights / np.maximum(detections["h"], 1.0)
+
+    def update(self, detections: np.ndarray, track_ids: np.ndarray, timestamp: Optional[float] = None) -> np.ndarray:
+        """Hazard record for the frame: distance, smoothed closing speed and time-to-contact per detection"""
+        started = time.perf_counter()
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        track_ids = np.asarray(track_ids, dtype=np.int32)
+        distances = self.distances_for(detections).astype(np.float32)
+        speeds = np.zeros(len(detections), dtype=np.float32)
+
+        # Look up each track's previous distance in the sorted state arrays
+        if len(self.track_ids) and len(track_ids):
+            slots = np.clip(np.searchsorted(self.track_ids, track_ids), 0, len(self.track_ids) - 1)
+            known = self.track_ids[slots] == track_ids
+            dt = timestamp - self.times[slots]
+            known &= dt > 0
+            closing = np.zeros(len(detections), dtype=np.float32)
+            closing[known] = (self.distances[slots[known]] - distances[known]) / dt[known]
+            speeds[known] = self.smoothing * closing[known] + (1 - self.smoothing) * self.speeds[slots[known]]
+
+        with np.errstate(divide="ignore"):
+            ttc = np.where(speeds > self.min_closing_speed, distances / np.maximum(speeds, 1e-6), np.inf)
+
+        hazards = np.empty(len(detections), dtype=HAZARD_DTYPE)
+        hazards["track_id"] = track_ids
+        hazards["class_id"] = detections["class_id"]
+        hazards["zone"] = detections["zone"]
+        hazards["hazard"] = detections["hazard"]
+        hazards["distance"] = distances
+        hazards["closing_speed"] = speeds
+        hazards["ttc"] = ttc
+
+        self._remember(track_ids, distances, speeds, timestamp)
+        self.last_duration = time.perf_counter() - started
+        return hazards
+
+    def rank(self, hazards: np.ndarray) -> np.ndarray:
+        """Hazard rows ordered most urgent first: time-to-contact, then distance"""
+        order = np.lexsort((hazards["distance"], hazards["ttc"]))
+        return hazards[order]
+
+    def urgent(self, hazards: np.ndarray) -> np.ndarray:
+        """The top_k hazard-class rows that are about to be reached or are already close"""
+        pressing = hazards["hazard"] & (
+            (hazards["ttc"] <= self.max_ttc) | (hazards["distance"] <= self.near_distance)
+        )
+        return self.rank(hazards[pressing])[:self.top_k]
+
+    def escalations(self, urgent: np.ndarray) -> np.ndarray:
+        """Urgent rows whose track was not urgent on the previous frame"""
+        fresh = urgent[~np.isin(urgent["track_id"], self.urgent_ids)]
+        self.urgent_ids = urgent["track_id"].copy()
+        return fresh
+
+    def reset(self):
+        self.urgent_ids = np.empty(0, dtype=np.int32)
+        self.track_ids = np.empty(0, dtype=np.int32)
+        self.distances = np.empty(0, dtype=np.float32)
+        self.speeds = np.empty(0, dtype=np.float32)
+        self.times = np.empty(0, dtype=np.float64)
+
+    def _remember(self, track_ids: np.ndarray, distances: np.ndarray, speeds: np.ndarray, timestamp: float):
+        """Merge this frame into the per-track state and drop tracks not seen for max_age seconds"""
+        keep = (self.times >= timestamp - self.max_age) & ~np.isin(self.track_ids, track_ids)
+        ids = np.concatenate([self.track_ids[keep], track_ids])
+        order = np.argsort(ids, kind="stable")
+        self.track_ids = ids[order]
+        self.distances = np.concatenate([self.distances[keep], distances])[order]
+        self.speeds = np.concatenate([self.speeds[keep], speeds])[order]
+        self.times = np.concatenate([self.times[keep], np.full(len(track_ids), timestamp)])[order]
@@ -0,0 +1,248 @@
+import heapq
+import itertools
+import threading
+import time
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from Metrics import metrics
+
+PRIORITY_HAZARD = 0
+PRIORITY_REPLY = 1
+PRIORITY_ROUTINE = 2
+
+# Seconds a message may wait in the queue before it is no longer worth saying
+DEFAULT_TTL = {
+    PRIORITY_HAZARD: 3.0,
+    PRIORITY_REPLY: 30.0,
+    PRIORITY_ROUTINE: 4.0,
+}
+# Quiet seconds before an engine with an idle() hook may do background work
+IDLE_AFTER = 0.5
+
+
+class Utterance:
+    def __init__(self, text: str, priority: int, expires_at: float, done: Optional[threading.Event]):
+        """A queued message waiting to be spoken"""
+        self.text = text
+        self.priority = priority
+        self.expires_at = expires_at
+        self.queued_at = time.monotonic()
+        self.waiters = [done] if done is not None else []
+        self.cancelled = False
+
+    def release(self):
+        """Wake everyone waiting on this message"""
+        for done in self.waiters:
+            done.set()
+        self.waiters = []
+
+
+class SpeechScheduler:
+    def __init__(self, engine_factory: Callable[[], Any], logger: Optional[logging.Logger] = None,
+                 ttl: Optional[Dict[int, float]] = None, max_pending: int = 16):
+        """Priority speech queue with coalescing, expiry and hazard preemption, run on its own thread"""
+        self.engine_factory = engine_factory
+        self.logger = logger or logging.getLogger(__name__)
+        self.ttl = dict(DEFAULT_TTL, **(ttl or {}))
+        self.max_pending = max_pending
+        self.condition = threading.Condition()
+        self.heap = []
+        self.pending: Dict[str, Utterance] = {}
+        self.counter = itertools.count()
+        self.current: Optional[Utterance] = None
+        self.interrupt_requested = False
+        self.stopped_current = False
+        self.running = False
+        self.thread = None
+        self.engine = None
+        self.ready = threading.Event()
+        self.engine_init_time = 0.0
+        self.stats = {"spoken": 0, "coalesced": 0, "expired": 0, "interrupted": 0, "dropped": 0}
+
+    def start(self):
+        """Start the speech thread"""
+        self.running = True
+        self.thread = threading.Thread(target=self._speech_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the speech thread once the current utterance finishes"""
+        with self.condition:
+            self.running = False
+            for utterance in self.pending.values():
+                utterance.release()
+            self.pending.clear()
+            self.heap = []
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=5.0)
+
+    def say(self, text: str, priority: int = PRIORITY_REPLY, ttl: Optional[float] = None,
+            wait: bool = False) -> bool:
+        """Schedule text for speech; returns False if it was merged into an already pending message"""
+        now = time.monotonic()
+        expires_at = now + (ttl if ttl is not None else self.ttl.get(priority, DEFAULT_TTL[PRIORITY_REPLY]))
+        done = threading.Event() if wait else None
+
+        with self.condition:
+            if not self.running:
+                return False
+
+            merged = self._coalesce(text, priority, expires_at, done)
+            if not merged:
+                if priority == PRIORITY_ROUTINE:
+                    self._cancel_priority(PRIORITY_ROUTINE)
+                utterance = Utterance(text, priority, expires_at, done)
+                self._push(utterance)
+                self._trim()
+
+            if self.current is not None and priority < self.current.priority:
+                self.interrupt_requested = True
+            self.condition.notify()
+
+        if done is not None:
+            done.wait()
+        return not merged
+
+    def pending_count(self) -> int:
+        """Number of messages waiting to be spoken"""
+        with self.condition:
+            return len(self.pending)
+
+    def _coalesce(self, text, priority, expires_at, done) -> bool:
+        """Merge a duplicate of a pending or currently spoken message instead of queueing it twice"""
+        if self.current is not None and self.current.text == text and not self.interrupt_requested:
+            self.stats["coalesced"] += 1
+            if done is not None:
+                done.set()
+            return True
+
+        existing = self.pending.get(text)
+        if existing is None:
+            return False
+
+        self.stats["coalesced"] += 1
+        existing.expires_at = max(existing.expires_at, expires_at)
+        if done is not None:
+            existing.waiters.append(done)
+        if priority < existing.priority:
+            # Re-queue at the higher priority; the old heap entry is skipped when popped
+            existing.cancelled = True
+            upgraded = Utterance(text, priority, existing.expires_at, None)
+            upgraded.waiters = existing.waiters
+            existing.waiters = []
+            self._push(upgraded)
+        return True
+
+    def _push(self, utterance: Utterance):
+        """Add an utterance to the heap and the pending index"""
+        self.pending[utterance.text] = utterance
+        heapq.heappush(self.heap, (utterance.priority, next(self.counter), utterance))
+
+    def _cancel_priority(self, priority: int):
+        """Drop every pending message of a priority, e.g. a scene summary superseded by a newer one"""
+        for text, utterance in list(self.pending.items()):
+            if utterance.priority == priority:
+                utterance.cancelled = True
+                utterance.release()
+                del self.pending[text]
+                self.stats["dropped"] += 1
+
+    def _trim(self):
+        """Keep the queue bounded by dropping the least important, newest messages"""
+        while len(self.pending) > self.max_pending:
+            victim = max(
+                self.pending.values(),
+                key=lambda u: (u.priority, u.expires_at)
+            )
+            victim.cancelled = True
+            victim.release()
+            del self.pending[victim.text]
+            self.stats["dropped"] += 1
+
+    def _next_utterance(self, now: float) -> Optional[Utterance]:
+        """Pop the most urgent live message, discarding expired and cancelled entries"""
+        while self.heap:
+            _, _, utterance = heapq.heappop(self.heap)
+            if utterance.cancelled:
+                continue
+            self.pending.pop(utterance.text, None)
+            if utterance.expires_at < now:
+                self.stats["expired"] += 1
+                metrics.increment("speech_expired")
+                utterance.release()
+                continue
+            return utterance
+        return None
+
+    def _on_word(self, name, location, length):
+        """Engine callback between words; stops the utterance when a higher priority one arrived"""
+        if self.interrupt_requested and not self.stopped_current:
+            self.stopped_current = True
+            self.engine.stop()
+
+    def _run_idle(self) -> bool:
+        """Give the engine its background turn between utterances; True if it has more to do"""
+        try:
+            return bool(self.engine.idle())
+        except Exception as e:
+            self.logger.error(f"Speech engine idle error: {str(e)}")
+            return False
+
+    def _speech_loop(self):
+        """Speak queued messages one at a time"""
+        started = time.perf_counter()
+        try:
+            self.engine = self.engine_factory()
+            if hasattr(self.engine, "connect"):
+                self.engine.connect("started-word", self._on_word)
+        except Exception as e:
+            self.logger.error(f"Speech engine error: {str(e)}")
+            self.engine = None
+        self.engine_init_time = time.perf_counter() - started
+        self.ready.set()
+        idle_work = hasattr(self.engine, "idle")
+        idle_pending = False
+
+        while True:
+            with self.condition:
+                # Background work continues step by step without waiting, but every step checks the queue first
+                timeout = (0 if idle_pending else IDLE_AFTER) if idle_work else None
+                self.condition.wait_for(lambda: self.heap or not self.running, timeout)
+                if not self.running:
+                    return
+                utterance = self._next_utterance(time.monotonic())
+                if utterance is not None:
+                    self.current = utterance
+                    self.interrupt_requested = False
+                    self.stopped_current = False
+                    metrics.observe(f"speech_wait_p{utterance.priority}", time.monotonic() - utterance.queued_at)
+                    metrics.gauge("speech_queue_depth", len(self.pending))
+            if utterance is None:
+                # Nothing to say for a while: the engine may use the time, e.g. to pre-synthesize clips
+                if idle_work:
+                    idle_pending = self._run_idle()
+                continue
+
+            try:
+                if self.engine is not None:
+                    with metrics.timer("tts"):
+                        self.engine.say(utterance.text)
+                        self.engine.runAndWait()
+            except Exception as e:
+                self.logger.error(f"Speech error: {str(e)}")
+
+            with self.condition:
+                self.current = None
+                self.interrupt_requested = False
+                if self.stopped_current:
+                    self.stats["interrupted"] += 1
+                    metrics.increment("speech_interrupted")
+                    # Replies are re-queued behind the hazard; stale scene summaries are not
+                    if utterance.priority == PRIORITY_REPLY and utterance.text not in self.pending:
+                        self._push(utterance)
+                        continue
+                else:
+                    self.stats["spoken"] += 1
+            utterance.release()
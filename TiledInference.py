@@ -0,0 +1,157 @@
+import time
+import numpy as np
+from typing import List, Optional, Tuple
+
+from DetectionPostProcess import DetectionPostProcessor, empty_detections
+from InferenceBackends import InferenceBackend, nms_indices
+
+# Cost/accuracy presets; roi is (x0, y0, x1, y1) as fractions of the frame, tiles_per_tick=None runs every tile
+TILING_PRESETS = {
+    "off": None,
+    # Horizon band only, one tile per tick: roughly 2x the cost of a plain frame
+    "fast": {"roi": (0.0, 0.3, 1.0, 0.6), "tiles_per_tick": 1},
+    # Walking path and horizon, two tiles per tick
+    "balanced": {"roi": (0.0, 0.2, 1.0, 0.75), "tiles_per_tick": 2},
+    # Whole frame tiled at full resolution every tick
+    "accurate": {"roi": (0.0, 0.0, 1.0, 1.0), "tiles_per_tick": None},
+}
+
+
+def tile_grid(frame_width: int, frame_height: int, roi: Tuple[float, float, float, float],
+              tile_size: int, overlap: float = 0.2) -> List[Tuple[int, int, int, int]]:
+    """Overlapping square tiles of at most tile_size pixels covering the region of interest"""
+    x0, y0 = int(roi[0] * frame_width), int(roi[1] * frame_height)
+    x1, y1 = int(roi[2] * frame_width), int(roi[3] * frame_height)
+
+    def starts(lo, hi):
+        if hi - lo <= tile_size:
+            return [lo]
+        count = int(np.ceil((hi - lo - tile_size) / (tile_size * (1 - overlap)))) + 1
+        return np.linspace(lo, hi - tile_size, count).astype(int).tolist()
+
+    return [
+        (x, y, min(x + tile_size, x1), min(y + tile_size, y1))
+        for y in starts(y0, y1) for x in starts(x0, x1)
+    ]
+
+
+class TiledBackend(InferenceBackend):
+    def __init__(self, backend: InferenceBackend, postprocessor: DetectionPostProcessor,
+                 roi: Tuple[float, float, float, float] = (0.0, 0.2, 1.0, 0.75),
+                 tiles_per_tick: Optional[int] = 2, tile_size: Optional[int] = None,
+                 overlap: float = 0.2, nms_threshold: float = 0.5, edge_margin: float = 2.0):
+        """Full frame at the model's input size plus native-resolution crops of a region of interest,
+        merged with cross-tile NMS"""
+        super().__init__(backend.model_path, postprocessor, backend.imgsz, backend.threads, backend.logger,
+                         backend.batch)
+        self.name = f"{backend.name}+tiled"
+        self.backend = backend
+        self.roi = roi
+        self.tiles_per_tick = tiles_per_tick
+        # Tiles the size of the model input are processed without any downscaling
+        self.tile_size = tile_size or backend.imgsz
+        self.overlap = overlap
+        self.nms_threshold = nms_threshold
+        self.edge_margin = edge_margin
+        self.grid = []
+        self.grid_shape = None
+        self.next_tile = 0
+        self.warned_shapes = set()
+
+    def tiles_for(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """This tick's share of the tile grid, rotating through it when tiles_per_tick is set"""
+        shape = frame.shape[:2]
+        if shape != self.grid_shape:
+            self.grid_shape = shape
+            self.next_tile = 0
+            if max(shape) <= self.tile_size:
+                # A tile would hold the frame at the resolution the full pass already sees
+                self.grid = []
+                if shape not in self.warned_shapes:
+                    self.warned_shapes.add(shape)
+                    self.logger.warning(
+                        f"Tiling skipped: {shape[1]}x{shape[0]} frames are no larger than {self.tile_size}px tiles"
+                    )
+            else:
+                self.grid = tile_grid(shape[1], shape[0], self.roi, self.tile_size, self.overlap)
+        if self.tiles_per_tick is None or self.tiles_per_tick >= len(self.grid):
+            return self.grid
+        tiles = [self.grid[(self.next_tile + i) % len(self.grid)] for i in range(self.tiles_per_tick)]
+        self.next_tile = (self.next_tile + self.tiles_per_tick) % len(self.grid)
+        return tiles
+
+    def detect(self, frame: np.ndarray) -> np.ndarray:
+        tiles = self.tiles_for(frame)
+        if not tiles:
+            detections = self.backend.detect(frame)
+            self.timings.update(self.backend.timings)
+            return detections
+        # Crops are views, so this costs no copies; one batched call covers the frame and its tiles
+        crops = [frame] + [frame[y0:y1, x0:x1] for x0, y0, x1, y1 in tiles]
+        results = self.backend.detect_batch(crops)
+        started = time.perf_counter()
+        detections = self.merge(results[0], results[1:], tiles, frame.shape[1], frame.shape[0])
+
+        self.timings.update(self.backend.timings)
+        self.timings["postprocess"] += time.perf_counter() - started
+        return detections
+
+    def merge(self, full: np.ndarray, tile_results: List[np.ndarray], tiles: List[Tuple[int, int, int, int]],
+              frame_width: int, frame_height: int) -> np.ndarray:
+        """Shift tile detections into frame coordinates and keep one box per object across tiles"""
+        parts = [full]
+        for (x0, y0, x1, y1), detections in zip(tiles, tile_results):
+            if len(detections) == 0:
+                continue
+            shifted = detections.copy()
+            shifted["x"] += x0
+            shifted["y"] += y0
+            # Objects cut by an inner tile edge are left to the full frame or the overlapping neighbour
+            left = shifted["x"] - shifted["w"] / 2
+            top = shifted["y"] - shifted["h"] / 2
+            right = shifted["x"] + shifted["w"] / 2
+            bottom = shifted["y"] + shifted["h"] / 2
+            m = self.edge_margin
+            cut = (
+                ((left <= x0 + m) & (x0 > 0)) | ((top <= y0 + m) & (y0 > 0))
+                | ((right >= x1 - m) & (x1 < frame_width)) | ((bottom >= y1 - m) & (y1 < frame_height))
+            )
+            parts.append(shifted[~cut])
+
+        merged = np.concatenate(parts) if len(parts) > 1 else full
+        if len(merged) == 0:
+            return empty_detections()
+        boxes = np.stack([merged["x"], merged["y"], merged["w"], merged["h"]], axis=1)
+        keep = nms_indices(
+            boxes, merged["confidence"], merged["class_id"].astype(np.float32),
+            self.postprocessor.confidence_threshold, self.nms_threshold
+        )
+        merged = merged[keep]
+        # Zones depend on the full frame width, so rebuild the record from the merged arrays
+        return self.postprocessor.from_arrays(
+            merged["confidence"], merged["class_id"],
+            np.stack([merged["x"], merged["y"], merged["w"], merged["h"]], axis=1), frame_width
+        )
+
+    def warmup(self, runs: int = 1) -> float:
+        return self.backend.warmup(runs)
+
+    def close(self):
+        self.backend.close()
+
+
+def tiled_batch(batch: int, tiling) -> int:
+    """Images per model call once every frame is sent with its tiles, for sizing a dynamic-batch export"""
+    options = TILING_PRESETS[tiling] if isinstance(tiling, str) else tiling
+    if not options:
+        return batch
+    # A full grid's size depends on the frame, so it is sized like a single tile
+    return batch * (1 + (options.get("tiles_per_tick") or 1))
+
+
+def create_tiled_backend(backend: InferenceBackend, postprocessor: DetectionPostProcessor, tiling) -> InferenceBackend:
+    """Wrap a backend according to a preset name or an options dict; "off" or None returns it unchanged"""
+    options = TILING_PRESETS[tiling] if isinstance(tiling, str) else tiling
+    if not options:
+        return backend
+    return TiledBackend(backend, postprocessor, **options)
@@ -0,0 +1,273 @@
+import dbm
+import threading
+import queue
+import logging
+from collections import OrderedDict
+from typing import Optional
+
+from Metrics import metrics
+
+# Hindi names for every COCO label the detector can emit
+HINDI_LABELS = {
+    "person": "व्यक्ति", "bicycle": "साइकिल", "car": "कार", "motorcycle": "मोटरसाइकिल",
+    "airplane": "हवाई जहाज़", "bus": "बस", "train": "ट्रेन", "truck": "ट्रक", "boat": "नाव",
+    "traffic light": "ट्रैफिक लाइट", "fire hydrant": "फायर हाइड्रेंट", "stop sign": "स्टॉप साइन",
+    "parking meter": "पार्किंग मीटर", "bench": "बेंच", "bird": "पक्षी", "cat": "बिल्ली",
+    "dog": "कुत्ता", "horse": "घोड़ा", "sheep": "भेड़", "cow": "गाय", "elephant": "हाथी",
+    "bear": "भालू", "zebra": "ज़ेबरा", "giraffe": "जिराफ़", "backpack": "बैकपैक",
+    "umbrella": "छाता", "handbag": "हैंडबैग", "tie": "टाई", "suitcase": "सूटकेस",
+    "frisbee": "फ्रिस्बी", "skis": "स्की", "snowboard": "स्नोबोर्ड", "sports ball": "गेंद",
+    "kite": "पतंग", "baseball bat": "बेसबॉल बैट", "baseball glove": "बेसबॉल दस्ताना",
+    "skateboard": "स्केटबोर्ड", "surfboard": "सर्फ़बोर्ड", "tennis racket": "टेनिस रैकेट",
+    "bottle": "बोतल", "wine glass": "वाइन गिलास", "cup": "कप", "fork": "कांटा", "knife": "चाकू",
+    "spoon": "चम्मच", "bowl": "कटोरा", "banana": "केला", "apple": "सेब", "sandwich": "सैंडविच",
+    "orange": "संतरा", "broccoli": "ब्रोकली", "carrot": "गाजर", "hot dog": "हॉट डॉग",
+    "pizza": "पिज़्ज़ा", "donut": "डोनट", "cake": "केक", "chair": "कुर्सी", "couch": "सोफ़ा",
+    "potted plant": "गमले का पौधा", "bed": "बिस्तर", "dining table": "खाने की मेज़",
+    "toilet": "शौचालय", "tv": "टीवी", "laptop": "लैपटॉप", "mouse": "माउस", "remote": "रिमोट",
+    "keyboard": "कीबोर्ड", "cell phone": "मोबाइल फ़ोन", "microwave": "माइक्रोवेव", "oven": "ओवन",
+    "toaster": "टोस्टर", "sink": "सिंक", "refrigerator": "फ्रिज", "book": "किताब", "clock": "घड़ी",
+    "vase": "फूलदान", "scissors": "कैंची", "teddy bear": "टेडी बियर", "hair drier": "हेयर ड्रायर",
+    "toothbrush": "टूथब्रश",
+}
+
+HELP_TEXT = """I can help you with:
+                   - Weather information (e.g., 'weather in London')
+                   - Translations (e.g., 'translate hello')
+                   - Making phone calls (e.g., 'call 123456789')
+                   - Telling the time (e.g., 'what time is it')
+                   - Web searches (e.g., 'search for cats')
+                   - Describing what I see (e.g., 'what do you see')
+                   - Changing language (say 'change language')
+                   Say 'goodbye' to exit assistant mode"""
+
+GREETING_TEXT = "Hello! I'm here to help. You can ask about the weather, translations, make calls, or say 'what do you see' for object detection."
+
+# English templates and their Hindi counterparts; slots are filled after lookup
+HINDI_PHRASES = {
+    "Warning: {label} ahead!": "चेतावनी: आगे {label} है!",
+    "{label} detected to the left": "{label} बाईं ओर है",
+    "{label} detected to the right": "{label} दाईं ओर है",
+    "{label} detected ahead": "{label} सामने है",
+    "Warning: {label} approaching!": "चेतावनी: {label} पास आ रहा है!",
+    "No objects detected": "कोई वस्तु नहीं मिली",
+    "I can see: {counts}": "मुझे दिख रहा है: {counts}",
+    "Details:": "विवरण:",
+    "{count} {label}": "{count} {label}",
+    "{count} {label} on the left": "बाईं ओर {count} {label}",
+    "{count} {label} on the right": "दाईं ओर {count} {label}",
+    "{count} {label} ahead": "सामने {count} {label}",
+    "{count} more {label} on the left": "बाईं ओर {count} और {label}",
+    "{count} more {label} on the right": "दाईं ओर {count} और {label}",
+    "{count} more {label} ahead": "सामने {count} और {label}",
+    "{count} fewer {label}": "{count} {label} कम",
+    "{label} gone": "{label} अब नहीं है",
+    "{label}: {description}. {suggestion}": "{label}: {description}। {suggestion}",
+    "{label} - {description}": "{label} - {description}",
+    "Starting enhanced assistant system": "सहायक प्रणाली शुरू हो रही है",
+    "Camera not accessible": "कैमरा उपलब्ध नहीं है",
+    "Camera feed lost": "कैमरा फ़ीड बंद हो गई",
+    "Shutting down": "बंद किया जा रहा है",
+    "An error occurred": "एक त्रुटि हुई",
+    GREETING_TEXT: "नमस्ते! मैं आपकी मदद के लिए हूँ। आप मौसम, अनुवाद, कॉल करने के बारे में पूछ सकते हैं, या वस्तु पहचान के लिए 'तुम्हें क्या दिख रहा है' कहें।",
+    HELP_TEXT: """मैं आपकी इनमें मदद कर सकता हूँ:
+                   - मौसम की जानकारी (जैसे, 'लंदन में मौसम')
+                   - अनुवाद (जैसे, 'translate hello')
+                   - फ़ोन कॉल करना (जैसे, 'call 123456789')
+                   - समय बताना (जैसे, 'कितने बजे हैं')
+                   - वेब खोज (जैसे, 'search for cats')
+                   - जो मैं देख रहा हूँ उसका वर्णन (जैसे, 'what do you see')
+                   - भाषा बदलना ('change language' कहें)
+                   सहायक मोड से बाहर निकलने के लिए 'goodbye' कहें""",
+    "Please specify a location for the weather": "कृपया मौसम के लिए स्थान बताएं",
+    "The weather in {location} is {condition} with a temperature of {temp}°C": "{location} में मौसम {condition} है और तापमान {temp}°C है",
+    "Sorry, I couldn't get the weather for {location}": "क्षमा करें, मुझे {location} का मौसम नहीं मिल सका",
+    "Sorry, there was an error getting the weather information": "क्षमा करें, मौसम की जानकारी लेने में त्रुटि हुई",
+    "Checking, one moment": "जांच रहा हूं, एक क्षण",
+    "Initiating phone call to {number}": "{number} पर कॉल की जा रही है",
+    "Invalid phone number": "अमान्य फ़ोन नंबर",
+    "Sorry, I couldn't process that phone number": "क्षमा करें, मैं उस फ़ोन नंबर को संसाधित नहीं कर सका",
+    "Please provide a phone number to call": "कृपया कॉल करने के लिए फ़ोन नंबर बताएं",
+    "The current time is {time}": "अभी समय {time} है",
+    "Searching for {query}": "{query} खोजा जा रहा है",
+    "Language changed to {language}": "भाषा बदलकर {language} कर दी गई",
+    "Metrics on": "मेट्रिक्स चालू",
+    "Metrics off": "मेट्रिक्स बंद",
+    "Goodbye! Returning to normal monitoring mode": "अलविदा! सामान्य निगरानी मोड में लौट रहे हैं",
+    "I'm sorry, I didn't understand that command. Say 'help' for a list of things I can do.": "क्षमा करें, मैं वह आदेश नहीं समझ पाया। मैं क्या कर सकता हूँ, यह जानने के लिए 'help' कहें।",
+    "English translation: {text}": "अंग्रेज़ी अनुवाद: {text}",
+    "Hindi translation: {text}": "हिंदी अनुवाद: {text}",
+    "Hindi": "हिंदी",
+    "English": "अंग्रेज़ी",
+}
+
+PHRASE_TABLES = {
+    "hi": dict(HINDI_PHRASES, **HINDI_LABELS),
+}
+
+
+class TranslationCache:
+    def __init__(self, cache_path: str = "translation_cache", max_entries: int = 1024,
+                 logger: Optional[logging.Logger] = None, services=None, deadline: float = 5.0):
+        """English/Hindi translations from phrase tables, an LRU, a disk cache and a background network fallback"""
+        self.logger = logger or logging.getLogger(__name__)
+        self.services = services
+        self.deadline = deadline
+        self.max_entries = max_entries
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.translators = {}
+        self.requests = queue.Queue()
+        self.in_flight = set()
+        self.stats = {"table": 0, "memory": 0, "disk": 0, "network": 0, "miss": 0}
+
+        try:
+            self.disk = dbm.open(cache_path, "c")
+        except Exception as e:
+            self.logger.error(f"Translation cache error: {str(e)}")
+            self.disk = None
+
+        self.worker = threading.Thread(target=self._network_loop, daemon=True)
+        self.worker.start()
+
+    def translate(self, text: str, target_lang: str, wait: bool = False) -> str:
+        """Translate English text (or Hindi text to English) without touching the network unless wait is set"""
+        if not text or not text.strip():
+            return text
+        if target_lang == "en" and text.isascii():
+            return text
+
+        table = PHRASE_TABLES.get(target_lang)
+        if table is not None and text in table:
+            self.stats["table"] += 1
+            return table[text]
+
+        with metrics.timer("translation_cache"):
+            cached = self._lookup(text, target_lang)
+        if cached is not None:
+            return cached
+
+        if wait:
+            return self._network_translate(text, target_lang)
+
+        # Unseen free text: speak the source now, translate in the background for next time
+        self.stats["miss"] += 1
+        metrics.increment("translation_misses")
+        self._request(text, target_lang)
+        return text
+
+    def compose(self, template: str, target_lang: str, **slots) -> str:
+        """Fill a known phrase template for the target language; slot values found in the tables are localized too"""
+        if target_lang != "en":
+            table = PHRASE_TABLES.get(target_lang, {})
+            template = table.get(template, template)
+            slots = {
+                name: table.get(value, value) if isinstance(value, str) else value
+                for name, value in slots.items()
+            }
+        return template.format(**slots)
+
+    def flush(self):
+        """Write pending disk cache entries"""
+        with self.lock:
+            if self.disk is not None and hasattr(self.disk, "sync"):
+                self.disk.sync()
+
+    def close(self):
+        """Stop the network worker and close the disk cache"""
+        self.requests.put(None)
+        with self.lock:
+            if self.disk is not None:
+                self.disk.close()
+                self.disk = None
+
+    def _key(self, text: str, target_lang: str) -> str:
+        return f"{target_lang}\x1f{text}"
+
+    def _lookup(self, text: str, target_lang: str) -> Optional[str]:
+        """Check the in-memory LRU, then the disk cache"""
+        key = self._key(text, target_lang)
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.stats["memory"] += 1
+                return self.memory[key]
+
+            if self.disk is None:
+                return None
+            try:
+                value = self.disk.get(key.encode("utf-8"))
+            except Exception as e:
+                self.logger.error(f"Translation cache error: {str(e)}")
+                return None
+            if value is None:
+                return None
+
+            translated = value.decode("utf-8")
+            self._remember(key, translated)
+            self.stats["disk"] += 1
+            return translated
+
+    def _remember(self, key: str, translated: str):
+        """Insert into the LRU, evicting the least recently used entry; caller holds the lock"""
+        self.memory[key] = translated
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def _store(self, text: str, target_lang: str, translated: str):
+        """Save a network translation in both cache levels"""
+        key = self._key(text, target_lang)
+        with self.lock:
+            self._remember(key, translated)
+            if self.disk is not None:
+                try:
+                    self.disk[key.encode("utf-8")] = translated.encode("utf-8")
+                except Exception as e:
+                    self.logger.error(f"Translation cache error: {str(e)}")
+
+    def _request(self, text: str, target_lang: str):
+        """Queue a background translation unless one is already pending"""
+        key = self._key(text, target_lang)
+        with self.lock:
+            if key in self.in_flight:
+                return
+            self.in_flight.add(key)
+        self.requests.put((text, target_lang))
+
+    def _network_translate(self, text: str, target_lang: str) -> str:
+        """Translate through the online service and cache the result"""
+        try:
+            translator = self.translators.get(target_lang)
+            if translator is None:
+                from deep_translator import GoogleTranslator
+                translator = GoogleTranslator(source='auto', target=target_lang)
+                self.translators[target_lang] = translator
+            with metrics.timer("translation_network"):
+                if self.services is not None:
+                    # deep_translator sets no timeout on its request, so the deadline is enforced around it
+                    translated = self.services.call(
+                        "translation", self.services.bounded(translator.translate), text, deadline=self.deadline
+                    )
+                else:
+                    translated = translator.translate(text)
+            self.stats["network"] += 1
+        except Exception as e:
+            self.logger.error(f"Translation error: {str(e)}")
+            return text
+
+        if translated:
+            self._store(text, target_lang, translated)
+            return translated
+        return text
+
+    def _network_loop(self):
+        """Resolve cache misses one at a time in the background"""
+        while True:
+            item = self.requests.get()
+            if item is None:
+                return
+            text, target_lang = item
+            self._network_translate(text, target_lang)
+            with self.lock:
+                self.in_flight.discard(self._key(text, target_lang))
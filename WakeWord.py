@@ -0,0 +1,331 @@
+import json
+import os
+import threading
+import time
+import wave
+import logging
+import numpy as np
+from typing import Callable, Optional
+
+from Metrics import metrics
+
+SAMPLE_RATE = 16000
+CHUNK_SAMPLES = 480  # 30 ms at 16 kHz
+WAKE_PHRASE = "hello assistant"
+
+
+class MicrophoneSource:
+    def __init__(self, sample_rate: int = SAMPLE_RATE, chunk_samples: int = CHUNK_SAMPLES):
+        """Continuous 16-bit mono stream from the default microphone"""
+        import pyaudio
+        self.sample_rate = sample_rate
+        self.chunk_samples = chunk_samples
+        self.audio = pyaudio.PyAudio()
+        self.stream = self.audio.open(
+            format=pyaudio.paInt16, channels=1, rate=sample_rate, input=True,
+            frames_per_buffer=chunk_samples
+        )
+
+    def read(self) -> Optional[bytes]:
+        return self.stream.read(self.chunk_samples, exception_on_overflow=False)
+
+    def close(self):
+        self.stream.stop_stream()
+        self.stream.close()
+        self.audio.terminate()
+
+
+class WavFileSource:
+    def __init__(self, path: str, chunk_samples: int = CHUNK_SAMPLES, realtime: bool = False):
+        """Recorded 16-bit mono WAV played back chunk by chunk, in place of a microphone"""
+        self.wav = wave.open(path, "rb")
+        if self.wav.getsampwidth() != 2 or self.wav.getnchannels() != 1:
+            raise ValueError(f"{path} must be 16-bit mono PCM")
+        self.sample_rate = self.wav.getframerate()
+        self.chunk_samples = chunk_samples
+        self.realtime = realtime
+
+    def read(self) -> Optional[bytes]:
+        """Next chunk, or None at the end of the file"""
+        data = self.wav.readframes(self.chunk_samples)
+        if not data:
+            return None
+        if self.realtime:
+            time.sleep(self.chunk_samples / self.sample_rate)
+        return data
+
+    def close(self):
+        self.wav.close()
+
+
+class AudioRingBuffer:
+    def __init__(self, seconds: float, sample_rate: int = SAMPLE_RATE):
+        """Fixed-size buffer of the most recent audio samples"""
+        self.buffer = np.zeros(int(seconds * sample_rate), dtype=np.int16)
+        self.position = 0
+        self.filled = 0
+
+    def write(self, samples: np.ndarray):
+        size = len(self.buffer)
+        samples = samples[-size:]
+        end = self.position + len(samples)
+        if end <= size:
+            self.buffer[self.position:end] = samples
+        else:
+            split = size - self.position
+            self.buffer[self.position:] = samples[:split]
+            self.buffer[:end - size] = samples[split:]
+        self.position = end % size
+        self.filled = min(size, self.filled + len(samples))
+
+    def read_last(self, count: int) -> np.ndarray:
+        """Copy of the newest count samples in chronological order"""
+        count = min(count, self.filled)
+        start = (self.position - count) % len(self.buffer)
+        if start + count <= len(self.buffer):
+            return self.buffer[start:start + count].copy()
+        return np.concatenate([self.buffer[start:], self.buffer[:self.position]])
+
+
+class EnergyVAD:
+    def __init__(self, ratio: float = 3.0, min_energy: float = 200.0, smoothing: float = 0.05):
+        """Voice activity from chunk RMS against an adaptive noise floor"""
+        self.ratio = ratio
+        self.min_energy = min_energy
+        self.smoothing = smoothing
+        self.noise_floor = min_energy / ratio
+
+    def is_speech(self, samples: np.ndarray) -> bool:
+        rms = float(np.sqrt(np.mean(samples.astype(np.float32) ** 2))) if len(samples) else 0.0
+        speech = rms > max(self.min_energy, self.noise_floor * self.ratio)
+        if not speech:
+            self.noise_floor += self.smoothing * (rms - self.noise_floor)
+        return speech
+
+
+class GoogleRecognizer:
+    name = "google"
+
+    def __init__(self, language: str = "en-US", services=None, deadline: float = 8.0):
+        """Online recognition through speech_recognition's Google Web Speech API"""
+        import speech_recognition as sr
+        self.sr = sr
+        self.recognizer = sr.Recognizer()
+        self.language = language
+        self.services = services
+        self.deadline = deadline
+
+    def transcribe(self, pcm: bytes, sample_rate: int) -> str:
+        audio = self.sr.AudioData(pcm, sample_rate, 2)
+        try:
+            if self.services is not None:
+                return self.services.call(
+                    "recognition", self._recognize, audio, deadline=self.deadline, retries=1
+                ).lower()
+            return self.recognizer.recognize_google(audio, language=self.language).lower()
+        except self.sr.UnknownValueError:
+            return ""
+
+    def _recognize(self, audio, timeout: float) -> str:
+        # Unintelligible audio is an answer, not a service failure to retry
+        self.recognizer.operation_timeout = timeout
+        try:
+            return self.recognizer.recognize_google(audio, language=self.language)
+        except self.sr.UnknownValueError:
+            return ""
+
+
+class SphinxRecognizer(GoogleRecognizer):
+    name = "sphinx"
+
+    def transcribe(self, pcm: bytes, sample_rate: int) -> str:
+        """Offline recognition through PocketSphinx"""
+        audio = self.sr.AudioData(pcm, sample_rate, 2)
+        try:
+            return self.recognizer.recognize_sphinx(audio).lower()
+        except self.sr.UnknownValueError:
+            return ""
+
+
+class VoskRecognizer:
+    name = "vosk"
+
+    def __init__(self, model, grammar: Optional[list] = None):
+        """Offline recognition with a local Vosk model, optionally restricted to a phrase list;
+        model is a model directory or an already loaded vosk Model to share"""
+        if isinstance(model, (str, os.PathLike)):
+            from vosk import Model
+            model = Model(model)
+        self.model = model
+        self.grammar = json.dumps(grammar) if grammar else None
+
+    def new_stream(self, sample_rate: int):
+        """Streaming Kaldi recognizer for incremental decoding"""
+        from vosk import KaldiRecognizer
+        if self.grammar:
+            return KaldiRecognizer(self.model, sample_rate, self.grammar)
+        return KaldiRecognizer(self.model, sample_rate)
+
+    def transcribe(self, pcm: bytes, sample_rate: int) -> str:
+        stream = self.new_stream(sample_rate)
+        stream.AcceptWaveform(pcm)
+        return json.loads(stream.FinalResult()).get("text", "").lower()
+
+
+RECOGNIZERS = {
+    GoogleRecognizer.name: GoogleRecognizer,
+    SphinxRecognizer.name: SphinxRecognizer,
+    VoskRecognizer.name: VoskRecognizer,
+}
+
+
+class VoskKeywordSpotter:
+    def __init__(self, model, phrase: str = WAKE_PHRASE, sample_rate: int = SAMPLE_RATE):
+        """Streaming local wake-phrase spotter using a Vosk grammar of just the phrase; model is a model
+        directory, a loaded vosk Model or a VoskRecognizer whose model is shared instead of loaded again"""
+        self.phrase = phrase
+        self.sample_rate = sample_rate
+        if isinstance(model, VoskRecognizer):
+            model = model.model
+        self.recognizer = VoskRecognizer(model, grammar=[phrase, "[unk]"])
+        self.stream = self.recognizer.new_stream(sample_rate)
+
+    def accept(self, chunk: bytes) -> bool:
+        """Feed one voiced chunk; True when the phrase has been heard"""
+        if self.stream.AcceptWaveform(chunk):
+            text = json.loads(self.stream.Result()).get("text", "")
+        else:
+            text = json.loads(self.stream.PartialResult()).get("partial", "")
+        if self.phrase in text:
+            self.reset()
+            return True
+        return False
+
+    def end_of_speech(self, pcm: bytes, sample_rate: int) -> bool:
+        """Phrase boundary reached; flush the stream in case the phrase completed on the last chunk"""
+        text = json.loads(self.stream.FinalResult()).get("text", "")
+        self.reset()
+        return self.phrase in text
+
+    def reset(self):
+        self.stream = self.recognizer.new_stream(self.sample_rate)
+
+
+class RecognizerKeywordSpotter:
+    def __init__(self, recognizer, phrase: str = WAKE_PHRASE):
+        """Fallback spotter that transcribes each voiced phrase with a full recognizer"""
+        self.recognizer = recognizer
+        self.phrase = phrase
+
+    def accept(self, chunk: bytes) -> bool:
+        return False
+
+    def end_of_speech(self, pcm: bytes, sample_rate: int) -> bool:
+        return self.phrase in self.recognizer.transcribe(pcm, sample_rate)
+
+    def reset(self):
+        pass
+
+
+class WakeWordListener:
+    def __init__(self, source, spotter, recognizer, on_wake: Callable[[], None],
+                 on_command: Callable[[str], None], command_mode: Callable[[], bool],
+                 vad: Optional[EnergyVAD] = None, pre_roll: float = 0.3, end_silence: float = 0.6,
+                 max_phrase: float = 6.0, logger: Optional[logging.Logger] = None):
+        """VAD-gated listener: local spotting while idle, full recognition only for commands"""
+        self.source = source
+        self.spotter = spotter
+        self.recognizer = recognizer
+        self.on_wake = on_wake
+        self.on_command = on_command
+        self.command_mode = command_mode
+        self.vad = vad or EnergyVAD()
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.sample_rate = source.sample_rate
+        self.ring = AudioRingBuffer(max_phrase + pre_roll, self.sample_rate)
+        self.pre_roll = int(pre_roll * self.sample_rate)
+        self.end_silence = end_silence
+        self.max_phrase = int(max_phrase * self.sample_rate)
+
+        self.in_speech = False
+        self.phrase_samples = 0
+        self.silence = 0.0
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+
+    def run(self):
+        """Consume the audio source until stopped or exhausted"""
+        self.running = True
+        try:
+            while self.running:
+                chunk = self.source.read()
+                if chunk is None:
+                    break
+                self.process_chunk(chunk)
+            if self.in_speech:
+                self._end_phrase()
+        except Exception as e:
+            self.logger.error(f"Voice recognition error: {str(e)}")
+        finally:
+            self.source.close()
+
+    def process_chunk(self, chunk: bytes):
+        """Advance the VAD state machine by one chunk"""
+        samples = np.frombuffer(chunk, dtype=np.int16)
+        self.ring.write(samples)
+        speech = self.vad.is_speech(samples)
+
+        if not self.in_speech:
+            if not speech:
+                return
+            self.in_speech = True
+            self.silence = 0.0
+            self.phrase_samples = min(self.pre_roll, self.ring.filled)
+            if not self.command_mode():
+                self.spotter.accept(self.ring.read_last(self.phrase_samples).tobytes())
+            return
+
+        self.phrase_samples += len(samples)
+        self.silence = 0.0 if speech else self.silence + len(samples) / self.sample_rate
+
+        if not self.command_mode() and self.spotter.accept(chunk):
+            self.in_speech = False
+            self._wake()
+            return
+
+        if self.silence >= self.end_silence or self.phrase_samples >= self.max_phrase:
+            self._end_phrase()
+
+    def _end_phrase(self):
+        """A voiced phrase ended: check it for the wake word or transcribe it as a command"""
+        self.in_speech = False
+        pcm = self.ring.read_last(self.phrase_samples).tobytes()
+        try:
+            if not self.command_mode():
+                if self.spotter.end_of_speech(pcm, self.sample_rate):
+                    self._wake()
+                return
+
+            with metrics.timer("speech_recognition"):
+                text = self.recognizer.transcribe(pcm, self.sample_rate)
+        except Exception as e:
+            self.logger.error(f"Voice recognition error: {str(e)}")
+            return
+        if text:
+            self.on_command(text)
+
+    def _wake(self):
+        metrics.increment("wake_words")
+        self.spotter.reset()
+        self.on_wake()
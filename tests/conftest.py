@@ -0,0 +1,36 @@
+import os
+import sys
+
+# The modules live at the top of the repository rather than in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+
+from DetectionPostProcess import DETECTION_DTYPE, ZONE_CENTER
+from InferenceBackends import InferenceBackend
+
+
+class FakeBackend(InferenceBackend):
+    name = "fake"
+
+    def detect(self, frame):
+        """One centred car filling a fifth of the frame"""
+        height, width = frame.shape[:2]
+        detections = np.zeros(1, dtype=DETECTION_DTYPE)
+        detections[0] = (2, 0.9, width / 2, height / 2, width / 5, height / 5, ZONE_CENTER, True)
+        return detections
+
+
+@pytest.fixture
+def assistant_module(tmp_path, monkeypatch):
+    """The assistant module with a fake model, a scratch config and no environment exporters"""
+    pytest.importorskip("speech_recognition")
+    import ObjectDetectionWithAssistantAndList as module
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(module, "select_backend", lambda model_path, postprocessor, **kwargs: FakeBackend(
+        model_path, postprocessor, kwargs.get("imgsz", 640), batch=kwargs.get("batch", 1)
+    ))
+    for name in ("DRISHTI_RECORD", "DRISHTI_HISTORY", "DRISHTI_METRICS", "DRISHTI_VOSK_MODEL"):
+        monkeypatch.delenv(name, raising=False)
+    return module
@@ -0,0 +1,107 @@
+import threading
+import time
+import numpy as np
+
+from AudioClips import ClipStore, PhraseMatcher, ClipSpeechEngine, NullAudioSink, write_wav, CLIP_SAMPLE_RATE
+from DetectionPostProcess import COCO_LABELS
+from SpeechScheduler import SpeechScheduler, PRIORITY_HAZARD, PRIORITY_REPLY
+from TranslationCache import HINDI_LABELS
+
+
+class FakeLiveEngine:
+    def __init__(self, word_time: float = 0.1):
+        """pyttsx3 stand-in that says one word per word_time and honours stop() between words"""
+        self.word_time = word_time
+        self.callbacks = {}
+        self.queue = []
+        self.stopped = threading.Event()
+        self.synthesized = []
+
+    def connect(self, name, callback):
+        self.callbacks.setdefault(name, []).append(callback)
+
+    def say(self, text):
+        self.queue.append(text)
+
+    def stop(self):
+        self.stopped.set()
+
+    def save_to_file(self, text, path):
+        self.synthesized.append(text)
+        t = np.arange(int(0.2 * CLIP_SAMPLE_RATE)) / CLIP_SAMPLE_RATE
+        write_wav(path, (8000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16), CLIP_SAMPLE_RATE)
+
+    def runAndWait(self):
+        queued, self.queue = self.queue, []
+        self.stopped.clear()
+        for text in queued:
+            for index, word in enumerate(text.split()):
+                for callback in self.callbacks.get("started-word", ()):
+                    callback(None, index, len(word))
+                if self.stopped.is_set():
+                    return
+                time.sleep(self.word_time)
+
+
+def make_engine(tmp_path, live):
+    store = ClipStore(str(tmp_path), "fake", 150)
+    return ClipSpeechEngine(store, PhraseMatcher(["car", "person"], ["en"]), NullAudioSink(), lambda: live)
+
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_idle_synthesizes_one_fragment_per_call(tmp_path):
+    live = FakeLiveEngine()
+    clips = make_engine(tmp_path, live)
+    clips.prepare(["en"])
+    remaining = len(clips.missing)
+    assert clips.idle()
+    assert len(live.synthesized) == 1
+    assert len(clips.missing) == remaining - 1
+
+
+def test_hazard_interrupts_live_reply_after_idle_pass(tmp_path):
+    live = FakeLiveEngine()
+    clips = make_engine(tmp_path, live)
+    clips.prepare(["en"])
+    scheduler = SpeechScheduler(lambda: clips)
+    scheduler.start()
+    try:
+        # Idle-time synthesis creates the live engine after the scheduler connected its callbacks
+        assert wait_for(lambda: live.synthesized)
+        assert live.callbacks.get("started-word")
+
+        reply = " ".join(["word"] * 30)
+        scheduler.say(reply, PRIORITY_REPLY)
+        assert wait_for(lambda: any(text == reply for text, _, _ in clips.played))
+        time.sleep(0.2)
+        hazard = "Warning: car ahead!"
+        queued = time.perf_counter()
+        scheduler.say(hazard, PRIORITY_HAZARD)
+
+        assert wait_for(lambda: any(text == hazard for text, _, _ in clips.played))
+        started = next(at for text, _, at in clips.played if text == hazard)
+        assert started - queued < 0.5
+        assert scheduler.stats["interrupted"] == 1
+    finally:
+        scheduler.stop()
+
+
+def test_played_history_is_bounded(tmp_path):
+    clips = make_engine(tmp_path, FakeLiveEngine(word_time=0))
+    for index in range(clips.played.maxlen + 10):
+        clips.say(f"reply {index}")
+    clips.runAndWait()
+    assert len(clips.played) == clips.played.maxlen
+    assert clips.stats["live"] == clips.played.maxlen + 10
+
+
+def test_every_coco_label_has_a_hindi_clip_name():
+    assert set(COCO_LABELS) == set(HINDI_LABELS)
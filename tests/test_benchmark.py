@@ -0,0 +1,46 @@
+import json
+import os
+import cv2
+import numpy as np
+
+
+def write_frames(directory, count=5):
+    os.makedirs(directory, exist_ok=True)
+    for index in range(count):
+        cv2.imwrite(os.path.join(directory, f"{index:03d}.png"), np.full((240, 320, 3), index, dtype=np.uint8))
+
+
+def test_utterances_include_clip_playback(assistant_module, tmp_path):
+    from Benchmark import BenchmarkAssistant, run_benchmark
+    write_frames(str(tmp_path / "frames"))
+    assistant = BenchmarkAssistant(
+        clip_dir=str(tmp_path / "clips"), backend="fake", language="en", camera_index=None
+    )
+
+    report = run_benchmark(assistant, str(tmp_path / "frames"), fps=10.0)
+
+    played = report["clip_utterances"]["clip"] + report["clip_utterances"]["live"]
+    assert report["utterances"] == played > len(assistant.null_engine.spoken)
+
+
+def test_report_on_stdout_is_valid_json(assistant_module, tmp_path, capsys):
+    from Benchmark import main
+    write_frames(str(tmp_path / "frames"))
+    main([str(tmp_path / "frames"), "--backend", "fake"])
+
+    captured = capsys.readouterr()
+    assert json.loads(captured.out)["frames"] == 5
+    assert "Assistant:" in captured.err
+
+
+def test_first_warning_counts_routine_hazard_notices(assistant_module, tmp_path):
+    from Benchmark import BenchmarkAssistant, run_benchmark
+    write_frames(str(tmp_path / "frames"))
+    assistant = BenchmarkAssistant(backend="fake", language="en", camera_index=None)
+
+    report = run_benchmark(assistant, str(tmp_path / "frames"), fps=10.0)
+
+    # The fake car is far away and still, so it is announced but never urgent
+    assert report["hazard_warnings"] == 0
+    assert report["hazard_notices"] == 1
+    assert report["time_to_first_warning_ms"] is not None
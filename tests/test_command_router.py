@@ -0,0 +1,40 @@
+import pytest
+
+from CommandRouter import COMMAND_CORPUS, COMMAND_INTENTS, build_router
+
+
+@pytest.fixture
+def router():
+    return build_router({spec["name"]: (lambda **slots: slots) for spec in COMMAND_INTENTS})
+
+
+@pytest.mark.parametrize("text,expected", COMMAND_CORPUS)
+def test_corpus_routes(router, text, expected):
+    intent, _ = router.route(text)
+    assert (intent.name if intent else None) == expected
+
+
+@pytest.mark.parametrize("text,slots", [
+    ("weather in london", {"location": "london"}),
+    ("what's the weather in new delhi", {"location": "new delhi"}),
+    ("weather for rio de janeiro", {"location": "rio de janeiro"}),
+    ("weather today in london", {"location": "london"}),
+    ("weather in new delhi today?", {"location": "new delhi"}),
+    ("what is the weather like", {}),
+    ("how is the weather outside", {}),
+    ("weather", {}),
+    ("दिल्ली में मौसम कैसा है", {"location": "दिल्ली"}),
+    ("आज दिल्ली में मौसम कैसा है", {"location": "दिल्ली"}),
+    ("translate good morning", {"text": "good morning"}),
+    ("सुप्रभात का अनुवाद करो", {"text": "सुप्रभात"}),
+    ("please call 555 123 4567", {"number": "555 123 4567"}),
+    ("search for cats", {"query": "cats"}),
+])
+def test_slot_extraction(router, text, slots):
+    assert router.route(text)[1] == slots
+
+
+def test_dispatch_passes_slots_and_falls_back(router):
+    assert router.dispatch("weather in paris", lambda: "unknown") == {"location": "paris"}
+    assert router.dispatch("sing me a song", lambda: "unknown") == "unknown"
+
@@ -0,0 +1,116 @@
+import datetime
+import os
+import time
+import cv2
+import numpy as np
+
+from DetectionHistory import DetectionHistory, HistoryQuery, list_segments
+from DetectionPostProcess import DETECTION_DTYPE
+
+LABELS = ["person", "bicycle", "car"]
+
+
+def detections(class_ids, hazard=False):
+    record = np.zeros(len(class_ids), dtype=DETECTION_DTYPE)
+    record["class_id"] = class_ids
+    record["confidence"] = 0.8
+    record["hazard"] = hazard
+    return record
+
+
+def test_append_stores_wall_clock_capture_time(tmp_path):
+    history = DetectionHistory(str(tmp_path))
+    hour = datetime.datetime(2026, 3, 1, 9).timestamp()
+    for index in range(10):
+        history.append(detections([0, 2], hazard=[False, True]), np.array([1, 2]), hour + index * 60)
+    history.append(detections([2], hazard=True), np.array([3]), hour + 3600)
+    history.close()
+
+    query = HistoryQuery(str(tmp_path), LABELS)
+    assert query.columns["timestamp"].min() == hour
+    counts = {(row["hour"], row["label"]): row["count"] for row in query.counts_per_hour()}
+    assert counts == {("2026-03-01T09:00", "person"): 1, ("2026-03-01T09:00", "car"): 1,
+                      ("2026-03-01T10:00", "car"): 1}
+    assert query.hazard_frequencies()["car"]["encounters"] == 2
+    assert len(HistoryQuery(str(tmp_path), LABELS, start=hour + 1800)) == 1
+
+
+def test_query_skips_segments_outside_the_window(tmp_path):
+    history = DetectionHistory(str(tmp_path))
+    hour = datetime.datetime(2026, 3, 1, 9).timestamp()
+    # Quiet frames before, a segment straddling the window start, quiet frames after
+    for offset in (0, 60):
+        history.append(detections([]), captured_at=hour + offset)
+    history.flush()
+    for offset in (3000, 3700):
+        history.append(detections([2]), np.array([1]), hour + offset)
+    history.append(detections([]), captured_at=hour + 3800)
+    history.flush()
+    history.append(detections([]), captured_at=hour + 7300)
+    history.close()
+
+    query = HistoryQuery(str(tmp_path), LABELS, start=hour + 3600, end=hour + 7200)
+    assert len(query) == 1
+    # Counted at segment granularity: all three frames of the straddling segment
+    assert query.frames == 3
+    assert HistoryQuery(str(tmp_path), LABELS).frames == 6
+    assert HistoryQuery(str(tmp_path), LABELS, start=hour + 7200).frames == 1
+
+
+def test_partial_chunk_is_flushed_without_new_frames(tmp_path):
+    history = DetectionHistory(str(tmp_path), flush_interval=0.2)
+    history.append(detections([0]), captured_at=time.time())
+    deadline = time.monotonic() + 2.0
+    while not list_segments(str(tmp_path)) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert len(list_segments(str(tmp_path))) == 1
+    history.close()
+
+
+def test_histories_sharing_a_directory_keep_every_segment(tmp_path):
+    captured_at = time.time()
+    for _ in range(2):
+        history = DetectionHistory(str(tmp_path))
+        history.append(detections([0]), captured_at=captured_at)
+        history.close()
+    assert len(list_segments(str(tmp_path))) == 2
+    assert len(HistoryQuery(str(tmp_path), LABELS)) == 2
+
+
+def write_frames(directory, count=5):
+    os.makedirs(directory, exist_ok=True)
+    for index in range(count):
+        cv2.imwrite(os.path.join(directory, f"{index:03d}.png"), np.full((240, 320, 3), index, dtype=np.uint8))
+
+
+def test_benchmark_history_uses_wall_clock(assistant_module, tmp_path, monkeypatch):
+    from Benchmark import BenchmarkAssistant, run_benchmark
+    monkeypatch.setenv("DRISHTI_HISTORY", str(tmp_path / "history"))
+    write_frames(str(tmp_path / "frames"))
+    before = time.time()
+    assistant = BenchmarkAssistant(backend="fake", language="en", camera_index=None)
+    run_benchmark(assistant, str(tmp_path / "frames"), fps=10.0)
+
+    timestamps = HistoryQuery(str(tmp_path / "history"), LABELS).columns["timestamp"]
+    assert len(timestamps) == 5
+    # Video time 0.1 s .. 0.5 s placed right after the benchmark started
+    assert before <= timestamps.min() and timestamps.max() <= time.time() + 1.0
+    assert np.allclose(np.diff(timestamps), 0.1)
+
+
+def test_replay_history_uses_wall_clock(assistant_module, tmp_path, monkeypatch):
+    from SessionLog import SessionRecorder
+    from SessionReplay import ReplayAssistant, run_replay
+    recorder = SessionRecorder(str(tmp_path / "session.log"))
+    for index in range(5):
+        recorder.frame(np.full((240, 320, 3), index, dtype=np.uint8), recorder.started + index * 2.0)
+    recorder.close()
+
+    monkeypatch.setenv("DRISHTI_HISTORY", str(tmp_path / "history"))
+    before = time.time()
+    run_replay(ReplayAssistant(str(tmp_path / "session.log"), backend="fake"))
+
+    timestamps = HistoryQuery(str(tmp_path / "history"), LABELS).columns["timestamp"]
+    assert len(timestamps) == 5
+    assert before <= timestamps.min() and timestamps.max() <= time.time() + 10.0
+    assert np.allclose(np.diff(timestamps), 2.0)
@@ -0,0 +1,82 @@
+import http.client
+import io
+import json
+import struct
+
+import cv2
+import numpy as np
+import pytest
+
+from conftest import FakeBackend
+from DetectionPostProcess import COCO_LABELS, DetectionPostProcessor
+from DetectionServer import DetectionServer, ws_receive, ws_send, WS_BINARY, WS_CLOSE, WS_PING
+
+
+def fragment(opcode, payload, fin):
+    """One unmasked frame, for messages split across several frames"""
+    return bytes([(0x80 if fin else 0) | opcode, len(payload)]) + payload
+
+
+def test_ping_between_fragments_keeps_the_message():
+    stream = io.BytesIO(
+        fragment(WS_BINARY, b"jpeg-", False) + fragment(WS_PING, b"hi", True) + fragment(0x0, b"frame", True)
+    )
+    controls = []
+
+    message = ws_receive(stream, on_control=lambda opcode, payload: controls.append((opcode, payload)))
+
+    assert message == (WS_BINARY, b"jpeg-frame")
+    assert controls == [(WS_PING, b"hi")]
+
+
+def test_close_ends_a_partial_message():
+    stream = io.BytesIO(fragment(WS_BINARY, b"jpeg-", False) + fragment(WS_CLOSE, struct.pack(">H", 1000), True))
+    assert ws_receive(stream) == (WS_CLOSE, struct.pack(">H", 1000))
+
+
+def test_masked_frames_round_trip():
+    stream = io.BytesIO()
+    ws_send(stream, WS_BINARY, b"x" * 300, mask=True)
+    stream.seek(0)
+    assert ws_receive(stream) == (WS_BINARY, b"x" * 300)
+
+
+@pytest.fixture
+def server():
+    labels = list(COCO_LABELS)
+    server = DetectionServer(FakeBackend("fake.pt", DetectionPostProcessor(labels, 0.3)), labels, port=0)
+    server.start()
+    yield server
+    server.stop()
+
+
+def post_frame(connection, path="/detect", headers=None):
+    _, jpeg = cv2.imencode(".jpg", np.zeros((48, 64, 3), dtype=np.uint8))
+    connection.request("POST", path, body=jpeg.tobytes(), headers=headers or {})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_anonymous_connections_are_separate_clients(server):
+    first = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+    second = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+    try:
+        assert post_frame(first)[0] == 200
+        assert post_frame(second)[0] == 200
+        assert post_frame(first)[0] == 200
+    finally:
+        first.close()
+        second.close()
+    clients = [client_id for client_id, _ in server.sessions]
+    assert len(clients) == 2
+    assert all(client_id.startswith("127.0.0.1:") for client_id in clients)
+
+
+def test_client_id_is_shared_across_connections(server):
+    for path, headers in (("/detect", {"X-Client-Id": "phone"}), ("/detect?client=phone", None)):
+        connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        try:
+            assert post_frame(connection, path, headers)[0] == 200
+        finally:
+            connection.close()
+    assert list(server.sessions) == [("phone", "en")]
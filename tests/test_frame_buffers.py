@@ -0,0 +1,93 @@
+import numpy as np
+
+from FrameBuffers import FramePool, PreprocessBuffers, read_into
+
+
+class FakeCapture:
+    def __init__(self, height=48, width=64):
+        """VideoCapture stand-in that, like OpenCV, decodes into image only when its shape fits"""
+        self.shape = (height, width, 3)
+        self.count = 0
+
+    def read(self, image=None):
+        self.count += 1
+        if image is None or image.shape != self.shape:
+            image = np.empty(self.shape, dtype=np.uint8)
+        image[...] = self.count % 256
+        return True, image
+
+
+def capture(pool, cap):
+    buffer = pool.acquire()
+    _, frame = read_into(cap, buffer)
+    pool.adopt(buffer, frame)
+    return frame
+
+
+def test_first_read_allocates_then_buffers_are_reused():
+    pool, cap = FramePool(size=3), FakeCapture()
+    frame = capture(pool, cap)
+    assert pool.stats()["allocations"] == 1
+    pool.release(frame)
+    for _ in range(5):
+        again = capture(pool, cap)
+        assert again is frame
+        pool.release(again)
+    stats = pool.stats()
+    assert stats == {"buffers": 1, "free": 1, "bytes": frame.nbytes, "allocations": 1, "reuses": 5}
+
+
+def test_frames_in_flight_get_their_own_buffers():
+    pool, cap = FramePool(size=3), FakeCapture()
+    frames = [capture(pool, cap) for _ in range(3)]
+    assert len({id(frame) for frame in frames}) == 3
+    assert pool.stats()["buffers"] == 3
+    for frame in frames:
+        pool.release(frame)
+        pool.release(frame)
+    assert pool.stats()["free"] == 3
+    assert pool.stats()["buffers"] == 3
+
+
+def test_release_beyond_pool_size_frees_the_buffer():
+    pool, cap = FramePool(size=1), FakeCapture()
+    frames = [capture(pool, cap) for _ in range(2)]
+    for frame in frames:
+        pool.release(frame)
+    assert pool.stats()["free"] == 1
+    assert pool.stats()["buffers"] == 1
+
+
+def test_resolution_change_drops_recycled_buffers():
+    pool = FramePool(size=3)
+    pool.release(capture(pool, FakeCapture()))
+    frame = capture(pool, FakeCapture(96, 128))
+    stats = pool.stats()
+    assert stats["buffers"] == 1
+    assert stats["free"] == 0
+    assert stats["bytes"] == frame.nbytes
+    pool.release(frame)
+    assert capture(pool, FakeCapture(96, 128)) is frame
+
+
+def test_letterbox_and_blob_reuse_their_arrays():
+    buffers = PreprocessBuffers(64)
+    frame = np.full((32, 64, 3), 200, dtype=np.uint8)
+    canvas, scale, pad_x, pad_y = buffers.letterbox(frame)
+    assert (scale, pad_x, pad_y) == (1.0, 0, 16)
+    assert canvas[0, 0, 0] == 114 and canvas[32, 32, 0] == 200
+    assert buffers.letterbox(frame)[0] is canvas
+
+    blob = buffers.blob(1)
+    assert buffers.blob(1).base is blob.base
+    assert buffers.blob(2).shape == (2, 3, 64, 64)
+    assert buffers.allocations == 3
+
+
+def test_normalize_swaps_channels_and_scales():
+    buffers = PreprocessBuffers(2)
+    image = np.zeros((2, 2, 3), dtype=np.uint8)
+    image[..., 0], image[..., 2] = 255, 51
+    out = buffers.blob(1)[0]
+    buffers.normalize(image, out)
+    assert np.allclose(out[0], 0.2) and np.allclose(out[1], 0.0) and np.allclose(out[2], 1.0)
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from DetectionPostProcess import DETECTION_DTYPE, ZONE_CENTER
+from SpeechScheduler import PRIORITY_HAZARD, PRIORITY_ROUTINE
+
+
+def car(height):
+    """One centred car with a box of the given height in a 640x480 frame"""
+    detections = np.zeros(1, dtype=DETECTION_DTYPE)
+    detections[0] = (2, 0.9, 320, 240, height * 0.8, height, ZONE_CENTER, True)
+    return detections
+
+
+@pytest.fixture
+def assistant(assistant_module, monkeypatch):
+    assistant = assistant_module.IntelligentAssistant(backend="fake", language="en", camera_index=None)
+    assistant.spatial.set_frame_width(640)
+    assistant.spoken = []
+    monkeypatch.setattr(assistant, "speak", lambda text, priority=None, wait=False: assistant.spoken.append(
+        (text, priority)
+    ))
+    yield assistant
+    assistant.speech.stop()
+
+
+def test_far_hazard_is_announced_at_routine_priority(assistant):
+    for frame in range(4):
+        assistant.handle_detections(car(40), frame / 10)
+
+    assert not [text for text, priority in assistant.spoken if priority == PRIORITY_HAZARD]
+    routine = [text for text, priority in assistant.spoken if priority == PRIORITY_ROUTINE]
+    assert any("car detected ahead" in text for text in routine)
+
+
+def test_near_hazard_warns_only_once_confirmed(assistant):
+    assistant.handle_detections(car(400), 0.0)
+    assert not [text for text, priority in assistant.spoken if priority == PRIORITY_HAZARD]
+
+    for frame in range(1, 4):
+        assistant.handle_detections(car(400), frame / 10)
+    warnings = [text for text, priority in assistant.spoken if text.startswith("Warning")]
+    assert warnings == ["Warning: car ahead!"]
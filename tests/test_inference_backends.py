@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from DetectionPostProcess import COCO_LABELS, DetectionPostProcessor
+from InferenceBackends import InferenceBackend, OnnxBackend, nms_indices
+
+CAR, PERSON = COCO_LABELS.index("car"), COCO_LABELS.index("person")
+
+
+def onnx_decoder():
+    """OnnxBackend with its decode path only, no exported model or session"""
+    backend = OnnxBackend.__new__(OnnxBackend)
+    InferenceBackend.__init__(backend, "model.onnx", DetectionPostProcessor(list(COCO_LABELS), 0.3), 640)
+    backend.nms_threshold = 0.45
+    return backend
+
+
+def yolo_output(rows):
+    """Raw (1, 4 + classes, anchors) YOLOv8 head from (x, y, w, h, class_id, score) rows"""
+    output = np.zeros((1, 4 + len(COCO_LABELS), len(rows)), dtype=np.float32)
+    for anchor, (x, y, w, h, class_id, score) in enumerate(rows):
+        output[0, :4, anchor] = (x, y, w, h)
+        output[0, 4 + class_id, anchor] = score
+    return output
+
+
+def test_decode_suppresses_duplicates_of_one_class_only():
+    output = yolo_output([
+        (320, 240, 100, 200, CAR, 0.9),
+        (325, 245, 100, 200, CAR, 0.6),
+        (322, 242, 100, 200, PERSON, 0.8),
+        (100, 100, 20, 20, CAR, 0.1),
+    ])
+    detections = onnx_decoder().decode(output, 1.0, 0, 0, 640)
+    kept = dict(zip(detections["class_id"].tolist(), detections["confidence"].tolist()))
+    assert kept == {PERSON: pytest.approx(0.8), CAR: pytest.approx(0.9)}
+
+
+def test_decode_undoes_the_letterbox():
+    # A 1280x720 frame letterboxed to 640: half scale, 100 px of padding above
+    output = yolo_output([(320, 280, 50, 100, CAR, 0.9)])
+    detections = onnx_decoder().decode(output, 0.5, 0, 100, 1280)
+    assert detections[["x", "y", "w", "h"]].tolist() == [(640.0, 360.0, 100.0, 200.0)]
+    assert detections["hazard"].tolist() == [True]
+
+
+def test_nms_keeps_classes_apart_on_large_frames():
+    boxes = np.array([[5000, 5000, 200, 200], [904, 904, 200, 200]], dtype=np.float32)
+    kept = nms_indices(boxes, np.array([0.9, 0.8]), np.array([0.0, 1.0]), 0.3, 0.45)
+    assert sorted(kept.tolist()) == [0, 1]
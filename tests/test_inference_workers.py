@@ -0,0 +1,83 @@
+import logging
+import os
+
+import numpy as np
+
+from conftest import FakeBackend
+from DetectionPostProcess import COCO_LABELS, DetectionPostProcessor
+from InferenceWorkers import ProcessPoolBackend
+
+# A frame whose first byte is this makes the worker process die mid-request
+CRASH = 255
+
+
+class CrashingBackend(FakeBackend):
+    def detect(self, frame):
+        if frame[0, 0, 0] == CRASH:
+            os._exit(1)
+        return super().detect(frame)
+
+
+def crashing_backend(model_path, postprocessor, preferred, imgsz, int8, threads):
+    """Module level, so spawned workers can unpickle it"""
+    return CrashingBackend(model_path, postprocessor, imgsz, threads)
+
+
+def pool(**kwargs):
+    kwargs.setdefault("batch", 1)
+    kwargs.setdefault("workers", 1)
+    return ProcessPoolBackend(
+        "fake.pt", DetectionPostProcessor(list(COCO_LABELS), 0.3), imgsz=32, threads=1,
+        logger=logging.getLogger("test"), backend_factory=crashing_backend, health_interval=60.0, **kwargs
+    )
+
+
+def frame(height=48, width=64, value=0):
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+def test_workers_are_clamped_to_frames_per_call():
+    backend = pool(batch=1, workers=3)
+    try:
+        assert len(backend.workers) == 1
+        assert len(backend.detect(frame())) == 1
+    finally:
+        backend.close()
+
+
+def test_crashed_worker_is_restarted():
+    backend = pool(request_timeout=5.0)
+    try:
+        worker = backend.workers[0]
+        assert len(backend.detect(frame(value=CRASH))) == 0
+        assert worker.restarts == 1
+        assert worker.alive
+        detections = backend.detect(frame())
+        assert len(detections) == 1
+        assert detections[0]["w"] == 64 / 5
+    finally:
+        backend.close()
+
+
+def test_frame_larger_than_the_buffer_grows_it():
+    backend = pool(frame_bytes=frame().nbytes)
+    try:
+        worker = backend.workers[0]
+        assert len(backend.detect(frame())) == 1
+        assert worker.restarts == 0
+        large = frame(96, 128)
+        detections = backend.detect(large)
+        assert worker.restarts == 1
+        assert worker.capacity == large.nbytes
+        assert detections[0]["w"] == 128 / 5
+    finally:
+        backend.close()
+
+
+def test_batch_is_spread_over_workers():
+    backend = pool(batch=2, workers=2)
+    try:
+        results = backend.detect_batch([frame(), frame(96, 128)])
+        assert [record[0]["w"] for record in results] == [64 / 5, 128 / 5]
+    finally:
+        backend.close()
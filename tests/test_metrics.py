@@ -0,0 +1,79 @@
+import time
+
+from Metrics import JsonLinesExporter, Metrics, NULL_TIMER
+
+
+def test_disabled_metrics_collect_nothing():
+    collected = Metrics(enabled=False)
+    assert collected.timer("inference") is NULL_TIMER
+    with collected.timer("inference"):
+        pass
+    collected.observe("inference", 0.1)
+    collected.increment("frames_dropped")
+    collected.gauge("queue_depth", 3)
+
+    snapshot = collected.snapshot()
+    assert snapshot["histograms"] == snapshot["counters"] == snapshot["gauges"] == {}
+
+
+def test_metrics_can_be_enabled_at_runtime():
+    collected = Metrics(enabled=False)
+    collected.increment("frames_dropped")
+    collected.set_enabled(True)
+    collected.increment("frames_dropped")
+    with collected.timer("inference"):
+        pass
+    assert collected.snapshot()["counters"] == {"frames_dropped": 1}
+    assert collected.snapshot()["histograms"]["inference"]["count"] == 1
+
+
+def test_prometheus_text():
+    collected = Metrics(enabled=True)
+    collected.observe("inference", 0.1)
+    collected.observe("inference", 0.3)
+    collected.increment("frames_dropped", 2)
+    collected.gauge("queue_depth", 3)
+
+    assert collected.prometheus_text() == "\n".join([
+        "# TYPE drishti_inference_seconds summary",
+        'drishti_inference_seconds{quantile="0.5"} 0.300000',
+        'drishti_inference_seconds{quantile="0.9"} 0.300000',
+        'drishti_inference_seconds{quantile="0.99"} 0.300000',
+        "drishti_inference_seconds_sum 0.400000",
+        "drishti_inference_seconds_count 2",
+        "# TYPE drishti_frames_dropped_total counter",
+        "drishti_frames_dropped_total 2",
+        "# TYPE drishti_queue_depth gauge",
+        "drishti_queue_depth 3",
+    ]) + "\n"
+
+
+def test_exporter_stays_idle_until_enabled(tmp_path):
+    collected = Metrics(enabled=False)
+    exporter = JsonLinesExporter(str(tmp_path / "metrics.jsonl"), interval=0.02, source=collected)
+    exporter.start()
+    try:
+        time.sleep(0.1)
+        assert not (tmp_path / "metrics.jsonl").exists()
+        collected.set_enabled(True)
+        time.sleep(0.1)
+        assert (tmp_path / "metrics.jsonl").exists()
+    finally:
+        exporter.stop()
+
+
+def test_voice_command_toggles_metrics(assistant_module):
+    from Metrics import metrics
+    assistant = assistant_module.IntelligentAssistant(backend="fake", language="en", camera_index=None)
+    try:
+        assert not metrics.enabled
+        assert any(isinstance(exporter, JsonLinesExporter) for exporter in assistant.metrics_exporters)
+        assert assistant.process_assistant_command("start metrics") == "Metrics on"
+        assert metrics.enabled
+        assert assistant.process_assistant_command("metrics off") == "Metrics off"
+        assert not metrics.enabled
+    finally:
+        metrics.set_enabled(False)
+        assistant.speech.stop()
+        for exporter in assistant.metrics_exporters:
+            exporter.stop()
@@ -0,0 +1,159 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from NetworkServices import ServiceClient, WeatherService, CircuitOpenError, CircuitBreaker
+
+WEATHER = {"main": {"temp": 21.5}, "weather": [{"description": "clear sky"}]}
+
+
+class StubServer:
+    def __init__(self):
+        """Local OpenWeatherMap stand-in replaying scripted (status, delay) replies, the last one repeating"""
+        self.replies = [(200, 0.0)]
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests.append(self.path)
+                status, delay = stub.replies.pop(0) if len(stub.replies) > 1 else stub.replies[0]
+                time.sleep(delay)
+                body = json.dumps(WEATHER if status == 200 else {"message": "error"}).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except OSError:
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}/data/2.5/weather"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    pytest.importorskip("requests")
+    server = StubServer()
+    monkeypatch.setenv("DRISHTI_WEATHER_URL", server.url)
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def client():
+    client = ServiceClient()
+    yield client
+    client.close()
+
+
+def test_weather_is_cached_per_location(stub, client):
+    weather = WeatherService(client, "key", base_url=stub.url, ttl=0.3)
+    assert weather.current("London").result(timeout=5) == (200, WEATHER)
+    assert weather.current(" london ").result(timeout=5) == (200, WEATHER)
+    assert len(stub.requests) == 1
+    time.sleep(0.4)
+    weather.current("London").result(timeout=5)
+    assert len(stub.requests) == 2
+
+
+def test_failed_replies_are_not_cached(stub, client):
+    stub.replies = [(404, 0.0), (200, 0.0)]
+    weather = WeatherService(client, "key", base_url=stub.url)
+    assert weather.current("Atlantis").result(timeout=5)[0] == 404
+    assert weather.current("Atlantis").result(timeout=5)[0] == 200
+    assert len(stub.requests) == 2
+
+
+def test_server_errors_are_retried_with_backoff(stub, client):
+    stub.replies = [(503, 0.0), (503, 0.0), (200, 0.0)]
+    started = time.monotonic()
+    result = client.call("weather", client.get_json, stub.url, deadline=5.0, retries=2, backoff=0.1)
+    assert result == (200, WEATHER)
+    assert len(stub.requests) == 3
+    # 0.1 s then 0.2 s between the attempts
+    assert time.monotonic() - started >= 0.3
+
+
+def test_slow_service_is_cut_off_at_the_deadline(stub, client):
+    stub.replies = [(200, 2.0)]
+    started = time.monotonic()
+    with pytest.raises(Exception):
+        client.call("weather", client.get_json, stub.url, deadline=0.5, retries=0)
+    assert time.monotonic() - started < 1.5
+
+
+def test_retries_stop_when_the_deadline_is_near(stub, client):
+    stub.replies = [(503, 0.0)]
+    started = time.monotonic()
+    with pytest.raises(Exception):
+        client.call("weather", client.get_json, stub.url, deadline=0.5, retries=10, backoff=0.2)
+    assert time.monotonic() - started < 0.8
+    assert len(stub.requests) < 4
+
+
+def test_circuit_opens_after_repeated_failures_and_probes_later(stub, client):
+    stub.replies = [(500, 0.0)]
+    client.breakers["weather"] = CircuitBreaker(failure_threshold=3, reset_timeout=0.3)
+    for _ in range(3):
+        with pytest.raises(Exception):
+            client.call("weather", client.get_json, stub.url, retries=0)
+    with pytest.raises(CircuitOpenError):
+        client.call("weather", client.get_json, stub.url, retries=0)
+    assert len(stub.requests) == 3
+
+    # After the reset timeout a single probe goes out and closes the breaker again
+    stub.replies = [(200, 0.0)]
+    time.sleep(0.35)
+    assert client.call("weather", client.get_json, stub.url, retries=0) == (200, WEATHER)
+    assert client.breakers["weather"].state == "closed"
+    assert len(stub.requests) == 4
+
+
+def test_assistant_uses_the_weather_url_from_the_environment(stub, assistant_module):
+    assistant = assistant_module.IntelligentAssistant(backend="fake", language="en", camera_index=None)
+    try:
+        reply = assistant.get_weather("London").result(timeout=5)
+    finally:
+        assistant.services.close()
+        assistant.speech.stop()
+    assert stub.requests and stub.requests[0].startswith("/data/2.5/weather?q=London")
+    assert "21.5" in reply
+
+
+class HangingTranslator:
+    def __init__(self):
+        """deep_translator stand-in whose request never returns in time and takes no timeout"""
+        self.release = threading.Event()
+
+    def translate(self, text):
+        self.release.wait(5.0)
+        return "देर से"
+
+
+def test_untimed_client_is_cut_off_at_the_deadline(tmp_path):
+    from TranslationCache import TranslationCache
+    services = ServiceClient()
+    cache = TranslationCache(str(tmp_path / "cache"), services=services, deadline=0.3)
+    hanging = cache.translators["hi"] = HangingTranslator()
+    try:
+        started = time.monotonic()
+        assert cache.translate("good evening friend", "hi", wait=True) == "good evening friend"
+        assert time.monotonic() - started < 1.0
+    finally:
+        hanging.release.set()
+        services.close()
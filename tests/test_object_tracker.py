@@ -0,0 +1,75 @@
+import numpy as np
+
+from DetectionPostProcess import DETECTION_DTYPE, ZONE_CENTER, ZONE_LEFT
+from ObjectTracker import TRACK_APPROACH, TRACK_BIRTH, TRACK_GONE, TRACK_ZONE_CHANGE, ObjectTracker
+
+CAR, PERSON = 2, 0
+
+
+def record(*rows):
+    """Detection record from (class_id, x, y, w, h, zone) rows"""
+    detections = np.zeros(len(rows), dtype=DETECTION_DTYPE)
+    for i, (class_id, x, y, w, h, zone) in enumerate(rows):
+        detections[i] = (class_id, 0.9, x, y, w, h, zone, class_id == CAR)
+    return detections
+
+
+def kinds(events):
+    return [event.kind for event in events]
+
+
+def test_birth_after_min_hits_and_stable_ids():
+    tracker = ObjectTracker(min_hits=2)
+    assert tracker.update(record((CAR, 100, 100, 40, 40, ZONE_CENTER))) == []
+    first = tracker.last_track_ids.tolist()
+    assert kinds(tracker.update(record((CAR, 104, 100, 40, 40, ZONE_CENTER)))) == [TRACK_BIRTH]
+    assert tracker.last_track_ids.tolist() == first
+
+
+def test_overlapping_boxes_match_by_iou():
+    tracker = ObjectTracker(min_hits=1)
+    tracker.update(record((CAR, 100, 100, 40, 40, ZONE_CENTER), (CAR, 300, 100, 40, 40, ZONE_CENTER)))
+    ids = tracker.last_track_ids.tolist()
+    # Listed in the other order, each still keeps its id
+    tracker.update(record((CAR, 305, 100, 40, 40, ZONE_CENTER), (CAR, 95, 100, 40, 40, ZONE_CENTER)))
+    assert tracker.last_track_ids.tolist() == ids[::-1]
+
+
+def test_fast_object_matches_by_centroid():
+    tracker = ObjectTracker(min_hits=1, iou_threshold=0.3, centroid_ratio=0.5)
+    tracker.update(record((PERSON, 100, 100, 20, 60, ZONE_CENTER)))
+    ids = tracker.last_track_ids.tolist()
+    # No overlap, but within half the larger side of the previous box
+    events = tracker.update(record((PERSON, 125, 100, 20, 60, ZONE_CENTER)))
+    assert tracker.last_track_ids.tolist() == ids
+    assert TRACK_BIRTH not in kinds(events)
+
+
+def test_other_class_or_far_object_is_a_new_track():
+    tracker = ObjectTracker(min_hits=1)
+    tracker.update(record((CAR, 100, 100, 40, 40, ZONE_CENTER)))
+    ids = tracker.last_track_ids.tolist()
+    assert kinds(tracker.update(record((PERSON, 100, 100, 40, 40, ZONE_CENTER)))) == [TRACK_BIRTH]
+    assert tracker.last_track_ids.tolist() != ids
+    tracker = ObjectTracker(min_hits=1)
+    tracker.update(record((CAR, 100, 100, 40, 40, ZONE_CENTER)))
+    assert kinds(tracker.update(record((CAR, 400, 100, 40, 40, ZONE_CENTER)))) == [TRACK_BIRTH]
+
+
+def test_zone_change_approach_and_gone():
+    tracker = ObjectTracker(min_hits=1, max_misses=1, approach_ratio=1.4)
+    tracker.update(record((CAR, 100, 100, 40, 40, ZONE_CENTER)))
+    assert kinds(tracker.update(record((CAR, 95, 100, 40, 40, ZONE_LEFT)))) == [TRACK_ZONE_CHANGE]
+    assert kinds(tracker.update(record((CAR, 95, 100, 50, 50, ZONE_LEFT)))) == [TRACK_APPROACH]
+    empty = record()
+    assert tracker.update(empty) == []
+    assert kinds(tracker.update(empty)) == [TRACK_GONE]
+    assert tracker.tracks == []
+
+
+def test_reset_forgets_tracks_and_last_ids():
+    tracker = ObjectTracker(min_hits=1)
+    tracker.update(record((CAR, 100, 100, 40, 40, ZONE_CENTER)))
+    tracker.reset()
+    assert tracker.tracks == []
+    assert len(tracker.last_track_ids) == 0
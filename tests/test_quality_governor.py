@@ -0,0 +1,95 @@
+import json
+import time
+
+import pytest
+
+from QualityGovernor import QUALITY_LEVELS, QualityGovernor, initial_level
+
+SLO = 0.5
+
+
+@pytest.fixture
+def governor():
+    """At "medium", past its startup cooldown, with CPU load pinned low"""
+    governor = QualityGovernor(QUALITY_LEVELS, lambda level: None, SLO, level=2, min_samples=1,
+                               up_margin=0.6, up_windows=3, cooldown=10.0, backoff=30.0, max_backoff=120.0)
+    governor.hold_until = 0.0
+    governor.cpu_load = lambda now: 0.1
+    return governor
+
+
+def window(governor, latency, now):
+    """Evaluate one finished window of identical samples"""
+    governor.samples = [latency] * 5
+    return governor._evaluate(now)
+
+
+def test_over_slo_steps_down_and_blocks_the_level(governor):
+    target, reason, stats = window(governor, 0.8, now=100.0)
+    assert (target, reason) == (1, "latency over SLO")
+    assert stats["latency_ms"] == 800.0
+    assert governor.blocked_until[2] == 130.0
+
+
+def test_cpu_overload_steps_down(governor):
+    governor.cpu_load = lambda now: 0.95
+    assert window(governor, 0.1, now=100.0)[:2] == (1, "CPU overloaded")
+
+
+def test_no_step_down_during_cooldown_or_at_the_bottom(governor):
+    governor.hold_until = 200.0
+    assert window(governor, 0.8, now=100.0) is None
+    governor.hold_until, governor.level = 0.0, 0
+    assert window(governor, 0.8, now=100.0) is None
+
+
+def test_step_up_needs_consecutive_windows_with_headroom(governor):
+    assert window(governor, 0.1, now=100.0) is None
+    assert window(governor, 0.1, now=103.0) is None
+    # Inside the SLO but without the margin: the streak starts over
+    assert window(governor, 0.4, now=106.0) is None
+    assert window(governor, 0.1, now=109.0) is None
+    assert window(governor, 0.1, now=112.0) is None
+    assert window(governor, 0.1, now=115.0)[:2] == (3, "headroom")
+
+
+def test_abandoned_level_backs_off_exponentially(governor):
+    governor.level = 3
+    assert window(governor, 0.8, now=100.0)[0] == 2
+    governor.level = 2
+    for now in (103.0, 106.0):
+        window(governor, 0.1, now)
+    # Three good windows, but "high" is still blocked until 130
+    assert window(governor, 0.1, now=109.0) is None
+    assert window(governor, 0.1, now=112.0) is None
+    # The streak carried on meanwhile, so the climb comes as soon as the block lapses
+    assert window(governor, 0.1, now=131.0)[0] == 3
+
+    governor.level = 3
+    window(governor, 0.8, now=140.0)
+    assert governor.blocked_until[3] == 140.0 + 60.0
+    governor.level = 3
+    window(governor, 0.8, now=300.0)
+    assert governor.blocked_until[3] == 300.0 + 120.0
+
+
+def test_failed_switch_keeps_the_level_and_blocks_the_target(tmp_path):
+    def apply(level):
+        raise RuntimeError("model missing")
+
+    log = tmp_path / "governor.jsonl"
+    governor = QualityGovernor(QUALITY_LEVELS, apply, SLO, level=2, max_backoff=120.0, event_log=str(log))
+    event = {"from": "medium", "to": "high", "reason": "headroom", "latency_ms": 100.0, "cpu": 0.1}
+    governor.switching = True
+    governor._apply(3, event)
+    assert governor.level == 2
+    assert not governor.switching
+    assert governor.blocked_until[3] > time.monotonic() + 100.0
+    assert json.loads(log.read_text())["error"] == "model missing"
+
+
+def test_initial_level():
+    assert initial_level(QUALITY_LEVELS, "low", "yolov8n.pt", 640) == 1
+    assert initial_level(QUALITY_LEVELS, None, "yolov8n.pt", 640) == 3
+    assert initial_level(QUALITY_LEVELS, None, "yolov8n.pt", 400) == 1
+    assert initial_level(QUALITY_LEVELS, "gone", "custom.pt", 640) == 0
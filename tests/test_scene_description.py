@@ -0,0 +1,71 @@
+import numpy as np
+
+from DetectionPostProcess import COCO_LABELS, DETECTION_DTYPE, ZONE_CENTER, ZONE_LEFT, ZONE_RIGHT
+from SceneDescription import SceneState, pluralize
+
+CAR, PERSON = COCO_LABELS.index("car"), COCO_LABELS.index("person")
+
+
+class FakeTranslator:
+    def compose(self, template, language, **slots):
+        """English templates filled in as-is"""
+        return template.format(**slots)
+
+
+def record(*rows):
+    """Detection record from (class_id, zone) rows"""
+    detections = np.zeros(len(rows), dtype=DETECTION_DTYPE)
+    for i, (class_id, zone) in enumerate(rows):
+        detections[i] = (class_id, 0.9, 0, 0, 10, 10, zone, False)
+    return detections
+
+
+def scene(**kwargs):
+    return SceneState(list(COCO_LABELS), FakeTranslator(), **kwargs)
+
+
+def feed(state, detections, frames):
+    return [state.update(detections) for _ in range(frames)]
+
+
+def test_new_count_is_announced_after_min_frames():
+    state = scene(min_frames=3)
+    assert feed(state, record((CAR, ZONE_CENTER)), 3) == ["", "", "one car ahead"]
+    assert feed(state, record((CAR, ZONE_CENTER)), 2) == ["", ""]
+
+
+def test_flicker_shorter_than_min_frames_is_ignored():
+    state = scene(min_frames=3)
+    feed(state, record((PERSON, ZONE_LEFT)), 3)
+    # The person drops out for two frames only, then for good
+    assert feed(state, record(), 2) == ["", ""]
+    assert feed(state, record((PERSON, ZONE_LEFT)), 1) == [""]
+    assert feed(state, record(), 3) == ["", "", "person gone"]
+
+
+def test_more_and_fewer_deltas():
+    state = scene(min_frames=1)
+    state.update(record((PERSON, ZONE_LEFT)))
+    assert state.update(record(*[(PERSON, ZONE_LEFT)] * 3)) == "two more people on the left"
+    assert state.update(record((PERSON, ZONE_LEFT))) == "two fewer people"
+
+
+def test_hazard_classes_are_described_first():
+    hazards = np.zeros(len(COCO_LABELS), dtype=bool)
+    hazards[CAR] = True
+    state = scene(min_frames=1, hazard_mask=hazards)
+    delta = state.update(record(*[(PERSON, ZONE_LEFT)] * 2, (CAR, ZONE_RIGHT)))
+    assert delta == "one car on the right, two people on the left"
+    assert state.describe() == "two people on the left, one car on the right"
+
+
+def test_reset_starts_over():
+    state = scene(min_frames=1)
+    state.update(record((CAR, ZONE_CENTER)))
+    state.reset()
+    assert state.describe() == ""
+    assert state.update(record((CAR, ZONE_CENTER))) == "one car ahead"
+
+
+def test_pluralize():
+    assert [pluralize(label) for label in ("car", "bus", "person", "bench")] == ["cars", "buses", "people", "benches"]
@@ -0,0 +1,114 @@
+import time
+import numpy as np
+
+from SessionLog import SessionRecorder, read_log, RECORD_DETECTIONS, RECORD_FRAME
+
+
+def record_session(path, frames=3):
+    recorder = SessionRecorder(path)
+    for index in range(frames):
+        recorder.frame(np.full((240, 320, 3), index, dtype=np.uint8), recorder.started + index * 0.5)
+    recorder.close()
+
+
+def test_replay_announces_and_counts_every_frame(assistant_module, tmp_path):
+    from SessionReplay import ReplayAssistant, run_replay
+    record_session(str(tmp_path / "session.log"))
+    report = run_replay(ReplayAssistant(str(tmp_path / "session.log"), backend="fake"))
+    assert report["frames"] == 3
+    assert report["detection_counts"] == [1, 1, 1]
+    assert report["announcements"]
+
+
+def test_replay_does_not_record_into_the_live_log(assistant_module, tmp_path, monkeypatch):
+    from SessionReplay import ReplayAssistant, run_replay
+    record_session(str(tmp_path / "session.log"))
+    live_log = tmp_path / "live.log"
+    monkeypatch.setenv("DRISHTI_RECORD", str(live_log))
+
+    assistant = ReplayAssistant(str(tmp_path / "session.log"), backend="fake")
+    run_replay(assistant)
+
+    assert assistant.recorder is None
+    assert not live_log.exists()
+    assert len(list(read_log(str(tmp_path / "session.log")))) == 3
+
+
+class FakeCamera:
+    def __init__(self, count=12):
+        """Camera that delivers count distinct frames at about 50 fps, then fails"""
+        self.count = count
+        self.index = 0
+
+    def isOpened(self):
+        return True
+
+    def read(self, image=None):
+        if self.index >= self.count:
+            return False, None
+        time.sleep(0.02)
+        self.index += 1
+        return True, np.full((240, 320, 3), self.index * 10, dtype=np.uint8)
+
+    def release(self):
+        pass
+
+
+class EveryOtherFrame:
+    def __init__(self):
+        """Motion scheduler stand-in that lets every second frame through"""
+        self.calls = 0
+        self.max_fps = 10.0
+
+    def should_infer(self, frame, now=None):
+        self.calls += 1
+        return self.calls % 2 == 1
+
+    def record_inference(self, duration):
+        pass
+
+
+def test_replay_infers_the_frames_the_gated_session_inferred(assistant_module, tmp_path, monkeypatch):
+    from Benchmark import NullSpeechEngine
+    from SessionReplay import ReplayAssistant, run_replay
+    monkeypatch.setattr(assistant_module.IntelligentAssistant, "create_speech_engine", lambda self: NullSpeechEngine())
+    monkeypatch.setenv("DRISHTI_RECORD", str(tmp_path / "session.log"))
+    live = assistant_module.IntelligentAssistant(backend="fake", language="en", camera_index=None)
+    live.cap = FakeCamera()
+    live.scheduler = EveryOtherFrame()
+    live.run()
+    monkeypatch.delenv("DRISHTI_RECORD")
+
+    records = list(read_log(str(tmp_path / "session.log")))
+    frames = [kind for _, kind, _ in records if kind == RECORD_FRAME]
+    inferred = [kind for _, kind, _ in records if kind == RECORD_DETECTIONS]
+    assert len(frames) == 12 and 0 < len(inferred) <= 6
+
+    report = run_replay(ReplayAssistant(str(tmp_path / "session.log"), backend="fake"))
+    assert report["frames"] == len(inferred)
+    assert report["detection_count_mismatches"] == 0
+    assert report["announcements"] == report["recorded_announcements"]
+
+
+def test_recorder_never_overwrites_an_earlier_session(tmp_path):
+    record_session(str(tmp_path / "session.log"))
+    recorder = SessionRecorder(str(tmp_path / "session.log"))
+    recorder.close()
+
+    assert recorder.path != str(tmp_path / "session.log")
+    assert len(list(read_log(str(tmp_path / "session.log")))) == 3
+
+
+def report_with_latency(p50, p95):
+    return {"announcements": ["car detected ahead"], "detection_counts": [1], "frame_latency": {
+        "p50_ms": p50, "p95_ms": p95,
+    }}
+
+
+def test_compare_reports_flags_latency_regressions(assistant_module):
+    from SessionReplay import compare_reports
+    baseline = report_with_latency(20.0, 40.0)
+    assert compare_reports(report_with_latency(25.0, 55.0), baseline) == []
+    differences = compare_reports(report_with_latency(25.0, 80.0), baseline)
+    assert differences == ["frame latency p95 80.0 ms exceeds baseline 40.0 ms"]
+    assert compare_reports(report_with_latency(25.0, 55.0), baseline, latency_tolerance=0.1)
@@ -0,0 +1,113 @@
+import threading
+import time
+
+import pytest
+
+from SpeechScheduler import PRIORITY_HAZARD, PRIORITY_REPLY, PRIORITY_ROUTINE, SpeechScheduler
+
+
+class FakeEngine:
+    def __init__(self):
+        """pyttsx3 stand-in that keeps talking, word by word, until stopped or released"""
+        self.spoken = []
+        self.on_word = None
+        self.text = None
+        self.speaking = threading.Event()
+        self.release = threading.Event()
+        self.stopped = False
+
+    def connect(self, name, callback):
+        self.on_word = callback
+
+    def say(self, text):
+        self.text = text
+
+    def runAndWait(self):
+        self.spoken.append(self.text)
+        self.stopped = False
+        self.speaking.set()
+        while not self.stopped and not self.release.is_set():
+            self.on_word("started-word", 0, 0)
+            time.sleep(0.005)
+
+    def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def queued():
+    """A scheduler that accepts messages but has no speech thread taking them"""
+    scheduler = SpeechScheduler(FakeEngine)
+    scheduler.running = True
+    return scheduler
+
+
+def drain(scheduler):
+    texts = []
+    while True:
+        utterance = scheduler._next_utterance(time.monotonic())
+        if utterance is None:
+            return texts
+        texts.append(utterance.text)
+
+
+def test_priority_order(queued):
+    queued.say("two cars", PRIORITY_ROUTINE)
+    queued.say("the time is noon", PRIORITY_REPLY)
+    queued.say("car ahead", PRIORITY_HAZARD)
+    assert drain(queued) == ["car ahead", "the time is noon", "two cars"]
+
+
+def test_duplicates_coalesce_and_upgrade(queued):
+    assert queued.say("person on the left", PRIORITY_REPLY)
+    assert not queued.say("person on the left", PRIORITY_REPLY)
+    assert not queued.say("person on the left", PRIORITY_HAZARD)
+    queued.say("the time is noon", PRIORITY_REPLY)
+    assert queued.pending_count() == 2
+    assert queued.stats["coalesced"] == 2
+    assert drain(queued) == ["person on the left", "the time is noon"]
+
+
+def test_newer_routine_summary_replaces_pending_one(queued):
+    queued.say("two cars", PRIORITY_ROUTINE)
+    queued.say("three cars", PRIORITY_ROUTINE)
+    assert queued.stats["dropped"] == 1
+    assert drain(queued) == ["three cars"]
+
+
+def test_expired_messages_are_not_spoken(queued):
+    queued.say("bus ahead", PRIORITY_HAZARD, ttl=0.0)
+    queued.say("the time is noon", PRIORITY_REPLY)
+    time.sleep(0.01)
+    assert drain(queued) == ["the time is noon"]
+    assert queued.stats["expired"] == 1
+
+
+def test_queue_is_bounded_by_dropping_least_important():
+    scheduler = SpeechScheduler(FakeEngine, max_pending=2)
+    scheduler.running = True
+    scheduler.say("car ahead", PRIORITY_HAZARD)
+    scheduler.say("reply one", PRIORITY_REPLY)
+    scheduler.say("reply two", PRIORITY_REPLY)
+    assert drain(scheduler) == ["car ahead", "reply one"]
+
+
+def test_hazard_preempts_routine_and_interrupted_reply_is_requeued():
+    engine = FakeEngine()
+    scheduler = SpeechScheduler(lambda: engine)
+    scheduler.start()
+    try:
+        scheduler.say("the time is noon", PRIORITY_REPLY)
+        assert engine.speaking.wait(2.0)
+        scheduler.say("car ahead", PRIORITY_HAZARD)
+        deadline = time.monotonic() + 2.0
+        while engine.spoken[-1:] != ["car ahead"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        engine.release.set()
+        deadline = time.monotonic() + 2.0
+        while len(engine.spoken) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        scheduler.stop()
+    assert engine.spoken == ["the time is noon", "car ahead", "the time is noon"]
+    assert scheduler.stats["interrupted"] == 1
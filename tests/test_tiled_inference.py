@@ -0,0 +1,47 @@
+import numpy as np
+
+from DetectionPostProcess import DetectionPostProcessor, empty_detections
+from InferenceBackends import InferenceBackend
+from TiledInference import TILING_PRESETS, TiledBackend, tiled_batch
+
+
+class CountingBackend(InferenceBackend):
+    name = "counting"
+
+    def __init__(self, imgsz=640):
+        super().__init__("model.pt", DetectionPostProcessor(["car"], 0.3), imgsz)
+        self.calls = []
+
+    def detect(self, frame):
+        return empty_detections()
+
+    def detect_batch(self, frames):
+        self.calls.append(len(frames))
+        return super().detect_batch(frames)
+
+
+def test_frames_no_larger_than_a_tile_get_a_single_pass(caplog):
+    backend = CountingBackend(imgsz=640)
+    tiled = TiledBackend(backend, backend.postprocessor, **TILING_PRESETS["accurate"])
+
+    for _ in range(2):
+        tiled.detect(np.zeros((480, 640, 3), dtype=np.uint8))
+
+    assert backend.calls == []
+    assert len([record for record in caplog.records if "Tiling skipped" in record.message]) == 1
+
+
+def test_larger_frames_are_batched_with_their_tiles():
+    backend = CountingBackend(imgsz=640)
+    tiled = TiledBackend(backend, backend.postprocessor, **TILING_PRESETS["balanced"])
+
+    tiled.detect(np.zeros((1080, 1920, 3), dtype=np.uint8))
+
+    assert backend.calls == [3]
+
+
+def test_export_batch_includes_tiles():
+    assert tiled_batch(1, "off") == 1
+    assert tiled_batch(1, "fast") == 2
+    assert tiled_batch(2, "balanced") == 6
+    assert tiled_batch(1, "accurate") == 2
@@ -0,0 +1,158 @@
+import sys
+import types
+import wave
+import numpy as np
+
+from WakeWord import WakeWordListener, WavFileSource, RecognizerKeywordSpotter, SAMPLE_RATE
+
+
+def write_fixture(path, layout):
+    """16-bit mono WAV of (seconds, voiced) segments: a 300 Hz tone for voice, faint noise otherwise"""
+    rng = np.random.default_rng(0)
+    pieces = []
+    for seconds, voiced in layout:
+        count = int(seconds * SAMPLE_RATE)
+        if voiced:
+            t = np.arange(count) / SAMPLE_RATE
+            pieces.append(6000 * np.sin(2 * np.pi * 300 * t))
+        else:
+            pieces.append(rng.normal(0, 20, count))
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(np.concatenate(pieces).astype(np.int16).tobytes())
+
+
+class ScriptedSpotter:
+    def __init__(self, wake_phrases):
+        """Local spotter stand-in that hears the wake word in the given idle phrases (0-based)"""
+        self.wake_phrases = set(wake_phrases)
+        self.phrases = 0
+
+    def accept(self, chunk):
+        return False
+
+    def end_of_speech(self, pcm, sample_rate):
+        index, self.phrases = self.phrases, self.phrases + 1
+        return index in self.wake_phrases
+
+    def reset(self):
+        pass
+
+
+class ScriptedRecognizer:
+    name = "scripted"
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = []
+
+    def transcribe(self, pcm, sample_rate):
+        self.calls.append(len(pcm) // 2 / sample_rate)
+        return self.replies.pop(0) if self.replies else ""
+
+
+def run_listener(path, spotter, recognizer):
+    state = {"assistant": False}
+    wakes, commands = [], []
+
+    def on_wake():
+        wakes.append(True)
+        state["assistant"] = True
+
+    listener = WakeWordListener(
+        WavFileSource(path), spotter, recognizer, on_wake, commands.append, lambda: state["assistant"]
+    )
+    listener.run()
+    return wakes, commands
+
+
+def test_full_recognizer_only_hears_audio_after_the_wake_word(tmp_path):
+    path = str(tmp_path / "session.wav")
+    # Two idle phrases, the wake phrase, then a command
+    write_fixture(path, [(0.5, False), (0.6, True), (1.0, False), (0.6, True), (1.0, False),
+                         (0.8, True), (1.0, False), (1.0, True), (1.0, False)])
+    recognizer = ScriptedRecognizer(["what time is it"])
+
+    wakes, commands = run_listener(path, ScriptedSpotter({2}), recognizer)
+
+    assert len(wakes) == 1
+    assert commands == ["what time is it"]
+    # Idle phrases and the wake phrase never reached the full recognizer
+    assert len(recognizer.calls) == 1
+    assert 0.9 <= recognizer.calls[0] <= 2.0
+
+
+def test_silence_never_reaches_a_recognizer(tmp_path):
+    path = str(tmp_path / "quiet.wav")
+    write_fixture(path, [(3.0, False)])
+    recognizer = ScriptedRecognizer(["hello assistant"])
+
+    wakes, commands = run_listener(path, RecognizerKeywordSpotter(recognizer), recognizer)
+
+    assert wakes == [] and commands == []
+    assert recognizer.calls == []
+
+
+def test_fallback_spotter_checks_each_phrase_with_the_recognizer(tmp_path):
+    path = str(tmp_path / "fallback.wav")
+    write_fixture(path, [(0.5, False), (0.6, True), (1.0, False), (0.8, True), (1.0, False),
+                         (1.0, True), (1.0, False)])
+    recognizer = ScriptedRecognizer(["good morning", "hello assistant", "weather in delhi"])
+
+    wakes, commands = run_listener(path, RecognizerKeywordSpotter(recognizer), recognizer)
+
+    assert len(wakes) == 1
+    assert commands == ["weather in delhi"]
+    assert len(recognizer.calls) == 3
+
+
+def test_listener_needs_vosk_or_explicit_fallback(assistant_module):
+    assistant = assistant_module.IntelligentAssistant(backend="fake", language="en", camera_index=None)
+    assistant.config = {}
+    assert assistant.create_listener() is None
+
+
+class FakeVosk(types.ModuleType):
+    def __init__(self):
+        """vosk module stand-in that counts model loads"""
+        super().__init__("vosk")
+        self.loads = []
+        fake = self
+
+        class Model:
+            def __init__(self, path):
+                fake.loads.append(path)
+
+        class KaldiRecognizer:
+            def __init__(self, model, sample_rate, grammar=None):
+                self.model = model
+                self.grammar = grammar
+
+        self.Model = Model
+        self.KaldiRecognizer = KaldiRecognizer
+
+
+class FakeMicrophone:
+    sample_rate = 16000
+
+    def read(self):
+        return None
+
+    def close(self):
+        pass
+
+
+def test_vosk_model_is_loaded_once_for_spotting_and_commands(assistant_module, monkeypatch):
+    vosk = FakeVosk()
+    monkeypatch.setitem(sys.modules, "vosk", vosk)
+    monkeypatch.setattr(assistant_module, "MicrophoneSource", FakeMicrophone)
+    assistant = assistant_module.IntelligentAssistant(backend="fake", language="en", camera_index=None)
+    assistant.config = {"vosk_model": "models/vosk-small"}
+
+    listener = assistant.create_listener()
+
+    assert vosk.loads == ["models/vosk-small"]
+    assert listener.spotter.recognizer.model is listener.recognizer.model
+    assert listener.spotter.stream.grammar is not None and listener.recognizer.new_stream(16000).grammar is None